@@ -0,0 +1 @@
+"""识别流水线性能基准测试"""
@@ -0,0 +1,112 @@
+"""HTTP接口基准测试
+
+对运行中的服务发起并发请求,测量 /api/v1/recognize 和 /api/v1/recognize/batch
+在不同并发数下的延迟分位数和吞吐量。
+
+用法:
+    python -m benchmarks.bench_http --url http://localhost:8000 \
+        --output benchmarks/results/http.json
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import print_table, summarize, synthesize_image, write_results
+
+
+async def _run_level(
+    client: httpx.AsyncClient,
+    path: str,
+    build_files,
+    concurrency: int,
+    requests: int
+) -> Dict:
+    """以固定并发数发送requests个请求"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    status_codes: Counter = Counter()
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, files=build_files(i))
+                status_codes[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                status_codes[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - start
+    return {"status_codes": dict(status_codes), **summarize(latencies, wall)}
+
+
+async def run(args) -> List[Dict]:
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    # 每个请求使用不同的图片,避免命中识别结果缓存
+    images = [
+        synthesize_image(width, height, args.density, amount=f"{100 + i}.{i % 100:02d}", seed=i)
+        for i in range(args.distinct_images)
+    ]
+
+    def single_files(i: int):
+        return {"file": (f"bench_{i}.jpg", images[i % len(images)], "image/jpeg")}
+
+    def batch_files(i: int):
+        return [
+            ("files", (f"bench_{i}_{j}.jpg", images[(i + j) % len(images)], "image/jpeg"))
+            for j in range(args.batch_size)
+        ]
+
+    endpoints = {
+        "recognize": ("/api/v1/recognize", single_files),
+        "batch": ("/api/v1/recognize/batch", batch_files),
+    }
+
+    results = []
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=max(args.concurrency_levels))
+    async with httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits) as client:
+        for endpoint in args.endpoints.split(","):
+            path, build_files = endpoints[endpoint]
+            for level in args.concurrency_levels:
+                # 预热(不计时)
+                await _run_level(client, path, build_files, level, min(level, args.requests))
+                stats = await _run_level(client, path, build_files, level, args.requests)
+                results.append({
+                    "name": f"http_{endpoint}[c={level}]",
+                    "endpoint": path,
+                    "concurrency": level,
+                    **stats,
+                })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP接口基准测试")
+    parser.add_argument("--url", default="http://localhost:8000", help="服务地址")
+    parser.add_argument("--endpoints", default="recognize,batch", help="测试接口: recognize,batch")
+    parser.add_argument("--concurrency", default="1,4,8,16", help="并发数列表")
+    parser.add_argument("--requests", type=int, default=100, help="每个并发级别的请求数")
+    parser.add_argument("--size", default="1280x960", help="图片尺寸")
+    parser.add_argument("--density", default="medium", help="文字密度(sparse/medium/dense)")
+    parser.add_argument("--batch-size", type=int, default=8, help="批量接口每个请求的图片数")
+    parser.add_argument("--distinct-images", type=int, default=256, help="不同图片数(避免结果缓存命中)")
+    parser.add_argument("--timeout", type=float, default=60, help="单个请求超时(秒)")
+    parser.add_argument("--output", help="JSON结果输出路径(默认打印到标准输出)")
+    args = parser.parse_args()
+    args.concurrency_levels = [int(v) for v in args.concurrency.split(",")]
+
+    results = asyncio.run(run(args))
+    print_table(results)
+    config = {k: v for k, v in vars(args).items() if k != "concurrency_levels"}
+    write_results(args.output, "http", config, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""识别流水线分阶段基准测试
+
+在进程内直接调用各处理阶段,测量延迟分位数和吞吐量:
+preprocess / decode / detection / crop / recognition / extract / full,
+以及完整流程在不同并发数下的吞吐量。
+
+用法:
+    python -m benchmarks.bench_pipeline --output benchmarks/results/pipeline.json
+    python -m benchmarks.bench_pipeline --no-model     # 只测不依赖模型的阶段
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from benchmarks.common import (
+    TEXT_DENSITIES,
+    print_table,
+    summarize,
+    synthesize_image,
+    synthesize_text,
+    time_calls,
+    write_results,
+)
+from src.core.config import settings
+from src.core.deadline import Deadline
+from src.services.amount_extractor import extract_amount
+from src.services.image_processor import decode_image, extract_crops, preprocess_image
+from src.services.ocr_service import OCRService
+
+# 基准测试不受识别超时限制
+_NO_TIMEOUT_SEC = 3600
+
+
+def _parse_sizes(value: str) -> List[Tuple[int, int]]:
+    """解析尺寸列表,如 "640x480,4032x3024" """
+    sizes = []
+    for item in value.split(","):
+        width, height = item.lower().split("x")
+        sizes.append((int(width), int(height)))
+    return sizes
+
+
+def _parse_ints(value: str) -> List[int]:
+    return [int(item) for item in value.split(",")]
+
+
+def _result(name: str, stats: Dict, **extra) -> Dict:
+    return {"name": name, **extra, **stats}
+
+
+def bench_model_free(cases, iterations: int, warmup: int) -> List[Dict]:
+    """不依赖模型的阶段: preprocess / decode / extract"""
+    results = []
+    for (width, height), density, image_bytes in cases:
+        case = f"{width}x{height}/{density}"
+        results.append(_result(
+            f"preprocess[{case}]",
+            time_calls(lambda: preprocess_image(image_bytes), iterations, warmup),
+            stage="preprocess", width=width, height=height, density=density
+        ))
+        results.append(_result(
+            f"decode[{case}]",
+            time_calls(lambda: decode_image(image_bytes), iterations, warmup),
+            stage="decode", width=width, height=height, density=density
+        ))
+
+    for density in TEXT_DENSITIES:
+        raw_text = synthesize_text(density)
+        results.append(_result(
+            f"extract[{density}]",
+            time_calls(lambda: extract_amount(raw_text), iterations * 100, warmup),
+            stage="extract", density=density, text_length=len(raw_text)
+        ))
+    return results
+
+
+def bench_model_stages(service: OCRService, cases, iterations: int, warmup: int) -> List[Dict]:
+    """依赖模型的阶段: detection / crop / recognition / full"""
+    results = []
+    for (width, height), density, image_bytes in cases:
+        case = f"{width}x{height}/{density}"
+        img_array = decode_image(image_bytes)
+
+        with service.engine_pool.checkout() as engine:
+            results.append(_result(
+                f"detection[{case}]",
+                time_calls(
+                    lambda: engine.text_detector.predict(input=img_array), iterations, warmup
+                ),
+                stage="detection", width=width, height=height, density=density
+            ))
+            det_result = engine.text_detector.predict(input=img_array)
+
+        polys = det_result[0]["dt_polys"] if det_result else []
+
+        def crop():
+            return extract_crops(
+                img_array, polys, mode=settings.OCR_CROP_MODE, padding=settings.OCR_CROP_PADDING
+            )
+
+        results.append(_result(
+            f"crop[{case}]",
+            time_calls(crop, iterations, warmup),
+            stage="crop", width=width, height=height, density=density, num_crops=len(polys)
+        ))
+
+        crops = crop() or [img_array]
+        results.append(_result(
+            f"recognition[{case}]",
+            time_calls(lambda: service._predict_recognition(crops), iterations, warmup),
+            stage="recognition", width=width, height=height, density=density, num_crops=len(crops)
+        ))
+
+        results.append(_result(
+            f"full[{case}]",
+            time_calls(
+                lambda: service.recognize_amount(image_bytes, deadline=Deadline(_NO_TIMEOUT_SEC)),
+                iterations,
+                warmup
+            ),
+            stage="full", width=width, height=height, density=density
+        ))
+    return results
+
+
+def bench_concurrency(
+    service: OCRService,
+    image_bytes: bytes,
+    levels: List[int],
+    requests: int
+) -> List[Dict]:
+    """完整流程在不同并发数下的吞吐量"""
+    results = []
+
+    def call() -> float:
+        start = time.perf_counter()
+        service.recognize_amount(image_bytes, deadline=Deadline(_NO_TIMEOUT_SEC))
+        return time.perf_counter() - start
+
+    for level in levels:
+        with ThreadPoolExecutor(max_workers=level) as pool:
+            start = time.perf_counter()
+            latencies = list(pool.map(lambda _: call(), range(requests)))
+            wall = time.perf_counter() - start
+        results.append(_result(
+            f"full_concurrent[c={level}]",
+            summarize(latencies, wall),
+            stage="full", concurrency=level
+        ))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="识别流水线分阶段基准测试")
+    parser.add_argument("--sizes", default="640x480,1280x960,4032x3024", help="图片尺寸列表")
+    parser.add_argument("--densities", default=",".join(TEXT_DENSITIES), help="文字密度列表")
+    parser.add_argument("--iterations", type=int, default=20, help="每项计时调用次数")
+    parser.add_argument("--warmup", type=int, default=2, help="每项预热调用次数")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="完整流程并发数列表")
+    parser.add_argument("--requests", type=int, default=64, help="每个并发级别的请求数")
+    parser.add_argument("--no-model", action="store_true", help="只测不依赖模型的阶段")
+    parser.add_argument("--output", help="JSON结果输出路径(默认打印到标准输出)")
+    args = parser.parse_args()
+
+    sizes = _parse_sizes(args.sizes)
+    densities = args.densities.split(",")
+    cases = [
+        ((width, height), density, synthesize_image(width, height, density))
+        for width, height in sizes
+        for density in densities
+    ]
+
+    results = bench_model_free(cases, args.iterations, args.warmup)
+
+    if not args.no_model:
+        service = OCRService()
+        # 关闭结果缓存,测量真实推理耗时
+        service.result_cache = None
+        service.perceptual_cache = None
+        service.crop_cache = None
+        results += bench_model_stages(service, cases, args.iterations, args.warmup)
+        concurrency_image = synthesize_image(*sizes[0], densities[0])
+        results += bench_concurrency(
+            service, concurrency_image, _parse_ints(args.concurrency), args.requests
+        )
+
+    print_table(results)
+    write_results(args.output, "pipeline", {
+        **vars(args),
+        "image_max_dimension": settings.IMAGE_MAX_DIMENSION,
+        "image_resample": settings.IMAGE_RESAMPLE,
+        "crop_mode": settings.OCR_CROP_MODE,
+        "engine_pool_size": settings.OCR_ENGINE_POOL_SIZE,
+        "micro_batch_enabled": settings.OCR_MICRO_BATCH_ENABLED,
+    }, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""基准测试公共工具
+
+合成测试图片、统计延迟分位数、输出/对比JSON结果。
+"""
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import psutil
+from PIL import Image, ImageDraw
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "tests" / "fixtures"))
+
+from generate_test_images import load_font  # noqa: E402
+
+# 文字密度 -> 每张图片的文本行数
+TEXT_DENSITIES = {
+    "sparse": 1,
+    "medium": 8,
+    "dense": 30,
+}
+
+# 收据样式的干扰行
+_FILLER_LINES = (
+    "商品名称 数量 单价",
+    "会员卡号 6222 0000 1234",
+    "日期 2024-03-15 14:32",
+    "电话 021-68889999",
+    "订单号 NO.20240315001",
+    "小计 {amount}",
+    "优惠 -5.00",
+)
+
+
+@lru_cache(maxsize=None)
+def _font(font_size: int):
+    """按字号缓存字体(load_font每次调用都会打印日志)"""
+    return load_font(font_size)
+
+
+def synthesize_text(density: str = "sparse", amount: str = "1234.56", seed: int = 0) -> str:
+    """合成与synthesize_image内容一致的OCR原始文本(用于金额提取基准)
+
+    Args:
+        density: 文字密度(sparse/medium/dense)
+        amount: 文本中的金额
+        seed: 随机种子
+
+    Returns:
+        以空格拼接的文本行
+    """
+    lines = TEXT_DENSITIES[density]
+    rng = random.Random(seed)
+    amount_line = lines - 1 if lines > 1 else 0
+    texts = [
+        f"合计 ¥{amount}" if i == amount_line else rng.choice(_FILLER_LINES).format(amount=amount)
+        for i in range(lines)
+    ]
+    return " ".join(texts)
+
+
+def synthesize_image(
+    width: int,
+    height: int,
+    density: str = "sparse",
+    amount: str = "1234.56",
+    image_format: str = "JPEG",
+    seed: int = 0
+) -> bytes:
+    """合成带金额文本的测试图片
+
+    Args:
+        width: 图片宽度
+        height: 图片高度
+        density: 文字密度(sparse/medium/dense)
+        amount: 图片中的金额
+        image_format: 输出格式(JPEG/PNG/BMP)
+        seed: 随机种子(决定干扰行内容)
+
+    Returns:
+        编码后的图片字节数据
+    """
+    lines = TEXT_DENSITIES[density]
+    rng = random.Random(seed)
+    img = Image.new("RGB", (width, height), color="white")
+    draw = ImageDraw.Draw(img)
+
+    line_height = max(12, height // (lines + 2))
+    font = _font(max(10, int(line_height * 0.6)))
+    amount_line = lines - 1 if lines > 1 else 0
+
+    for i in range(lines):
+        if i == amount_line:
+            text = f"合计 ¥{amount}"
+        else:
+            text = rng.choice(_FILLER_LINES).format(amount=amount)
+        draw.text((width // 10, line_height * (i + 1)), text, fill="black", font=font)
+
+    buffer = io.BytesIO()
+    if image_format == "JPEG":
+        img.save(buffer, format=image_format, quality=90)
+    else:
+        img.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """线性插值计算分位数
+
+    Args:
+        sorted_values: 已排序的样本
+        q: 分位(0-100)
+
+    Returns:
+        分位数值
+    """
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(
+    latencies_sec: Sequence[float],
+    wall_time_sec: Optional[float] = None
+) -> Dict[str, float]:
+    """统计延迟分布和吞吐量
+
+    Args:
+        latencies_sec: 每次调用的耗时(秒)
+        wall_time_sec: 总耗时(秒),并发测试时传入;默认为各次耗时之和
+
+    Returns:
+        统计结果(延迟单位为毫秒)
+    """
+    values = sorted(latencies_sec)
+    count = len(values)
+    wall = wall_time_sec if wall_time_sec is not None else sum(values)
+    return {
+        "count": count,
+        "mean_ms": round(sum(values) / count * 1000, 4) if count else 0.0,
+        "min_ms": round(values[0] * 1000, 4) if count else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 4),
+        "p95_ms": round(percentile(values, 95) * 1000, 4),
+        "p99_ms": round(percentile(values, 99) * 1000, 4),
+        "max_ms": round(values[-1] * 1000, 4) if count else 0.0,
+        "throughput_per_sec": round(count / wall, 3) if wall > 0 else 0.0,
+    }
+
+
+def time_calls(func: Callable[[], object], iterations: int, warmup: int = 1) -> Dict[str, float]:
+    """串行重复调用并统计耗时
+
+    Args:
+        func: 被测函数(无参数)
+        iterations: 计时调用次数
+        warmup: 预热调用次数(不计时)
+
+    Returns:
+        统计结果
+    """
+    for _ in range(warmup):
+        func()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def _git_commit() -> Optional[str]:
+    """当前代码版本"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            stderr=subprocess.DEVNULL,
+            text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def environment_info() -> Dict[str, object]:
+    """运行环境信息(写入结果文件,便于对比时确认环境一致)"""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "physical_cores": psutil.cpu_count(logical=False),
+        "logical_cores": psutil.cpu_count(logical=True),
+        "git_commit": _git_commit(),
+    }
+
+
+def write_results(path: Optional[str], benchmark: str, config: Dict, results: List[Dict]) -> Dict:
+    """输出JSON结果
+
+    Args:
+        path: 输出文件路径,为None时只打印到标准输出
+        benchmark: 基准测试名称
+        config: 测试参数
+        results: 各测试项结果,每项包含name字段
+
+    Returns:
+        完整结果
+    """
+    payload = {
+        "benchmark": benchmark,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment_info(),
+        "config": config,
+        "results": results,
+    }
+    text = json.dumps(payload, ensure_ascii=False, indent=2)
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"results written to {path}", file=sys.stderr)
+    else:
+        print(text)
+    return payload
+
+
+def print_table(results: List[Dict]) -> None:
+    """在标准错误输出打印结果摘要表"""
+    header = f"{'name':<48} {'count':>6} {'p50_ms':>10} {'p95_ms':>10} {'p99_ms':>10} {'ops/s':>10}"
+    print(header, file=sys.stderr)
+    print("-" * len(header), file=sys.stderr)
+    for result in results:
+        print(
+            f"{result['name']:<48} {result['count']:>6} {result['p50_ms']:>10.2f} "
+            f"{result['p95_ms']:>10.2f} {result['p99_ms']:>10.2f} "
+            f"{result['throughput_per_sec']:>10.2f}",
+            file=sys.stderr
+        )
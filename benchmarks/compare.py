@@ -0,0 +1,78 @@
+"""对比两次基准测试结果
+
+按测试项名称对齐,输出p50/p95/p99和吞吐量的变化,延迟变慢或吞吐量下降
+超过阈值时以非零状态码退出,可用于CI回归检查。
+
+用法:
+    python -m benchmarks.compare baseline.json current.json --threshold 10
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List
+
+# 越大越差的指标
+_LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def _load(path: str) -> Dict[str, Dict]:
+    with open(path, encoding="utf-8") as f:
+        return {result["name"]: result for result in json.load(f)["results"]}
+
+
+def _change(old: float, new: float) -> float:
+    """变化百分比"""
+    if old == 0:
+        return 0.0
+    return (new - old) / old * 100
+
+
+def compare(baseline: Dict[str, Dict], current: Dict[str, Dict], threshold: float) -> List[Dict]:
+    """对比结果
+
+    Args:
+        baseline: 基线结果(名称 -> 结果)
+        current: 当前结果(名称 -> 结果)
+        threshold: 回归阈值(百分比)
+
+    Returns:
+        各测试项的对比结果
+    """
+    rows = []
+    for name in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[name], current[name]
+        changes = {metric: _change(old[metric], new[metric]) for metric in _LATENCY_METRICS}
+        changes["throughput_per_sec"] = _change(
+            old["throughput_per_sec"], new["throughput_per_sec"]
+        )
+        regressed = (
+            any(changes[metric] > threshold for metric in _LATENCY_METRICS)
+            or changes["throughput_per_sec"] < -threshold
+        )
+        rows.append({"name": name, "changes": changes, "regressed": regressed})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="对比两次基准测试结果")
+    parser.add_argument("baseline", help="基线结果JSON")
+    parser.add_argument("current", help="当前结果JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="回归阈值(百分比)")
+    args = parser.parse_args()
+
+    rows = compare(_load(args.baseline), _load(args.current), args.threshold)
+    print(f"{'name':<48} {'p50':>9} {'p95':>9} {'p99':>9} {'ops/s':>9}")
+    for row in rows:
+        changes = row["changes"]
+        marker = "  REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['name']:<48} {changes['p50_ms']:>+8.1f}% {changes['p95_ms']:>+8.1f}% "
+            f"{changes['p99_ms']:>+8.1f}% {changes['throughput_per_sec']:>+8.1f}%{marker}"
+        )
+
+    if any(row["regressed"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Gunicorn多进程部署配置
+
+预加载(pre-fork)模式: master进程先加载OCR模型,再fork出worker进程,
+各worker通过写时复制(copy-on-write)共享模型权重,常驻内存不随worker数成倍增长。
+
+启动方式:
+    gunicorn -c gunicorn.conf.py main:app
+
+worker数由 OCR_WORKER_PROCESSES 配置,每个worker的推理线程数自动按
+物理核心数/(worker数×引擎组数) 计算。
+"""
+import gc
+import os
+import tempfile
+
+from src.core.config import settings
+
+# 多进程指标: 各worker把指标写入共享目录,/metrics汇总全部worker
+# (须在导入prometheus_client之前设置,未指定时每次启动使用新的空目录)
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="cash-eye-metrics-"))
+
+# 监听地址
+bind = f"{settings.HOST}:{settings.PORT}"
+
+# worker配置
+workers = settings.OCR_WORKER_PROCESSES
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# fork前导入应用,模型在when_ready中加载后由所有worker共享
+preload_app = True
+
+# worker启动后在后台预热,心跳不受影响;关闭时等待处理中的请求完成
+timeout = 60
+graceful_timeout = settings.REQUEST_TIMEOUT_SEC
+keepalive = 5
+
+# 日志输出到标准输出(由structlog统一格式化应用日志)
+accesslog = None
+errorlog = "-"
+loglevel = settings.LOG_LEVEL.lower()
+
+
+def when_ready(server):
+    """master进程就绪后、fork worker前执行"""
+    if settings.OCR_PRELOAD_ENGINES:
+        from src.services.ocr_service import preload_engines
+        preload_engines()
+
+    # 将已加载的对象移入永久代,避免worker中的垃圾回收改写对象头触发页面复制
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    """worker退出后清理其仪表盘指标,计数器和直方图保留累计值"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
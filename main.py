@@ -1,18 +1,42 @@
 """应用入口文件"""
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST
 
+from src.core import metrics
 from src.core.config import settings
 from src.core.logging import configure_logging, get_logger
+from src.core.readiness import mark_ready, mark_not_ready
 from src.api import routes
+from src.api.middleware import RequestSizeLimitMiddleware
+from src.services.executor import shutdown_inference_executor
+from src.services.health import get_health_monitor
+from src.services.ocr_service import load_and_warm_up
 
 # 配置日志
 configure_logging()
 logger = get_logger(__name__)
 
 
+async def _load_engines() -> None:
+    """后台加载并预热OCR引擎,完成后标记服务就绪"""
+    try:
+        # 模型加载和预热为阻塞操作,放到线程中执行以便存活探针正常响应
+        await asyncio.to_thread(load_and_warm_up)
+        mark_ready()
+        logger.info("service_ready")
+        # 引擎就绪后立即自检一次,不必等到下一个自检周期
+        await get_health_monitor().refresh()
+    except Exception as e:
+        mark_not_ready("engine_load_failed")
+        get_health_monitor().record_failure(str(e))
+        logger.error("ocr_engine_load_failed", error=str(e))
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
@@ -23,9 +47,41 @@ async def lifespan(app: FastAPI):
         version=settings.SERVICE_VERSION,
         port=settings.PORT
     )
+
+    load_task = None
+    if settings.OCR_EAGER_LOAD:
+        mark_not_ready("warming_up")
+        load_task = asyncio.create_task(_load_engines())
+    else:
+        # 懒加载模式:首个请求时加载模型
+        mark_ready()
+
+    # 后台定期自检引擎,/health只读取自检结果
+    health_monitor = get_health_monitor()
+    health_monitor.start()
+
+    # 异步识别任务的后台执行协程
+    job_manager = None
+    if settings.JOBS_ENABLED:
+        job_manager = routes.start_job_manager()
+        if settings.OCR_WORKER_PROCESSES > 1:
+            # 任务保存在各worker内存中,查询请求可能落到没有该任务的worker
+            logger.warning(
+                "jobs_not_shared_across_workers",
+                workers=settings.OCR_WORKER_PROCESSES,
+                hint="set OCR_WORKER_PROCESSES=1 or JOBS_ENABLED=false"
+            )
+
     yield
     # 关闭时
     logger.info("service_stopping")
+    mark_not_ready("stopping")
+    if load_task is not None and not load_task.done():
+        load_task.cancel()
+    if job_manager is not None:
+        await job_manager.stop()
+    await health_monitor.stop()
+    shutdown_inference_executor()
 
 
 # 创建FastAPI应用
@@ -48,6 +104,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 请求体大小限制(读取请求体时累计检查,超过限制立即中止,不等解析完整个上传内容);
+# 单张识别的multipart上传只需容纳一个文件,批量上限只用于批量和任务接口
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    max_body_bytes=settings.max_request_bytes,
+    multipart_limits={"/api/v1/recognize": settings.max_upload_request_bytes}
+)
+
 # 注册路由
 app.include_router(routes.router, prefix="/api/v1")
 
@@ -60,3 +124,9 @@ async def root():
         "version": settings.SERVICE_VERSION,
         "status": "running"
     }
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus指标"""
+    return PlainTextResponse(metrics.render_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,127 @@
+"""ASGI中间件"""
+import json
+from typing import Dict, Optional
+
+from fastapi import HTTPException, status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RequestSizeLimitMiddleware:
+    """请求体大小限制
+
+    声明了Content-Length的超大请求在读取请求体之前直接拒绝;未声明(分块传输)
+    或声明不实的请求在读取请求体时累计字节数,超过限制立即中止,
+    不会先把整个请求体缓冲到内存/临时文件中再校验。
+
+    multipart请求体由表单解析完整写入临时文件后才交给路由处理,可按路径设置
+    更小的multipart上限(如单张识别只需容纳一个文件);其他类型的请求体由路由
+    按输入类型的上限分块读取,只受全局上限约束。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_body_bytes: int,
+        multipart_limits: Optional[Dict[str, int]] = None
+    ):
+        """初始化中间件
+
+        Args:
+            app: 下游ASGI应用
+            max_body_bytes: 允许的最大请求体字节数(0表示不限制)
+            multipart_limits: 路径 -> 该路径multipart请求体的最大字节数
+        """
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.multipart_limits = multipart_limits or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self._get_limit(scope) if scope["type"] == "http" else 0
+        if limit <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = self._get_header(scope, b"content-length")
+        if content_length is not None and content_length.isdigit():
+            if int(content_length) > limit:
+                self._log_rejected(scope, int(content_length), limit)
+                await self._reject(send, int(content_length), limit)
+                return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    self._log_rejected(scope, received, limit)
+                    # 由应用的异常处理返回413(请求体解析会原样抛出HTTPException)
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=self._error_detail(received, limit, at_least=True)
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    def _get_header(scope: Scope, header: bytes) -> Optional[str]:
+        """读取请求头(不存在时返回None)"""
+        for name, value in scope.get("headers", []):
+            if name == header:
+                return value.decode("latin-1").strip()
+        return None
+
+    def _get_limit(self, scope: Scope) -> int:
+        """当前请求的请求体上限(字节),0表示不限制"""
+        limit = self.multipart_limits.get(scope.get("path"))
+        if limit is None:
+            return self.max_body_bytes
+        content_type = self._get_header(scope, b"content-type") or ""
+        if not content_type.lower().startswith("multipart/form-data"):
+            return self.max_body_bytes
+        return limit
+
+    @staticmethod
+    def _log_rejected(scope: Scope, size_bytes: int, limit: int) -> None:
+        """记录被拒绝的超大请求"""
+        logger.warning(
+            "request_too_large",
+            path=scope.get("path"),
+            size_bytes=size_bytes,
+            limit=limit
+        )
+
+    @staticmethod
+    def _error_detail(size_bytes: int, limit: int, at_least: bool = False) -> dict:
+        """构造413错误详情(与HTTPException的响应格式一致)"""
+        size_mb = size_bytes / (1024 * 1024)
+        return {
+            "code": "REQUEST_TOO_LARGE",
+            "message": f"请求体大小超过{limit / (1024 * 1024):g}MB限制",
+            "details": f"当前大小: {'超过' if at_least else ''}{size_mb:.2f}MB"
+        }
+
+    async def _reject(self, send: Send, content_length: int, limit: int) -> None:
+        """返回413错误"""
+        body = json.dumps(
+            {"detail": self._error_detail(content_length, limit)},
+            ensure_ascii=False
+        ).encode("utf-8")
+
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
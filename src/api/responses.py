@@ -0,0 +1,78 @@
+"""JSON响应序列化
+
+识别结果模型直接由pydantic-core序列化为JSON字节,跳过FastAPI对返回值的二次校验
+和jsonable_encoder转换。
+"""
+from typing import Any, Dict, Optional, Set
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# 精简模式下省略的识别结果字段(原始文本通常占响应体积的大部分)
+VERBOSE_RESULT_FIELDS = {"raw_text", "warnings"}
+
+
+def _result_exclude(compact: bool, timings: bool) -> Set[str]:
+    """识别结果中需要省略的字段"""
+    fields = set(VERBOSE_RESULT_FIELDS) if compact else set()
+    if not timings:
+        fields.add("timings")
+    return fields
+
+
+def item_exclude(compact: bool = False, timings: bool = False) -> Dict[str, Any]:
+    """单项结果(RecognitionResponse/BatchItemResult)的排除规则
+
+    Args:
+        compact: 是否省略raw_text和warnings
+        timings: 是否保留各阶段耗时
+
+    Returns:
+        pydantic exclude格式的排除规则
+    """
+    return {"data": _result_exclude(compact, timings)}
+
+
+def results_exclude(compact: bool = False, timings: bool = False) -> Dict[str, Any]:
+    """批量结果(BatchRecognitionResponse/JobResponse)的排除规则
+
+    Args:
+        compact: 是否省略每项结果的raw_text和warnings
+        timings: 是否保留每项结果的各阶段耗时
+
+    Returns:
+        pydantic exclude格式的排除规则
+    """
+    return {"data": {"results": {"__all__": item_exclude(compact, timings)}}}
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    """将各阶段耗时格式化为Server-Timing响应头
+
+    Args:
+        timings: 阶段名称 -> 耗时(秒)
+
+    Returns:
+        Server-Timing头的值,如"decode;dur=1.2, detection;dur=35.8"
+    """
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+
+class ModelResponse(JSONResponse):
+    """由pydantic模型直接序列化的JSON响应"""
+
+    def __init__(self, content: BaseModel, exclude: Optional[Any] = None, **kwargs):
+        """初始化响应
+
+        Args:
+            content: 响应模型
+            exclude: 序列化时排除的字段(pydantic exclude格式)
+            **kwargs: 传递给JSONResponse的参数(status_code/headers等)
+        """
+        self.exclude = exclude
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json(exclude=self.exclude).encode("utf-8")
+        return super().render(content)
@@ -1,32 +1,257 @@
 """API路由定义"""
-from typing import List
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
+import asyncio
+import functools
+import json
+import sys
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+import numpy as np
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
 
 from src.api.schemas import (
+    Base64Image,
+    Base64BatchRequest,
     RecognitionResponse,
     RecognitionResult,
+    StageTimings,
     BatchRecognitionResponse,
     BatchRecognitionResult,
     BatchItemResult,
+    JobResponse,
+    JobResult,
     HealthCheckResponse,
+    ReadinessResponse,
     ErrorDetail,
 )
+from src.api.responses import ModelResponse, item_exclude, results_exclude, server_timing
 from src.core.config import settings
+from src.core.deadline import Deadline
 from src.core.logging import get_logger
+from src.core.metrics import OCR_TIMEOUTS, OCR_ERRORS
+from src.core.readiness import is_ready, get_readiness_reason
 from src.core.uptime import get_uptime
-from src.services.ocr_service import get_ocr_service, TimeoutException
-from src.utils.validators import validate_upload_file
+from src.services.executor import get_inference_executor, QueueFullException
+from src.services.health import get_health_monitor
+from src.services.jobs import Job, JobItem, JobManager, JobQueueFullException, get_job_manager
+from src.services.ocr_service import get_ocr_service, is_ocr_service_loaded, TimeoutException
+from src.utils.validators import (
+    decode_base64_image,
+    parse_raw_pixels,
+    read_request_body,
+    validate_image_bytes,
+    validate_upload_file,
+)
 
 logger = get_logger(__name__)
 router = APIRouter()
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+async def _recognize_content(
+    content: Union[bytes, np.ndarray],
+    filename: str,
+    timings: Optional[Dict[str, float]] = None
+) -> Tuple[Optional[str], float, int, Optional[str], List[str]]:
+    """在推理执行器中识别金额,避免阻塞事件循环
+
+    Args:
+        content: 图片字节数据或像素数组
+        filename: 文件名
+        timings: 可选,写入排队和各处理阶段耗时(秒)
+
+    Returns:
+        (金额, 置信度, 处理时间ms, 原始文本, 警告列表)元组
+
+    Raises:
+        QueueFullException: 推理队列已满
+        TimeoutException: 识别超时
+    """
+    executor = get_inference_executor()
+
+    # 首次调用时在执行器中加载模型(不计入识别超时);已加载时直接获取,
+    # 不占用准入名额和线程切换
+    if is_ocr_service_loaded():
+        ocr_service = get_ocr_service()
+    else:
+        ocr_service = await executor.run(get_ocr_service)
+
+    # 截止时间从进入推理队列开始计算,排队和各处理阶段共享同一期限
+    deadline = Deadline(settings.OCR_TIMEOUT_SEC)
+    try:
+        return await executor.run(
+            functools.partial(
+                ocr_service.recognize_amount, content, filename, deadline=deadline, timings=timings
+            ),
+            deadline=deadline,
+            timings=timings
+        )
+    except TimeoutException:
+        OCR_TIMEOUTS.inc()
+        raise
+    except QueueFullException:
+        OCR_ERRORS.labels(type="queue_full").inc()
+        raise
+    except ValueError:
+        OCR_ERRORS.labels(type="invalid_image").inc()
+        raise
+    except Exception:
+        OCR_ERRORS.labels(type="engine_error").inc()
+        raise
+
+
+def _stage_timings(timings: Dict[str, float]) -> StageTimings:
+    """将各阶段耗时(秒)转换为响应中的毫秒数"""
+    return StageTimings(**{
+        f"{stage}_ms": round(seconds * 1000, 2)
+        for stage, seconds in timings.items()
+        if f"{stage}_ms" in StageTimings.model_fields
+    })
+
+
+# 非multipart请求体为编码图片时接受的Content-Type(另有image/*)
+RAW_IMAGE_MEDIA_TYPE = "application/octet-stream"
+
+# JSON请求体中base64编码额外占用的空间(约4/3)和字段开销
+_BASE64_OVERHEAD = 4 / 3
+_JSON_OVERHEAD_BYTES = 64 * 1024
+
+
+def _media_type(request: Request) -> str:
+    """请求体的媒体类型(不含参数)"""
+    return request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+
+def _no_file_provided() -> HTTPException:
+    """未提供图片(与缺少必填字段的校验错误保持相同状态码)"""
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail={
+            "code": "NO_FILE_PROVIDED",
+            "message": "未提供文件"
+        }
+    )
+
+
+def _unsupported_media_type(media_type: str) -> HTTPException:
+    """不支持的请求体类型"""
+    return HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail={
+            "code": "UNSUPPORTED_MEDIA_TYPE",
+            "message": f"不支持的请求体类型: {media_type}",
+            "details": "支持multipart/form-data、application/json、application/octet-stream和image/*"
+        }
+    )
+
+
+def _max_request_bytes() -> int:
+    """请求体上限(字节)"""
+    return settings.max_request_bytes or sys.maxsize
+
+
+def _parse_json_body(body: bytes, model: Type[ModelT]) -> ModelT:
+    """解析并校验JSON请求体"""
+    try:
+        return model.model_validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code": "INVALID_REQUEST",
+                "message": "JSON请求体格式无效",
+                "details": str(e)
+            }
+        )
+
+
+async def _read_image_input(
+    request: Request,
+    file: Optional[UploadFile]
+) -> Tuple[Union[bytes, np.ndarray], str]:
+    """按Content-Type读取单张图片
+
+    - multipart/form-data: file字段上传的图片
+    - application/json: {"image": base64, "filename": 可选}
+    - application/octet-stream / image/*: 请求体即编码图片;application/octet-stream
+      带X-Image-Shape头时请求体为原始uint8像素(通道顺序由X-Pixel-Format指定,默认rgb)
+
+    非multipart请求的文件名取X-Filename头。
+
+    Args:
+        request: 请求
+        file: multipart上传的文件
+
+    Returns:
+        (图片字节数据或像素数组, 文件名)元组
+
+    Raises:
+        HTTPException: 未提供图片、请求体类型不支持或验证失败
+    """
+    media_type = _media_type(request)
+    filename = request.headers.get("x-filename", "upload")
+
+    if media_type == "multipart/form-data":
+        if file is None:
+            raise _no_file_provided()
+        return await validate_upload_file(file)
+
+    if media_type == "application/json":
+        max_bytes = int(settings.MAX_FILE_SIZE_BYTES * _BASE64_OVERHEAD) + _JSON_OVERHEAD_BYTES
+        payload = _parse_json_body(await read_request_body(request, max_bytes), Base64Image)
+        return decode_base64_image(payload.image), payload.filename or filename
+
+    if media_type == RAW_IMAGE_MEDIA_TYPE and "x-image-shape" in request.headers:
+        body = await read_request_body(request, settings.MAX_RAW_IMAGE_SIZE_BYTES)
+        pixels = parse_raw_pixels(
+            body,
+            request.headers["x-image-shape"],
+            request.headers.get("x-pixel-format", "rgb").lower()
+        )
+        return pixels, filename
+
+    if media_type == RAW_IMAGE_MEDIA_TYPE or media_type.startswith("image/"):
+        body = await read_request_body(request, settings.MAX_FILE_SIZE_BYTES)
+        if not body:
+            raise _no_file_provided()
+        return validate_image_bytes(body), filename
+
+    if not media_type:
+        raise _no_file_provided()
+    raise _unsupported_media_type(media_type)
+
 
 @router.post("/recognize", response_model=RecognitionResponse)
-async def recognize(file: UploadFile = File(...)):
+async def recognize(
+    request: Request,
+    file: Optional[UploadFile] = File(None),
+    compact: bool = False,
+    timings: bool = False
+):
     """单张图片金额识别
 
+    按Content-Type接受multipart上传、JSON base64、原始图片字节或原始像素,
+    后三种方式省去multipart解析,像素输入还省去编码和解码。
+    SERVER_TIMING_ENABLED时各阶段耗时同时写入Server-Timing响应头。
+
     Args:
-        file: 上传的图片文件
+        request: 请求(非multipart输入从请求体读取)
+        file: 上传的图片文件(multipart/form-data)
+        compact: 是否省略raw_text和warnings字段
+        timings: 是否在结果中返回各阶段耗时
 
     Returns:
         识别结果
@@ -34,44 +259,61 @@ async def recognize(file: UploadFile = File(...)):
     Raises:
         HTTPException: 验证失败或识别失败时抛出
     """
+    filename = file.filename if file is not None else request.headers.get("x-filename", "upload")
     try:
-        # 1. 验证文件
-        content, filename = await validate_upload_file(file)
-
-        # 2. 获取OCR服务
-        ocr_service = get_ocr_service()
+        # 1. 读取并验证输入
+        content, filename = await _read_image_input(request, file)
 
-        # 3. 识别金额
-        amount, confidence, processing_time, raw_text, warnings = ocr_service.recognize_amount(
-            content, filename
+        # 2. 识别金额(在推理执行器中执行)
+        stage_timings = {}
+        amount, confidence, processing_time, raw_text, warnings = await _recognize_content(
+            content, filename, stage_timings
         )
 
-        # 4. 构造响应
-        return RecognitionResponse(
-            success=True,
-            data=RecognitionResult(
-                amount=amount,
-                confidence=confidence,
-                processing_time_ms=processing_time,
-                raw_text=raw_text,
-                warnings=warnings
-            )
+        # 3. 构造响应
+        headers = None
+        if settings.SERVER_TIMING_ENABLED:
+            headers = {"Server-Timing": server_timing(stage_timings)}
+        return ModelResponse(
+            RecognitionResponse(
+                success=True,
+                data=RecognitionResult(
+                    amount=amount,
+                    confidence=confidence,
+                    processing_time_ms=processing_time,
+                    raw_text=raw_text,
+                    warnings=warnings,
+                    timings=_stage_timings(stage_timings) if timings else None
+                )
+            ),
+            exclude=item_exclude(compact, timings),
+            headers=headers
         )
 
     except HTTPException:
         raise
+    except QueueFullException as e:
+        logger.warning("ocr_queue_full", filename=filename, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "code": "SERVICE_BUSY",
+                "message": "服务繁忙,请稍后重试",
+                "details": str(e)
+            }
+        )
     except TimeoutException as e:
-        logger.error("ocr_timeout", filename=file.filename, error=str(e))
+        logger.error("ocr_timeout", filename=filename, error=str(e))
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail={
                 "code": "TIMEOUT",
                 "message": str(e),
-                "details": f"处理时间超过{settings.OCR_TIMEOUT_SEC}秒限制"
+                "details": f"处理时间超过{settings.OCR_TIMEOUT_SEC:g}秒限制"
             }
         )
     except ValueError as e:
-        logger.error("invalid_image", filename=file.filename, error=str(e))
+        logger.error("invalid_image", filename=filename, error=str(e))
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={
@@ -81,7 +323,7 @@ async def recognize(file: UploadFile = File(...)):
             }
         )
     except Exception as e:
-        logger.error("ocr_engine_error", filename=file.filename, error=str(e))
+        logger.error("ocr_engine_error", filename=filename, error=str(e))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -92,135 +334,597 @@ async def recognize(file: UploadFile = File(...)):
         )
 
 
-@router.post("/recognize/batch", response_model=BatchRecognitionResponse)
-async def recognize_batch(files: List[UploadFile] = File(...)):
-    """批量图片金额识别
+def _batch_item_error(
+    index: int,
+    filename: str,
+    code: str,
+    message: str,
+    details: Optional[str] = None
+) -> BatchItemResult:
+    """构造批量识别的失败项"""
+    return BatchItemResult(
+        index=index,
+        filename=filename,
+        success=False,
+        data=None,
+        error=ErrorDetail(code=code, message=message, details=details)
+    )
+
+
+async def _completed(result: BatchItemResult) -> BatchItemResult:
+    """将已确定的结果包装为可等待对象"""
+    return result
+
+
+async def _recognize_when_admitted(
+    content: bytes,
+    filename: str,
+    timings: Optional[Dict[str, float]] = None
+) -> Tuple[Optional[str], float, int, Optional[str], List[str]]:
+    """识别金额,推理队列已满时按指数退避等待,直到执行器接纳
+
+    Args:
+        content: 图片字节数据
+        filename: 文件名
+        timings: 可选,写入排队和各处理阶段耗时(秒)
+
+    Returns:
+        (金额, 置信度, 处理时间ms, 原始文本, 警告列表)元组
+    """
+    delay = settings.JOB_RETRY_BACKOFF_SEC
+    while True:
+        try:
+            return await _recognize_content(content, filename, timings)
+        except QueueFullException:
+            logger.debug("job_item_waiting_for_capacity", filename=filename, delay_sec=delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.JOB_RETRY_MAX_BACKOFF_SEC)
+
+
+async def _recognize_batch_item(
+    index: int,
+    filename: str,
+    content: bytes,
+    semaphore: asyncio.Semaphore,
+    include_timings: bool = False,
+    wait_for_capacity: bool = False
+) -> BatchItemResult:
+    """识别批量请求中的单张图片(受并发数限制)
+
+    Args:
+        index: 图片索引
+        filename: 文件名
+        content: 图片字节数据
+        semaphore: 限制同一批次并发识别数的信号量
+        include_timings: 是否在结果中返回各阶段耗时
+        wait_for_capacity: 推理队列已满时是否等待重试(异步任务),否则记为SERVICE_BUSY失败
+
+    Returns:
+        单项识别结果(失败时包含错误信息,不抛出异常)
+    """
+    stage_timings = {} if include_timings else None
+    recognize_content = _recognize_when_admitted if wait_for_capacity else _recognize_content
+    async with semaphore:
+        try:
+            amount, confidence, processing_time, raw_text, warnings = await recognize_content(
+                content, filename, stage_timings
+            )
+        except QueueFullException as e:
+            # 推理队列已满
+            logger.warning("batch_item_queue_full", index=index, filename=filename, error=str(e))
+            return _batch_item_error(index, filename, "SERVICE_BUSY", "服务繁忙,请稍后重试", str(e))
+        except Exception as e:
+            # 其他异常(识别失败)
+            logger.error("batch_item_ocr_failed", index=index, filename=filename, error=str(e))
+            return _batch_item_error(index, filename, "OCR_ENGINE_ERROR", "OCR引擎处理失败", str(e))
+
+    return BatchItemResult(
+        index=index,
+        filename=filename,
+        success=True,
+        data=RecognitionResult(
+            amount=amount,
+            confidence=confidence,
+            processing_time_ms=processing_time,
+            raw_text=raw_text,
+            warnings=warnings,
+            timings=_stage_timings(stage_timings) if include_timings else None
+        ),
+        error=None
+    )
+
+
+def _validation_failure(index: int, filename: str, error: BaseException) -> BatchItemResult:
+    """将单项验证异常转换为批量识别的失败项"""
+    if isinstance(error, HTTPException):
+        # HTTP异常(验证失败)
+        if isinstance(error.detail, dict):
+            error_detail = error.detail
+        else:
+            error_detail = {"code": "UNKNOWN", "message": str(error.detail)}
+        logger.warning(
+            "batch_item_validation_failed",
+            index=index,
+            filename=filename,
+            error=error_detail
+        )
+        return BatchItemResult(
+            index=index,
+            filename=filename,
+            success=False,
+            data=None,
+            error=ErrorDetail(**error_detail)
+        )
+    logger.error("batch_item_read_failed", index=index, filename=filename, error=str(error))
+    return _batch_item_error(index, filename, "INVALID_IMAGE", "图片无效或已损坏", str(error))
+
+
+async def _validate_batch_files(
+    files: List[UploadFile]
+) -> List[Tuple[int, str, Optional[bytes], Optional[BatchItemResult]]]:
+    """并发验证批量上传的文件
 
     Args:
         files: 上传的图片文件列表
 
     Returns:
-        批量识别结果
+        (索引, 文件名, 图片字节数据, 失败结果)列表;验证通过的项失败结果为None,
+        验证失败的项图片字节数据为None
+    """
+    validations = await asyncio.gather(
+        *(validate_upload_file(file) for file in files),
+        return_exceptions=True
+    )
+
+    items = []
+    for index, (file, validation) in enumerate(zip(files, validations)):
+        if isinstance(validation, BaseException):
+            failure = _validation_failure(index, file.filename, validation)
+            items.append((index, file.filename, None, failure))
+        else:
+            content, filename = validation
+            items.append((index, filename, content, None))
+    return items
+
+
+def _decode_batch_images(
+    images: List[Base64Image]
+) -> List[Tuple[int, str, Optional[bytes], Optional[BatchItemResult]]]:
+    """解码并验证JSON批量请求中的base64图片
+
+    Args:
+        images: base64图片列表
+
+    Returns:
+        格式同_validate_batch_files
     """
+    items = []
+    for index, image in enumerate(images):
+        filename = image.filename or f"image_{index}"
+        try:
+            items.append((index, filename, decode_base64_image(image.image), None))
+        except HTTPException as e:
+            items.append((index, filename, None, _validation_failure(index, filename, e)))
+    return items
+
+
+async def _read_batch_items(
+    request: Request,
+    files: List[UploadFile]
+) -> List[Tuple[int, str, Optional[bytes], Optional[BatchItemResult]]]:
+    """按Content-Type读取批量图片(multipart上传或JSON base64列表)
+
+    Args:
+        request: 请求
+        files: multipart上传的图片文件列表(非multipart请求时为空)
+
+    Returns:
+        (索引, 文件名, 图片字节数据, 失败结果)列表
+
+    Raises:
+        HTTPException: 未提供图片或请求体类型不支持
+    """
+    media_type = _media_type(request)
+    if media_type == "application/json":
+        payload = _parse_json_body(
+            await read_request_body(request, _max_request_bytes()),
+            Base64BatchRequest
+        )
+        if not payload.images:
+            raise _no_file_provided()
+        return _decode_batch_images(payload.images)
+
+    if media_type and media_type != "multipart/form-data":
+        raise _unsupported_media_type(media_type)
     if not files:
+        raise _no_file_provided()
+    return await _validate_batch_files(files)
+
+
+def _check_file_count(items: list, max_files: int) -> None:
+    """检查单个请求的图片数,超过限制时返回400"""
+    if len(items) > max_files:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={
-                "code": "NO_FILE_PROVIDED",
-                "message": "未提供文件"
+                "code": "TOO_MANY_FILES",
+                "message": "单个请求的图片数超过限制",
+                "details": f"最多{max_files}张,实际{len(items)}张"
             }
         )
 
-    ocr_service = get_ocr_service()
-    results = []
-    succeeded = 0
-    failed = 0
 
-    for index, file in enumerate(files):
-        try:
-            # 验证并识别
-            content, filename = await validate_upload_file(file)
-            amount, confidence, processing_time, raw_text, warnings = ocr_service.recognize_amount(
-                content, filename
-            )
+@router.post("/recognize/batch", response_model=BatchRecognitionResponse)
+async def recognize_batch(
+    request: Request,
+    files: List[UploadFile] = File([]),
+    compact: bool = False,
+    timings: bool = False
+):
+    """批量图片金额识别
 
-            results.append(BatchItemResult(
-                index=index,
-                filename=filename,
-                success=True,
-                data=RecognitionResult(
-                    amount=amount,
-                    confidence=confidence,
-                    processing_time_ms=processing_time,
-                    raw_text=raw_text,
-                    warnings=warnings
-                ),
-                error=None
-            ))
-            succeeded += 1
+    所有图片先并发验证,再以不超过BATCH_MAX_IN_FLIGHT的并发数送入推理执行器;
+    启用识别微批处理时,并发图片的裁剪图会合并为同一识别批次。
 
-        except HTTPException as e:
-            # HTTP异常(验证失败)
-            error_detail = e.detail if isinstance(e.detail, dict) else {"code": "UNKNOWN", "message": str(e.detail)}
-            results.append(BatchItemResult(
-                index=index,
-                filename=file.filename,
-                success=False,
-                data=None,
-                error=ErrorDetail(**error_detail)
-            ))
-            failed += 1
-            logger.warning("batch_item_validation_failed", index=index, filename=file.filename, error=error_detail)
+    Args:
+        request: 请求(JSON输入从请求体读取)
+        files: 上传的图片文件列表(multipart/form-data)
+        compact: 是否省略每项结果的raw_text和warnings字段
+        timings: 是否在每项结果中返回各阶段耗时
 
-        except Exception as e:
-            # 其他异常(识别失败)
-            results.append(BatchItemResult(
-                index=index,
-                filename=file.filename,
-                success=False,
-                data=None,
-                error=ErrorDetail(
-                    code="OCR_ENGINE_ERROR",
-                    message="OCR引擎处理失败",
-                    details=str(e)
-                )
-            ))
-            failed += 1
-            logger.error("batch_item_ocr_failed", index=index, filename=file.filename, error=str(e))
+    Returns:
+        批量识别结果(按原始顺序)
+    """
+    # 1. 读取并验证所有图片
+    items = await _read_batch_items(request, files)
+    _check_file_count(items, settings.BATCH_MAX_FILES)
+
+    # 2. 并发识别验证通过的文件
+    semaphore = asyncio.Semaphore(max(1, settings.BATCH_MAX_IN_FLIGHT))
+    tasks = [
+        _completed(failure) if failure is not None
+        else _recognize_batch_item(index, filename, content, semaphore, timings)
+        for index, filename, content, failure in items
+    ]
+
+    # gather保持提交顺序,结果与index一致
+    results = await asyncio.gather(*tasks)
+    succeeded = sum(1 for result in results if result.success)
+    failed = len(results) - succeeded
 
     logger.info(
         "batch_recognition_completed",
-        total=len(files),
+        total=len(items),
         succeeded=succeeded,
         failed=failed
     )
 
-    return BatchRecognitionResponse(
-        success=True,
-        data=BatchRecognitionResult(
-            total=len(files),
-            succeeded=succeeded,
-            failed=failed,
-            results=results
+    return ModelResponse(
+        BatchRecognitionResponse(
+            success=True,
+            data=BatchRecognitionResult(
+                total=len(items),
+                succeeded=succeeded,
+                failed=failed,
+                results=list(results)
+            )
+        ),
+        exclude=results_exclude(compact, timings)
+    )
+
+
+# 流式输出格式
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def _negotiate_stream_format(request: Request, format: Optional[str]) -> str:
+    """确定流式输出格式:显式指定的format参数优先,其次按Accept头"""
+    if format is not None:
+        return format
+    return "sse" if "text/event-stream" in request.headers.get("accept", "") else "ndjson"
+
+
+def _streaming_results(
+    results: AsyncIterator[BatchItemResult],
+    format: str,
+    total: int,
+    compact: bool = False,
+    timings: bool = False
+) -> StreamingResponse:
+    """将单项结果逐条写出为NDJSON或SSE流式响应
+
+    NDJSON每行一个BatchItemResult;SSE每条result事件携带一个BatchItemResult,
+    全部输出后发送done事件(含汇总),避免EventSource断开后自动重连。
+
+    Args:
+        results: 按完成顺序产生单项结果的异步迭代器
+        format: 输出格式(ndjson/sse)
+        total: 总图片数
+        compact: 是否省略raw_text和warnings字段
+        timings: 是否保留各阶段耗时
+
+    Returns:
+        流式响应
+    """
+    exclude = item_exclude(compact, timings)
+
+    async def body():
+        succeeded = failed = 0
+        async for result in results:
+            if result.success:
+                succeeded += 1
+            else:
+                failed += 1
+            payload = result.model_dump_json(exclude=exclude)
+            yield f"event: result\ndata: {payload}\n\n" if format == "sse" else payload + "\n"
+        if format == "sse":
+            summary = json.dumps({"total": total, "succeeded": succeeded, "failed": failed})
+            yield f"event: done\ndata: {summary}\n\n"
+
+    return StreamingResponse(
+        body(),
+        media_type=STREAM_MEDIA_TYPES[format],
+        # 禁止代理缓冲,结果完成即送达客户端
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _as_completed(tasks: List[Awaitable[BatchItemResult]]) -> AsyncIterator[BatchItemResult]:
+    """按完成顺序产生结果;客户端断开时取消未完成的识别"""
+    futures = [asyncio.ensure_future(task) for task in tasks]
+    try:
+        for future in asyncio.as_completed(futures):
+            yield await future
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+@router.post("/recognize/batch/stream")
+async def recognize_batch_stream(
+    request: Request,
+    files: List[UploadFile] = File([]),
+    format: Optional[Literal["ndjson", "sse"]] = None,
+    compact: bool = False,
+    timings: bool = False
+):
+    """批量图片金额识别(流式输出)
+
+    与/recognize/batch相同的验证和并发控制,每张图片识别完成即输出其结果,
+    输出顺序为完成顺序,通过index对应上传顺序。
+
+    Args:
+        request: 请求(按Accept头确定输出格式,JSON输入从请求体读取)
+        files: 上传的图片文件列表(multipart/form-data)
+        format: 输出格式(ndjson/sse),未指定时Accept为text/event-stream则输出SSE,否则NDJSON
+        compact: 是否省略每项结果的raw_text和warnings字段
+        timings: 是否在每项结果中返回各阶段耗时
+
+    Returns:
+        流式响应,每条为一个BatchItemResult
+    """
+    stream_format = _negotiate_stream_format(request, format)
+
+    # 在开始输出前读取并验证全部图片
+    items = await _read_batch_items(request, files)
+    _check_file_count(items, settings.BATCH_MAX_FILES)
+
+    semaphore = asyncio.Semaphore(max(1, settings.BATCH_MAX_IN_FLIGHT))
+    tasks = [
+        _completed(failure) if failure is not None
+        else _recognize_batch_item(index, filename, content, semaphore, timings)
+        for index, filename, content, failure in items
+    ]
+
+    logger.info("batch_stream_started", total=len(items), format=stream_format)
+    return _streaming_results(_as_completed(tasks), stream_format, len(items), compact, timings)
+
+
+def _job_result(job: Job, include_results: bool = True) -> JobResult:
+    """构造任务状态响应"""
+    results = job.results()
+    succeeded = sum(1 for result in results if result.success)
+    return JobResult(
+        job_id=job.job_id,
+        status=job.status.value,
+        total=job.total,
+        completed=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        results=results if include_results else None
+    )
+
+
+def start_job_manager() -> JobManager:
+    """启动异步任务调度(已启动时直接返回)
+
+    单项识别复用批量识别逻辑,但推理队列已满时等待重试而不是记为失败:
+    任务已被接受,客户端稍后查询结果,不应因同步请求占满执行器而丢失。
+
+    Returns:
+        JobManager实例
+    """
+    job_manager = get_job_manager()
+    job_manager.start(functools.partial(_recognize_batch_item, wait_for_capacity=True))
+    return job_manager
+
+
+def _check_jobs_enabled() -> None:
+    """检查是否提供异步任务接口,关闭时返回404"""
+    if not settings.JOBS_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "JOBS_DISABLED",
+                "message": "异步任务接口未开启",
+                "details": "JOBS_ENABLED=false"
+            }
+        )
+
+
+def _get_job_or_404(job_id: str) -> Job:
+    """获取任务,不存在或已过期时返回404"""
+    _check_jobs_enabled()
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "JOB_NOT_FOUND",
+                "message": "任务不存在或结果已过期",
+                "details": job_id
+            }
         )
+    return job
+
+
+@router.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(request: Request, files: List[UploadFile] = File([])):
+    """提交异步识别任务
+
+    上传的文件验证后立即返回任务ID,识别在后台按提交顺序执行,
+    通过GET /jobs/{job_id}查询进度和结果,或通过GET /jobs/{job_id}/stream
+    逐项获取结果。
+
+    Args:
+        request: 请求(JSON输入从请求体读取)
+        files: 上传的图片文件列表(multipart/form-data)
+
+    Returns:
+        任务状态(202 Accepted)
+    """
+    _check_jobs_enabled()
+    items = await _read_batch_items(request, files)
+    _check_file_count(items, settings.JOB_MAX_FILES)
+
+    job_manager = start_job_manager()
+    try:
+        job = job_manager.submit([
+            JobItem(index=index, filename=filename, content=content, result=failure)
+            for index, filename, content, failure in items
+        ])
+    except JobQueueFullException as e:
+        logger.warning("job_queue_full", total=len(items), error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "code": "SERVICE_BUSY",
+                "message": "服务繁忙,请稍后重试",
+                "details": str(e)
+            }
+        )
+
+    return ModelResponse(
+        JobResponse(success=True, data=_job_result(job, include_results=False)),
+        exclude=results_exclude(),
+        status_code=status.HTTP_202_ACCEPTED
     )
 
 
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, include_results: bool = True, compact: bool = False):
+    """查询异步识别任务
+
+    Args:
+        job_id: 任务ID
+        include_results: 是否返回已完成的识别结果
+        compact: 是否省略每项结果的raw_text和warnings字段
+
+    Returns:
+        任务状态和已完成的识别结果
+    """
+    job = _get_job_or_404(job_id)
+    return ModelResponse(
+        JobResponse(success=True, data=_job_result(job, include_results=include_results)),
+        exclude=results_exclude(compact)
+    )
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(
+    job_id: str,
+    request: Request,
+    format: Optional[Literal["ndjson", "sse"]] = None,
+    compact: bool = False
+):
+    """逐项获取异步识别任务结果
+
+    按完成顺序输出单项结果,已完成的结果立即输出,任务结束后关闭连接。
+
+    Args:
+        job_id: 任务ID
+        request: 请求(按Accept头确定输出格式)
+        format: 输出格式(ndjson/sse),未指定时Accept为text/event-stream则输出SSE,否则NDJSON
+        compact: 是否省略每项结果的raw_text和warnings字段
+
+    Returns:
+        流式响应,每条为一个BatchItemResult
+    """
+    job = _get_job_or_404(job_id)
+    stream_format = _negotiate_stream_format(request, format)
+    return _streaming_results(get_job_manager().stream(job), stream_format, job.total, compact)
+
+
 @router.get("/health", response_model=HealthCheckResponse)
 async def health():
     """健康检查
 
+    只读取后台引擎自检的最近一次结果和执行器状态,不在探针请求中执行推理,
+    也不占用推理引擎。
+
     Returns:
         服务健康状态
     """
+    engine_status = "not_loaded"
+    last_check_age = None
     try:
-        # 检查OCR引擎是否可用
-        ocr_service = get_ocr_service()
-        is_healthy = ocr_service.health_check()
-
-        if is_healthy:
-            return HealthCheckResponse(
-                status="healthy",
-                service=settings.SERVICE_NAME,
-                version=settings.SERVICE_VERSION,
-                ocr_engine="paddleocr-3.3.1",
-                uptime_seconds=get_uptime()
-            )
-        else:
-            return HealthCheckResponse(
-                status="unhealthy",
-                service=settings.SERVICE_NAME,
-                version=settings.SERVICE_VERSION,
-                ocr_engine="paddleocr-3.3.1",
-                uptime_seconds=get_uptime()
-            )
-
+        snapshot = await get_health_monitor().get_snapshot()
+        if snapshot is not None:
+            engine_status = "healthy" if snapshot.healthy else "unhealthy"
+            last_check_age = round(snapshot.age_seconds, 3)
     except Exception as e:
         logger.error("health_check_failed", error=str(e))
-        return HealthCheckResponse(
-            status="unhealthy",
-            service=settings.SERVICE_NAME,
-            version=settings.SERVICE_VERSION,
-            ocr_engine="paddleocr-3.3.1",
-            uptime_seconds=get_uptime()
-        )
+        engine_status = "unhealthy"
+
+    # 引擎加载失败后不会再自动加载,不能继续按加载中处理
+    if get_readiness_reason() == "engine_load_failed":
+        engine_status = "unhealthy"
+
+    executor = get_inference_executor()
+    busy_engines = get_ocr_service().engine_pool.busy if is_ocr_service_loaded() else None
+
+    # 模型加载中(启动预热)时进程仍然存活,不判为unhealthy
+    return HealthCheckResponse(
+        status="unhealthy" if engine_status == "unhealthy" else "healthy",
+        service=settings.SERVICE_NAME,
+        version=settings.SERVICE_VERSION,
+        ocr_engine="paddleocr-3.3.1",
+        uptime_seconds=get_uptime(),
+        ready=is_ready(),
+        engine_status=engine_status,
+        last_check_age_seconds=last_check_age,
+        in_flight=executor.in_flight,
+        queue_depth=executor.queue_depth,
+        busy_engines=busy_engines
+    )
+
+
+@router.get("/ready", response_model=ReadinessResponse)
+async def ready(response: Response):
+    """就绪检查
+
+    与健康检查(存活)分开,模型加载和预热完成前返回503,
+    供负载均衡器/Kubernetes readinessProbe判断是否向本实例转发流量。
+
+    Returns:
+        服务就绪状态
+    """
+    if not is_ready():
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessResponse(ready=is_ready(), status=get_readiness_reason())
@@ -3,6 +3,19 @@ from typing import Optional, List
 from pydantic import BaseModel, Field
 
 
+# ==================== 请求模型 ====================
+
+class Base64Image(BaseModel):
+    """base64编码的图片(JSON请求体)"""
+    image: str = Field(..., description="base64编码的图片内容(可带data URI前缀)")
+    filename: Optional[str] = Field(None, description="文件名(用于日志和结果)")
+
+
+class Base64BatchRequest(BaseModel):
+    """批量识别JSON请求体"""
+    images: List[Base64Image] = Field(..., description="base64编码的图片列表")
+
+
 # ==================== 错误响应模型 ====================
 
 class ErrorDetail(BaseModel):
@@ -20,6 +33,18 @@ class ErrorResponse(BaseModel):
 
 # ==================== 识别响应模型 ====================
 
+class StageTimings(BaseModel):
+    """各处理阶段耗时(毫秒),命中缓存时跳过的阶段为null"""
+    queue_wait_ms: Optional[float] = Field(None, description="推理队列等待耗时")
+    decode_ms: Optional[float] = Field(None, description="图片解码耗时")
+    preprocess_ms: Optional[float] = Field(None, description="格式转换和缩放耗时")
+    detection_ms: Optional[float] = Field(None, description="文本检测耗时")
+    crop_ms: Optional[float] = Field(None, description="文本框裁剪耗时")
+    recognition_ms: Optional[float] = Field(None, description="文本识别耗时")
+    extract_ms: Optional[float] = Field(None, description="金额提取耗时")
+    total_ms: Optional[float] = Field(None, description="识别总耗时(不含排队)")
+
+
 class RecognitionResult(BaseModel):
     """识别结果"""
     amount: Optional[str] = Field(None, description="识别出的金额(纯数字格式)")
@@ -27,6 +52,7 @@ class RecognitionResult(BaseModel):
     processing_time_ms: int = Field(..., description="处理耗时(毫秒)")
     raw_text: Optional[str] = Field(None, description="OCR原始识别文本")
     warnings: List[str] = Field(default_factory=list, description="警告信息列表")
+    timings: Optional[StageTimings] = Field(None, description="各阶段耗时(请求timings=true时返回)")
 
 
 class RecognitionResponse(BaseModel):
@@ -60,6 +86,28 @@ class BatchRecognitionResponse(BaseModel):
     data: BatchRecognitionResult = Field(..., description="批量识别结果")
 
 
+# ==================== 异步任务响应模型 ====================
+
+class JobResult(BaseModel):
+    """异步识别任务状态"""
+    job_id: str = Field(..., description="任务ID")
+    status: str = Field(..., description="任务状态(pending/running/completed/cancelled)")
+    total: int = Field(..., description="总图片数")
+    completed: int = Field(..., description="已完成数")
+    succeeded: int = Field(..., description="成功识别数")
+    failed: int = Field(..., description="失败数")
+    created_at: float = Field(..., description="提交时间(Unix时间戳,秒)")
+    started_at: Optional[float] = Field(None, description="开始执行时间(Unix时间戳,秒)")
+    finished_at: Optional[float] = Field(None, description="结束时间(Unix时间戳,秒)")
+    results: Optional[List[BatchItemResult]] = Field(None, description="已完成的识别结果(按图片索引排序)")
+
+
+class JobResponse(BaseModel):
+    """异步识别任务响应"""
+    success: bool = Field(True, description="请求是否成功")
+    data: JobResult = Field(..., description="任务状态")
+
+
 # ==================== 健康检查响应模型 ====================
 
 class HealthCheckResponse(BaseModel):
@@ -69,3 +117,21 @@ class HealthCheckResponse(BaseModel):
     version: str = Field(..., description="服务版本")
     ocr_engine: str = Field(..., description="OCR引擎信息")
     uptime_seconds: int = Field(..., description="服务运行时长(秒)")
+    ready: Optional[bool] = Field(None, description="是否已就绪(模型已加载并预热)")
+    engine_status: Optional[str] = Field(
+        None,
+        description="最近一次引擎自检结果(healthy/unhealthy/not_loaded)"
+    )
+    last_check_age_seconds: Optional[float] = Field(None, description="距离最近一次引擎自检的时间(秒)")
+    in_flight: Optional[int] = Field(None, description="正在执行的推理任务数")
+    queue_depth: Optional[int] = Field(None, description="排队等待推理的请求数")
+    busy_engines: Optional[int] = Field(None, description="正在使用的引擎组数")
+
+
+class ReadinessResponse(BaseModel):
+    """就绪检查响应"""
+    ready: bool = Field(..., description="是否已就绪(模型已加载并预热)")
+    status: str = Field(
+        ...,
+        description="就绪状态说明(ready/starting/warming_up/engine_load_failed/stopping)"
+    )
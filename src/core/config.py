@@ -1,6 +1,11 @@
 """配置管理模块"""
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
+# 按文件数推算请求体上限时,为multipart边界和表单字段预留的空间
+REQUEST_OVERHEAD_BYTES = 1024 * 1024
+
 
 class Settings(BaseSettings):
     """应用配置"""
@@ -11,14 +16,101 @@ class Settings(BaseSettings):
 
     # 日志配置
     LOG_LEVEL: str = "INFO"
+    SERVER_TIMING_ENABLED: bool = False    # 单张识别响应返回Server-Timing头(诊断用,暴露各阶段耗时)
 
     # 文件限制
     MAX_FILE_SIZE_MB: int = 10
     MAX_FILE_SIZE_BYTES: int = 10 * 1024 * 1024
+    MAX_RAW_IMAGE_SIZE_BYTES: int = 64 * 1024 * 1024    # 原始像素输入上限(未压缩,高x宽x通道数)
+    # 单个请求体上限(读取请求体时按实际字节数检查,0表示不限制),
+    # 未设置时按MAX_FILE_SIZE_MB×BATCH_MAX_FILES推算;单张识别的multipart上传另按
+    # MAX_FILE_SIZE_MB加表单开销限制
+    MAX_REQUEST_SIZE_MB: Optional[int] = None
 
     # 超时配置
     REQUEST_TIMEOUT_SEC: int = 30
-    OCR_TIMEOUT_SEC: int = 3
+    OCR_TIMEOUT_SEC: float = 3         # 单张识别超时(秒,支持小数,如0.8)
+
+    # 图片预处理配置
+    IMAGE_MAX_DIMENSION: int = 2048    # 预处理后图片最长边(像素)
+    IMAGE_RESAMPLE: str = "lanczos"    # 缩放滤波器: nearest/box/bilinear/hamming/bicubic/lanczos
+
+    # 文本框裁剪配置
+    OCR_CROP_MODE: str = "bbox"        # bbox: 外接矩形切片; perspective: 透视校正裁剪(倾斜文本)
+    OCR_CROP_PADDING: int = 2          # 外接矩形外扩像素数
+
+    # 文本检测分辨率配置
+    # full: 在预处理图上检测; fixed: 缩小到OCR_DET_LIMIT_SIDE_LEN检测;
+    # adaptive: 先低分辨率检测,文本过小时回到全分辨率
+    OCR_DET_MODE: str = "full"
+    OCR_DET_LIMIT_SIDE_LEN: int = 960  # fixed/adaptive模式检测输入最长边(像素)
+    OCR_DET_MIN_TEXT_HEIGHT: int = 10  # adaptive模式低分辨率下文本高度中位数低于该值时回到全分辨率检测
+
+    # 文本框筛选(ROI)配置
+    # off: 识别全部文本框; prune: 剔除不可能含金额的文本框;
+    # early_stop: 按可能性分块识别,找到金额后提前结束
+    OCR_ROI_MODE: str = "off"
+    OCR_ROI_CHUNK_SIZE: int = 8        # early_stop模式每块识别的文本框数
+    OCR_ROI_STOP_CONFIDENCE: float = 0.9    # early_stop模式提前结束要求的最低识别置信度
+
+    # 启动加载与预热配置
+    OCR_EAGER_LOAD: bool = True                 # 启动时加载模型(完成前/ready返回503)
+    OCR_WARMUP_ENABLED: bool = True
+    OCR_WARMUP_IMAGE_SIZES: list = [640, 1280, 2048]   # 检测预热图片最长边
+    OCR_WARMUP_BATCH_SIZES: list = [1, 8]              # 识别预热批大小
+
+    # 推理引擎池配置
+    OCR_ENGINE_POOL_SIZE: int = 1      # 检测/识别引擎组数
+    OCR_CPU_THREADS: int = 0           # 每组引擎推理线程数(0表示物理核心数/(进程数×引擎组数))
+
+    # 多进程部署配置(gunicorn -c gunicorn.conf.py main:app)
+    OCR_WORKER_PROCESSES: int = 1      # worker进程数
+    OCR_PRELOAD_ENGINES: bool = True   # master进程fork前加载模型,worker通过写时复制共享权重
+
+    # 识别微批处理配置(合并并发请求的裁剪图一次识别)
+    OCR_MICRO_BATCH_ENABLED: bool = False
+    OCR_MICRO_BATCH_MAX_SIZE: int = 32      # 单批最大裁剪图数
+    OCR_MICRO_BATCH_WAIT_MS: float = 5      # 等待更多请求的最长时间(毫秒)
+
+    # 识别结果缓存配置(按图片内容哈希缓存)
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_ENTRIES: int = 1024
+    RESULT_CACHE_TTL_SEC: float = 600       # 0表示永不过期
+
+    # 裁剪图识别缓存配置(按裁剪图像素哈希缓存识别文本,适合固定模板的输入)
+    CROP_CACHE_ENABLED: bool = True
+    CROP_CACHE_MAX_ENTRIES: int = 4096
+
+    # 近似重复图片缓存配置(按感知哈希匹配重新拍摄/重新编码的同一张图片,
+    # 候选命中后重新识别金额文本框,金额一致才复用结果)
+    PERCEPTUAL_CACHE_ENABLED: bool = False
+    PERCEPTUAL_CACHE_MAX_ENTRIES: int = 4096
+    PERCEPTUAL_CACHE_HASH_SIZE: int = 16        # dHash边长(哈希位数为边长的平方)
+    PERCEPTUAL_CACHE_MAX_DISTANCE: int = 8      # 判为近似重复的最大汉明距离(位)
+    PERCEPTUAL_CACHE_TTL_SEC: float = 600       # 0表示永不过期
+
+    # 批量识别配置
+    BATCH_MAX_FILES: int = 10               # 单个批量请求最多图片数
+    BATCH_MAX_IN_FLIGHT: int = 4            # 单个批量请求同时识别的最大图片数
+
+    # 异步任务配置(任务保存在进程内存中,多进程部署时查询可能落到其他worker)
+    JOBS_ENABLED: bool = True               # 是否提供/jobs接口
+    JOB_MAX_FILES: int = 500                # 单个任务最多图片数
+    JOB_MAX_QUEUED: int = 16                # 最大排队任务数(超出时拒绝提交)
+    JOB_MAX_CONCURRENT: int = 1             # 同时执行的任务数
+    JOB_MAX_IN_FLIGHT: int = 4              # 所有任务同时识别的最大图片数
+    JOB_MAX_STORED: int = 1000              # 最多保存的任务数(超出时淘汰最早结束的任务)
+    JOB_RESULT_TTL_SEC: float = 3600        # 已结束任务结果的保留时间(秒)
+    JOB_RETRY_BACKOFF_SEC: float = 0.05     # 推理队列已满时任务项首次重试的等待时间(秒)
+    JOB_RETRY_MAX_BACKOFF_SEC: float = 1.0  # 重试等待时间上限(秒,按指数退避增长)
+
+    # 推理执行器配置
+    OCR_EXECUTOR_WORKERS: int = 0      # 推理线程数(0表示与引擎组数一致)
+    OCR_QUEUE_MAX_SIZE: int = 32       # 最大排队请求数(超出时返回503)
+
+    # 健康检查配置
+    HEALTH_CHECK_INTERVAL_SEC: float = 30       # 后台引擎自检间隔(秒)
+    HEALTH_CHECK_ENGINE_TIMEOUT_SEC: float = 1  # 自检等待空闲引擎的最长时间(秒)
 
     # 服务信息
     SERVICE_NAME: str = "money-ocr-api"
@@ -27,6 +119,21 @@ class Settings(BaseSettings):
     # 支持的图片格式
     SUPPORTED_FORMATS: list = ["image/jpeg", "image/png", "image/bmp", "image/tiff"]
 
+    @property
+    def max_request_bytes(self) -> int:
+        """单个请求体上限(字节),0表示不限制"""
+        if self.MAX_REQUEST_SIZE_MB is not None:
+            return self.MAX_REQUEST_SIZE_MB * 1024 * 1024
+        return self.MAX_FILE_SIZE_BYTES * self.BATCH_MAX_FILES + REQUEST_OVERHEAD_BYTES
+
+    @property
+    def max_upload_request_bytes(self) -> int:
+        """单张识别multipart请求体上限(字节),不超过max_request_bytes"""
+        limit = self.MAX_FILE_SIZE_BYTES + REQUEST_OVERHEAD_BYTES
+        if self.max_request_bytes > 0:
+            return min(limit, self.max_request_bytes)
+        return limit
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
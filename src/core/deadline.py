@@ -0,0 +1,74 @@
+"""请求截止时间
+
+替代基于SIGALRM的超时:截止时间对象随请求在线程间传递,
+在预处理/检测/裁剪/识别等阶段之间检查,支持毫秒级精度和主动取消。
+"""
+import time
+from typing import Optional
+
+
+class TimeoutException(Exception):
+    """超时异常"""
+    pass
+
+
+class Deadline:
+    """单个请求的截止时间(可跨线程共享)"""
+
+    def __init__(self, timeout_sec: float):
+        """创建截止时间
+
+        Args:
+            timeout_sec: 从现在起的超时时长(秒),支持小数
+        """
+        self.timeout_sec = timeout_sec
+        self._start = time.monotonic()
+        self._expires_at = self._start + timeout_sec
+        self._cancelled = False
+        self._cancel_reason: Optional[str] = None
+
+    def remaining(self) -> float:
+        """剩余时间(秒),已超时返回0"""
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def remaining_ms(self) -> int:
+        """剩余时间(毫秒)"""
+        return int(self.remaining() * 1000)
+
+    def elapsed_ms(self) -> int:
+        """自创建以来经过的时间(毫秒)"""
+        return int((time.monotonic() - self._start) * 1000)
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已被取消"""
+        return self._cancelled
+
+    def expired(self) -> bool:
+        """是否已超时或被取消"""
+        return self._cancelled or time.monotonic() >= self._expires_at
+
+    def cancel(self, reason: str = "请求已取消") -> None:
+        """取消请求,后续阶段检查时将中止处理
+
+        Args:
+            reason: 取消原因
+        """
+        self._cancelled = True
+        self._cancel_reason = reason
+
+    def check(self, stage: str) -> None:
+        """检查是否可以继续执行下一阶段
+
+        Args:
+            stage: 当前阶段名称(用于错误信息)
+
+        Raises:
+            TimeoutException: 已超时或已被取消
+        """
+        if self._cancelled:
+            raise TimeoutException(f"{self._cancel_reason}(阶段: {stage})")
+        if time.monotonic() >= self._expires_at:
+            raise TimeoutException(
+                f"OCR处理超时(阶段: {stage}, 限制{self.timeout_sec * 1000:.0f}ms)"
+            )
@@ -0,0 +1,138 @@
+"""Prometheus格式的服务指标
+
+基于prometheus_client,供 /metrics 接口抓取,所有指标线程安全,可在推理线程中直接更新。
+多进程部署(gunicorn)时设置PROMETHEUS_MULTIPROC_DIR,各worker把指标写入该目录下的
+共享文件,抓取时汇总全部worker的指标,不会因请求落到不同worker而出现计数回退。
+"""
+import os
+from typing import Dict
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    disable_created_metrics,
+    generate_latest,
+    multiprocess,
+)
+
+# 不输出计数器/直方图的*_created序列
+disable_created_metrics()
+
+# 耗时直方图默认分桶(秒)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 服务指标注册表(不含prometheus_client默认的进程和GC指标)
+REGISTRY = CollectorRegistry()
+
+# ==================== 服务指标 ====================
+
+OCR_STAGE_DURATION = Histogram(
+    "ocr_stage_duration_seconds",
+    "OCR各阶段耗时(decode/preprocess/detection/crop/recognition/extract/total)",
+    labelnames=("stage",),
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY
+)
+
+OCR_CROPS_PER_IMAGE = Histogram(
+    "ocr_crops_per_image",
+    "单张图片检测出的文本框数",
+    buckets=(0, 1, 2, 4, 8, 16, 32, 64, 128),
+    registry=REGISTRY
+)
+
+OCR_CACHE_REQUESTS = Counter(
+    "ocr_cache_requests_total",
+    "识别结果缓存查询次数",
+    labelnames=("result",),
+    registry=REGISTRY
+)
+
+OCR_CROP_CACHE_REQUESTS = Counter(
+    "ocr_crop_cache_requests_total",
+    "裁剪图识别缓存查询次数(按裁剪图计)",
+    labelnames=("result",),
+    registry=REGISTRY
+)
+
+OCR_PERCEPTUAL_CACHE_REQUESTS = Counter(
+    "ocr_perceptual_cache_requests_total",
+    "近似重复图片缓存查询次数(hit/miss/rejected: 候选命中但金额复核不一致)",
+    labelnames=("result",),
+    registry=REGISTRY
+)
+
+OCR_PERCEPTUAL_CACHE_DISTANCE = Histogram(
+    "ocr_perceptual_cache_distance_bits",
+    "近似重复图片缓存查询时最近条目的汉明距离(用于调整判定阈值)",
+    buckets=(0, 1, 2, 4, 6, 8, 10, 12, 16, 24, 32, 64),
+    registry=REGISTRY
+)
+
+OCR_PERCEPTUAL_CACHE_SAVED_SECONDS = Counter(
+    "ocr_perceptual_cache_saved_seconds_total",
+    "近似重复图片缓存命中节省的识别耗时(按被复用结果的原始识别耗时估算,秒)",
+    registry=REGISTRY
+)
+
+OCR_TIMEOUTS = Counter(
+    "ocr_timeouts_total",
+    "识别超时次数",
+    registry=REGISTRY
+)
+
+OCR_ERRORS = Counter(
+    "ocr_errors_total",
+    "识别失败次数(按错误类型)",
+    labelnames=("type",),
+    registry=REGISTRY
+)
+
+# 仪表盘在状态变化时更新;多进程部署时汇总存活worker的值
+OCR_QUEUE_DEPTH = Gauge(
+    "ocr_queue_depth",
+    "排队等待推理的请求数",
+    multiprocess_mode="livesum",
+    registry=REGISTRY
+)
+
+OCR_IN_FLIGHT = Gauge(
+    "ocr_in_flight",
+    "正在执行的推理任务数",
+    multiprocess_mode="livesum",
+    registry=REGISTRY
+)
+
+OCR_BUSY_ENGINES = Gauge(
+    "ocr_busy_engines",
+    "正在使用的引擎组数",
+    multiprocess_mode="livesum",
+    registry=REGISTRY
+)
+
+
+def observe_stage_timings(timings: Dict[str, float]) -> None:
+    """批量记录各阶段耗时
+
+    Args:
+        timings: 阶段名称 -> 耗时(秒)
+    """
+    for stage, seconds in timings.items():
+        OCR_STAGE_DURATION.labels(stage=stage).observe(seconds)
+
+
+def render_metrics() -> bytes:
+    """输出全部服务指标(Prometheus文本格式)
+
+    设置了PROMETHEUS_MULTIPROC_DIR时汇总所有worker写入的指标,否则输出本进程的指标。
+
+    Returns:
+        指标文本
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
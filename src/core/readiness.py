@@ -0,0 +1,40 @@
+"""服务就绪状态跟踪模块
+
+与存活状态(/health)分开:模型加载和预热完成前服务虽已启动,
+但不应接收流量,负载均衡器据此只将请求路由到已预热的实例。
+"""
+import threading
+
+_lock = threading.Lock()
+_ready = False
+_reason = "starting"
+
+
+def mark_ready() -> None:
+    """标记服务已就绪"""
+    global _ready, _reason
+    with _lock:
+        _ready = True
+        _reason = "ready"
+
+
+def mark_not_ready(reason: str) -> None:
+    """标记服务未就绪
+
+    Args:
+        reason: 未就绪原因(如warming_up、engine_load_failed)
+    """
+    global _ready, _reason
+    with _lock:
+        _ready = False
+        _reason = reason
+
+
+def is_ready() -> bool:
+    """服务是否已就绪"""
+    return _ready
+
+
+def get_readiness_reason() -> str:
+    """当前就绪状态说明"""
+    return _reason
@@ -0,0 +1,202 @@
+"""金额提取
+
+对OCR识别文本只扫描一遍,收集所有候选金额并打分,返回得分最高的金额。
+打分依据:货币符号、小数位、关键词(合计/总计/实付等)距离、所在行位置;
+日期、时间、电话号码、百分比等数字在扫描时直接识别并排除。
+"""
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+
+# 强关键词:通常紧跟最终支付金额
+STRONG_KEYWORDS = (
+    "实付金额", "实付", "实收", "应付金额", "应付", "应收", "支付金额", "付款金额",
+    "总金额", "总额", "总计", "合计", "TOTAL", "Total", "total",
+)
+
+# 弱关键词:可能是金额,但不一定是最终金额
+WEAK_KEYWORDS = ("金额", "小计", "价格", "Amount", "AMOUNT", "amount")
+
+# 打分权重
+SCORE_CURRENCY = 3.0          # 带货币符号
+SCORE_TWO_DECIMALS = 2.0      # 两位小数(标准金额格式)
+SCORE_ONE_DECIMAL = 0.5       # 一位小数
+SCORE_THOUSANDS = 1.0         # 千分位格式正确
+SCORE_STRONG_KEYWORD = 4.0    # 同行强关键词之后的第一个数字
+SCORE_WEAK_KEYWORD = 1.0      # 同行弱关键词之后的第一个数字
+NEXT_LINE_FACTOR = 0.5        # 关键词在上一行时的权重系数
+SCORE_LAST_LINE = 1.0         # 行位置加分上限(越靠后越高,合计通常在末尾)
+PENALTY_NEGATIVE = 2.0        # 负数(优惠/退款)
+PENALTY_LONG_INTEGER = 3.0    # 无小数且无货币符号的长整数(卡号/单号)
+LONG_INTEGER_DIGITS = 7
+
+# 标准化后的合法金额格式(最多2位小数)
+_VALID_AMOUNT = re.compile(r"^\d+(\.\d{1,2})?$")
+
+
+def _keyword_alternation(keywords: Sequence[str]) -> str:
+    # 长关键词优先匹配(如"实付金额"优先于"实付")
+    return "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+
+
+def _first_chars(keywords: Sequence[str]) -> str:
+    return re.escape("".join(sorted({k[0] for k in keywords})))
+
+
+# 单次扫描的组合模式:先匹配会被误认为金额的数字格式,剩余数字才作为候选金额。
+# 开头的前瞻按首字符快速跳过不可能匹配的位置,避免在每个字符上尝试全部分支
+_TOKEN_PATTERN = re.compile(
+    r"(?=[\d¥$￥\-−" + _first_chars(STRONG_KEYWORDS + WEAK_KEYWORDS) + r"])(?:"
+    r"(?P<strong>" + _keyword_alternation(STRONG_KEYWORDS) + r")"
+    r"|(?P<weak>" + _keyword_alternation(WEAK_KEYWORDS) + r")"
+    r"|(?P<date>\d{4}[-/.年]\d{1,2}[-/.月]\d{1,2}日?)"
+    r"|(?P<time>\d{1,2}:\d{2}(?::\d{2})?)"
+    r"|(?P<phone>(?<!\d)1[3-9]\d{9}(?!\d)|(?<!\d)0\d{2,3}-\d{7,8}(?!\d))"
+    r"|(?P<percent>\d+(?:\.\d+)?\s*%)"
+    r"|(?P<sign>[-−])?(?:(?P<currency>[¥$￥])\s*(?P<currency_sign>[-−])?)?"
+    r"(?P<number>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+    r")"
+)
+
+_STRONG_SET = frozenset(STRONG_KEYWORDS)
+
+
+@dataclass
+class AmountCandidate:
+    """候选金额"""
+    amount: str                 # 标准化金额(去除千分位)
+    score: float                # 得分
+    line: int                   # 所在行号
+    has_currency: bool          # 是否带货币符号
+    keyword: Optional[str] = None   # 关联的关键词
+
+    @property
+    def has_strong_keyword(self) -> bool:
+        """是否紧跟实付/合计等强关键词"""
+        return self.keyword in _STRONG_SET
+
+    @property
+    def value(self) -> float:
+        """金额数值(用于同分时比较大小)"""
+        return float(self.amount)
+
+
+def _split_lines(text: Union[str, Sequence[str]]) -> List[str]:
+    """将OCR结果拆分为行
+
+    Args:
+        text: OCR文本(字符串按换行拆分)或按行(文本框)组织的文本列表
+
+    Returns:
+        行列表
+    """
+    if isinstance(text, str):
+        return text.splitlines() or [text]
+    return [str(line) for line in text]
+
+
+def find_amount_candidates(text: Union[str, Sequence[str]]) -> List[AmountCandidate]:
+    """扫描OCR文本,收集并打分所有候选金额
+
+    Args:
+        text: OCR文本,或按行(文本框)组织的文本列表
+
+    Returns:
+        候选金额列表(按出现顺序)
+    """
+    lines = _split_lines(text)
+    last_line = max(1, len(lines) - 1)
+    candidates: List[AmountCandidate] = []
+
+    # 上一行末尾未被数字消费的关键词,作用于下一行第一个候选
+    carried_keyword: Optional[str] = None
+
+    for line_index, line in enumerate(lines):
+        line_score = SCORE_LAST_LINE * line_index / last_line if len(lines) > 1 else 0.0
+        pending_keyword = carried_keyword
+        pending_factor = NEXT_LINE_FACTOR if carried_keyword else 1.0
+        carried_keyword = None
+
+        for match in _TOKEN_PATTERN.finditer(line):
+            group = match.lastgroup
+            if group in ("strong", "weak"):
+                pending_keyword = match.group(group)
+                pending_factor = 1.0
+                continue
+
+            if group != "number":
+                # 日期/时间/电话/百分比:不作为候选
+                continue
+
+            sign, currency, currency_sign, number = match.group(
+                "sign", "currency", "currency_sign", "number"
+            )
+            amount = number.replace(",", "") if "," in number else number
+            if not _VALID_AMOUNT.match(amount):
+                continue
+
+            has_currency = currency is not None
+            decimals = len(amount.partition(".")[2])
+            score = line_score
+
+            if has_currency:
+                score += SCORE_CURRENCY
+            if decimals == 2:
+                score += SCORE_TWO_DECIMALS
+            elif decimals == 1:
+                score += SCORE_ONE_DECIMAL
+            if len(amount) != len(number):
+                score += SCORE_THOUSANDS
+            if sign or currency_sign:
+                score -= PENALTY_NEGATIVE
+            if decimals == 0 and not has_currency and len(amount) >= LONG_INTEGER_DIGITS:
+                score -= PENALTY_LONG_INTEGER
+
+            keyword = pending_keyword
+            if keyword is not None:
+                weight = SCORE_STRONG_KEYWORD if keyword in _STRONG_SET else SCORE_WEAK_KEYWORD
+                score += weight * pending_factor
+                pending_keyword = None
+
+            candidates.append(AmountCandidate(
+                amount=amount,
+                score=score,
+                line=line_index,
+                has_currency=has_currency,
+                keyword=keyword
+            ))
+
+        carried_keyword = pending_keyword
+
+    return candidates
+
+
+def best_amount_candidate(text: Union[str, Sequence[str], None]) -> Optional[AmountCandidate]:
+    """从OCR文本中选出得分最高的候选金额
+
+    Args:
+        text: OCR文本,或按行(文本框)组织的文本列表
+
+    Returns:
+        得分最高的候选金额,未找到则返回None
+    """
+    if not text:
+        return None
+    candidates = find_amount_candidates(text)
+    if not candidates:
+        return None
+    # 同分时取较大金额(合计通常不小于各分项)
+    return max(candidates, key=lambda c: (c.score, c.value))
+
+
+def extract_amount(text: Union[str, Sequence[str], None]) -> Optional[str]:
+    """从OCR文本中提取最可能的金额
+
+    Args:
+        text: OCR文本,或按行(文本框)组织的文本列表
+
+    Returns:
+        金额字符串(纯数字格式),未找到则返回None
+    """
+    best = best_amount_candidate(text)
+    return best.amount if best is not None else None
@@ -0,0 +1,165 @@
+"""跨请求动态微批处理
+
+收集并发请求提交的输入(如文本裁剪图),在最长等待时间或最大批大小
+到达时合并执行一次推理,再将结果按请求拆分返回,减少高负载下的小批次推理。
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 停止信号
+_STOP = None
+
+
+class MicroBatcher:
+    """动态微批调度器"""
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        workers: int = 1,
+        name: str = "batcher"
+    ):
+        """初始化微批调度器
+
+        Args:
+            predict_fn: 批量推理函数,输入列表,返回与输入一一对应的结果序列
+            max_batch_size: 合并批次的最大输入数
+            max_wait_ms: 第一个请求到达后等待更多请求的最长时间(毫秒)
+            workers: 并行执行批次的线程数(通常与引擎组数一致)
+            name: 调度器名称(用于日志和线程名)
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_sec = max(0.0, max_wait_ms) / 1000
+        self.workers = max(1, workers)
+        self.name = name
+
+        self._queue: "queue.Queue[Optional[Tuple[List[Any], Future]]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        """首次提交时启动工作线程(避免在fork前创建线程)"""
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    name=f"{self.name}-{i}",
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            logger.info(
+                "micro_batcher_started",
+                name=self.name,
+                workers=self.workers,
+                max_batch_size=self.max_batch_size,
+                max_wait_ms=self.max_wait_sec * 1000
+            )
+
+    def submit(self, items: List[Any]) -> Future:
+        """提交一组输入,返回结果Future
+
+        Args:
+            items: 输入列表(同一请求的输入总在同一批次中执行)
+
+        Returns:
+            结果为与items一一对应的结果列表的Future
+        """
+        future: Future = Future()
+        if not items:
+            future.set_result([])
+            return future
+
+        self._ensure_started()
+        self._queue.put((list(items), future))
+        return future
+
+    def _worker(self) -> None:
+        """工作线程:收集请求组成批次并执行"""
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = [first]
+            count = len(first[0])
+            collect_deadline = time.monotonic() + self.max_wait_sec
+            stopping = False
+
+            # 在等待窗口内继续收集请求,直到达到最大批大小
+            while count < self.max_batch_size:
+                remaining = collect_deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is _STOP:
+                    stopping = True
+                    break
+                batch.append(request)
+                count += len(request[0])
+
+            self._run_batch(batch)
+            if stopping:
+                return
+
+    def _run_batch(self, batch: List[Tuple[List[Any], Future]]) -> None:
+        """执行一个合并批次并将结果分发回各请求"""
+        # 跳过已被调用方取消的请求
+        live = [(items, future) for items, future in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        flat_items = [item for items, _ in live for item in items]
+
+        try:
+            results = list(self.predict_fn(flat_items))
+            if len(results) != len(flat_items):
+                raise RuntimeError(
+                    f"批量推理结果数量不匹配: 输入{len(flat_items)}, 输出{len(results)}"
+                )
+        except Exception as e:
+            logger.error(
+                "micro_batch_failed",
+                name=self.name,
+                batch_size=len(flat_items),
+                error=str(e)
+            )
+            for _, future in live:
+                future.set_exception(e)
+            return
+
+        logger.debug(
+            "micro_batch_executed",
+            name=self.name,
+            requests=len(live),
+            batch_size=len(flat_items)
+        )
+
+        offset = 0
+        for items, future in live:
+            future.set_result(results[offset:offset + len(items)])
+            offset += len(items)
+
+    def close(self) -> None:
+        """停止所有工作线程(已入队的请求会先执行完)"""
+        with self._lock:
+            for _ in self._threads:
+                self._queue.put(_STOP)
+            self._threads = []
@@ -0,0 +1,185 @@
+"""线程安全的LRU/TTL缓存与近似重复图片缓存"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+# 0-255每个字节值的置位数,用于向量化计算汉明距离
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+class LRUCache:
+    """带过期时间的LRU缓存(线程安全)
+
+    条目数超过上限时淘汰最久未使用的条目;过期条目在访问时惰性清除。
+    """
+
+    def __init__(self, max_entries: int, ttl_sec: float = 0):
+        """初始化缓存
+
+        Args:
+            max_entries: 最大条目数
+            ttl_sec: 条目有效期(秒),0表示永不过期
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_sec = ttl_sec
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """查询缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存值,未命中或已过期返回None
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值(不能为None)
+        """
+        expires_at = time.monotonic() + self.ttl_sec if self.ttl_sec > 0 else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存和统计"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """缓存统计信息"""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class PerceptualCache:
+    """近似重复图片缓存(线程安全)
+
+    以感知哈希为键,查询时对所有条目向量化计算汉明距离,距离最近且不超过
+    max_distance的条目视为命中。条目存放在固定大小的环形缓冲区中,写满后覆盖
+    最早写入的条目;过期条目在查询时跳过。
+    """
+
+    def __init__(self, max_entries: int, hash_bytes: int, max_distance: int, ttl_sec: float = 0):
+        """初始化缓存
+
+        Args:
+            max_entries: 最大条目数
+            hash_bytes: 哈希长度(字节)
+            max_distance: 判为近似重复的最大汉明距离(位)
+            ttl_sec: 条目有效期(秒),0表示永不过期
+        """
+        self.max_entries = max(1, max_entries)
+        self.hash_bytes = hash_bytes
+        self.max_distance = max_distance
+        self.ttl_sec = ttl_sec
+        self._hashes = np.zeros((self.max_entries, hash_bytes), dtype=np.uint8)
+        self._expires_at = np.full(self.max_entries, np.inf)
+        self._values: List[Any] = [None] * self.max_entries
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, image_hash: np.ndarray) -> Tuple[Optional[Any], Optional[int]]:
+        """查询最相似的条目
+
+        Args:
+            image_hash: 按位打包的感知哈希
+
+        Returns:
+            (缓存值, 最近条目的汉明距离)元组;未命中时缓存值为None,
+            缓存为空(或全部过期)时距离为None
+        """
+        with self._lock:
+            if self._size == 0:
+                self.misses += 1
+                return None, None
+
+            distances = _POPCOUNT[np.bitwise_xor(self._hashes[:self._size], image_hash)].sum(axis=1)
+            if self.ttl_sec > 0:
+                expired = self._expires_at[:self._size] <= time.monotonic()
+                if expired.all():
+                    self.misses += 1
+                    return None, None
+                distances[expired] = np.iinfo(distances.dtype).max
+
+            nearest = int(np.argmin(distances))
+            distance = int(distances[nearest])
+            if distance <= self.max_distance:
+                self.hits += 1
+                return self._values[nearest], distance
+            self.misses += 1
+            return None, distance
+
+    def put(self, image_hash: np.ndarray, value: Any) -> None:
+        """写入缓存
+
+        Args:
+            image_hash: 按位打包的感知哈希
+            value: 缓存值(不能为None)
+        """
+        with self._lock:
+            slot = self._next
+            self._hashes[slot] = image_hash
+            self._values[slot] = value
+            self._expires_at[slot] = time.monotonic() + self.ttl_sec if self.ttl_sec > 0 else np.inf
+            self._next = (slot + 1) % self.max_entries
+            self._size = min(self._size + 1, self.max_entries)
+
+    def clear(self) -> None:
+        """清空缓存和统计"""
+        with self._lock:
+            self._values = [None] * self.max_entries
+            self._size = 0
+            self._next = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """缓存统计信息"""
+        with self._lock:
+            return {
+                "size": self._size,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def __len__(self) -> int:
+        return self._size
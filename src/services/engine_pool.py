@@ -0,0 +1,172 @@
+"""OCR引擎池
+
+维护N组文本检测/识别引擎,通过借出/归还保证每组引擎同一时间
+只被一个线程使用,使并发请求可以在多核上并行推理。
+"""
+import platform
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import psutil
+from paddleocr import TextDetection, TextRecognition
+
+from src.core.logging import get_logger
+from src.core.metrics import OCR_BUSY_ENGINES
+
+logger = get_logger(__name__)
+
+# 模型名称
+DET_MODEL_NAME = 'PP-OCRv5_mobile_det'   # 轻量级检测（~120ms）
+REC_MODEL_NAME = 'PP-OCRv5_mobile_rec'   # 轻量级识别（~30ms）
+
+
+def compute_cpu_threads(pool_size: int, configured_threads: int = 0, processes: int = 1) -> int:
+    """计算每组引擎的推理线程数
+
+    使 进程数 × 引擎数 × 每引擎线程数 ≈ 物理核心数,避免超线程争用。
+
+    Args:
+        pool_size: 引擎池大小
+        configured_threads: 显式配置的线程数(0表示自动计算)
+        processes: 服务进程数(多进程部署时各进程的引擎共享物理核心)
+
+    Returns:
+        每组引擎的推理线程数
+    """
+    if configured_threads > 0:
+        return configured_threads
+    physical_cores = psutil.cpu_count(logical=False) or psutil.cpu_count(logical=True) or 1
+    return max(1, physical_cores // (max(1, pool_size) * max(1, processes)))
+
+
+class OCREngine:
+    """一组文本检测+识别引擎"""
+
+    def __init__(self, engine_id: int, cpu_threads: int, enable_mkldnn: bool):
+        """初始化检测和识别引擎
+
+        Args:
+            engine_id: 引擎编号(用于日志)
+            cpu_threads: 推理线程数
+            enable_mkldnn: 是否启用MKLDNN加速
+        """
+        self.engine_id = engine_id
+
+        # 初始化文本检测引擎
+        self.text_detector = TextDetection(
+            model_name=DET_MODEL_NAME,
+            enable_mkldnn=enable_mkldnn,        # CPU自适应优化
+            cpu_threads=cpu_threads,
+        )
+        logger.info(
+            "text_detector_initialized",
+            status="success",
+            model=DET_MODEL_NAME,
+            engine_id=engine_id
+        )
+
+        # 初始化文本识别引擎
+        self.text_recognizer = TextRecognition(
+            model_name=REC_MODEL_NAME,
+            enable_mkldnn=enable_mkldnn,        # CPU自适应优化
+            cpu_threads=cpu_threads,
+        )
+        logger.info(
+            "text_recognizer_initialized",
+            status="success",
+            model=REC_MODEL_NAME,
+            engine_id=engine_id
+        )
+
+
+class EnginePool:
+    """OCR引擎池(借出/归还语义)"""
+
+    def __init__(self, size: int, cpu_threads: int = 0, processes: int = 1):
+        """创建引擎池
+
+        Args:
+            size: 引擎组数
+            cpu_threads: 每组引擎推理线程数(0表示按物理核心数自动计算)
+            processes: 服务进程数(自动计算线程数时按进程数均分物理核心)
+        """
+        self.size = max(1, size)
+
+        # 检测CPU信息
+        cpu_processor = platform.processor()
+        is_intel_cpu = 'intel' in cpu_processor.lower()
+        self.cpu_threads = compute_cpu_threads(self.size, cpu_threads, processes)
+
+        logger.info(
+            "cpu_detection",
+            processor=cpu_processor,
+            is_intel=is_intel_cpu,
+            physical_cores=psutil.cpu_count(logical=False) or 1,
+            logical_threads=psutil.cpu_count(logical=True) or 1,
+            pool_size=self.size,
+            processes=processes,
+            threads_per_engine=self.cpu_threads,
+            mkldnn_enabled=is_intel_cpu
+        )
+
+        self.engines: List[OCREngine] = []
+        self._idle: "queue.Queue[OCREngine]" = queue.Queue()
+        for engine_id in range(self.size):
+            engine = OCREngine(engine_id, self.cpu_threads, is_intel_cpu)
+            self.engines.append(engine)
+            self._idle.put(engine)
+
+        self._lock = threading.Lock()
+        self._busy = 0
+
+    @property
+    def busy(self) -> int:
+        """当前被借出的引擎数"""
+        return self._busy
+
+    @contextmanager
+    def checkout(self, timeout: float = None) -> Iterator[OCREngine]:
+        """借出一组引擎,退出上下文时自动归还
+
+        Args:
+            timeout: 等待空闲引擎的超时时间(秒),None表示一直等待
+
+        Yields:
+            OCREngine实例
+
+        Raises:
+            queue.Empty: 超时仍无空闲引擎
+        """
+        engine = self._idle.get(timeout=timeout)
+        with self._lock:
+            self._busy += 1
+            OCR_BUSY_ENGINES.set(self._busy)
+        try:
+            yield engine
+        finally:
+            with self._lock:
+                self._busy -= 1
+                OCR_BUSY_ENGINES.set(self._busy)
+            self._idle.put(engine)
+
+    @contextmanager
+    def checkout_all(self) -> Iterator[List[OCREngine]]:
+        """借出全部引擎(用于预热等需要独占所有引擎的操作)
+
+        Yields:
+            全部OCREngine实例列表
+        """
+        engines = [self._idle.get() for _ in range(self.size)]
+        with self._lock:
+            self._busy += len(engines)
+            OCR_BUSY_ENGINES.set(self._busy)
+        try:
+            yield engines
+        finally:
+            with self._lock:
+                self._busy -= len(engines)
+                OCR_BUSY_ENGINES.set(self._busy)
+            for engine in engines:
+                self._idle.put(engine)
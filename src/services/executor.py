@@ -0,0 +1,197 @@
+"""推理执行器
+
+将同步的OCR推理调度到专用线程池中执行,避免阻塞事件循环;
+通过有界的准入队列限制同时排队的请求数,过载时快速失败。
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from src.core.config import settings
+from src.core.deadline import Deadline, TimeoutException
+from src.core.logging import get_logger
+from src.core.metrics import OCR_IN_FLIGHT, OCR_QUEUE_DEPTH
+
+logger = get_logger(__name__)
+
+
+class QueueFullException(Exception):
+    """推理队列已满异常"""
+    pass
+
+
+class InferenceExecutor:
+    """带准入控制的推理线程池
+
+    PaddleOCR推理在C++层释放GIL,使用线程池即可利用多核,
+    同时避免进程池带来的模型重复加载和数据序列化开销。
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int):
+        """初始化推理执行器
+
+        Args:
+            max_workers: 推理线程数
+            max_queue_size: 最大排队请求数(不含正在执行的请求)
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max(0, max_queue_size)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="ocr-infer"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0   # 已接纳的任务数(排队+执行中)
+        self._running = 0   # 正在执行的任务数
+
+        logger.info(
+            "inference_executor_initialized",
+            max_workers=self.max_workers,
+            max_queue_size=self.max_queue_size
+        )
+
+    @property
+    def capacity(self) -> int:
+        """可同时接纳的最大任务数"""
+        return self.max_workers + self.max_queue_size
+
+    @property
+    def in_flight(self) -> int:
+        """正在执行的任务数"""
+        return self._running
+
+    @property
+    def queue_depth(self) -> int:
+        """排队等待执行的任务数"""
+        return max(0, self._pending - self._running)
+
+    def _publish(self) -> None:
+        """更新队列指标(持有self._lock时调用)"""
+        OCR_QUEUE_DEPTH.set(self.queue_depth)
+        OCR_IN_FLIGHT.set(self._running)
+
+    def _admit(self) -> None:
+        """准入检查,队列已满时抛出QueueFullException"""
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise QueueFullException(
+                    f"推理队列已满(容量{self.capacity})"
+                )
+            self._pending += 1
+            self._publish()
+
+    def _release(self, _future=None) -> None:
+        """任务结束(完成/失败/取消)后释放名额"""
+        with self._lock:
+            self._pending -= 1
+            self._publish()
+
+    def _invoke(
+        self,
+        func: Callable[..., Any],
+        args: tuple,
+        deadline: Optional[Deadline],
+        submitted_at: float,
+        timings: Optional[Dict[str, float]]
+    ) -> Any:
+        """在工作线程中执行任务"""
+        if timings is not None:
+            timings["queue_wait"] = time.perf_counter() - submitted_at
+        with self._lock:
+            self._running += 1
+            self._publish()
+        try:
+            # 排队期间已超时的任务不再执行
+            if deadline is not None:
+                deadline.check("queue")
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._publish()
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        deadline: Optional[Deadline] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Any:
+        """在推理线程池中执行同步函数并等待结果
+
+        Args:
+            func: 待执行的同步函数(需要关键字参数时请使用functools.partial)
+            *args: 位置参数
+            deadline: 截止时间;排队超时的任务不会执行,等待超时或调用方被取消时
+                取消该截止时间,使工作线程在下一个阶段检查点中止
+            timings: 可选,写入queue_wait(从提交到开始执行的排队耗时,秒)
+
+        Returns:
+            函数返回值
+
+        Raises:
+            QueueFullException: 队列已满
+            TimeoutException: 超过截止时间
+        """
+        self._admit()
+        try:
+            future = self._executor.submit(
+                self._invoke, func, args, deadline, time.perf_counter(), timings
+            )
+        except Exception:
+            self._release()
+            raise
+        # 完成或取消时均释放名额(协程被取消时尚未开始的任务也会被取消)
+        future.add_done_callback(self._release)
+
+        if deadline is None:
+            return await asyncio.wrap_future(future)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=deadline.remaining())
+        except asyncio.TimeoutError:
+            deadline.cancel("OCR处理超时")
+            raise TimeoutException(
+                f"OCR处理超时(限制{deadline.timeout_sec * 1000:.0f}ms)"
+            )
+        except asyncio.CancelledError:
+            deadline.cancel()
+            raise
+
+    def shutdown(self) -> None:
+        """关闭执行器,取消尚未开始的任务"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("inference_executor_shutdown")
+
+
+# 全局推理执行器实例
+_inference_executor = None
+_inference_executor_lock = threading.Lock()
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """获取推理执行器实例
+
+    Returns:
+        InferenceExecutor实例
+    """
+    global _inference_executor
+    if _inference_executor is None:
+        with _inference_executor_lock:
+            if _inference_executor is None:
+                _inference_executor = InferenceExecutor(
+                    max_workers=settings.OCR_EXECUTOR_WORKERS or settings.OCR_ENGINE_POOL_SIZE,
+                    max_queue_size=settings.OCR_QUEUE_MAX_SIZE
+                )
+    return _inference_executor
+
+
+def shutdown_inference_executor() -> None:
+    """关闭全局推理执行器(应用退出时调用)"""
+    global _inference_executor
+    with _inference_executor_lock:
+        if _inference_executor is not None:
+            _inference_executor.shutdown()
+            _inference_executor = None
@@ -0,0 +1,161 @@
+"""引擎健康监测
+
+后台定期对OCR引擎执行自检并缓存结果,健康检查接口只读取缓存,
+探针请求不再占用推理引擎。
+"""
+import asyncio
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.services.ocr_service import get_ocr_service, is_ocr_service_loaded
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class HealthSnapshot:
+    """一次引擎自检的结果"""
+    healthy: bool
+    checked_at: float               # time.monotonic()时间戳
+    error: Optional[str] = None
+
+    @property
+    def age_seconds(self) -> float:
+        """距离自检完成的时间(秒)"""
+        return time.monotonic() - self.checked_at
+
+
+class HealthMonitor:
+    """后台周期性引擎自检"""
+
+    def __init__(self, interval_sec: float, engine_timeout_sec: float):
+        """初始化健康监测
+
+        Args:
+            interval_sec: 自检间隔(秒)
+            engine_timeout_sec: 等待空闲引擎的最长时间(秒),
+                超时说明引擎均在处理请求,本轮自检跳过
+        """
+        self.interval_sec = interval_sec
+        self.engine_timeout_sec = engine_timeout_sec
+        self._snapshot: Optional[HealthSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def snapshot(self) -> Optional[HealthSnapshot]:
+        """最近一次自检结果,尚未自检时为None"""
+        return self._snapshot
+
+    @property
+    def running(self) -> bool:
+        """后台自检是否在运行"""
+        return self._task is not None and not self._task.done()
+
+    def record_failure(self, error: str) -> None:
+        """记录引擎加载失败
+
+        引擎未加载时后台自检不会更新结果,该失败结果会一直保留到引擎加载成功。
+
+        Args:
+            error: 错误信息
+        """
+        self._snapshot = HealthSnapshot(healthy=False, checked_at=time.monotonic(), error=error)
+
+    def _self_test(self) -> Optional[HealthSnapshot]:
+        """执行一次引擎自检(阻塞,在线程中调用)
+
+        引擎由应用启动流程或首个识别请求加载,自检不会触发加载。
+
+        Returns:
+            自检结果;引擎未加载或全部繁忙时返回None
+        """
+        if not is_ocr_service_loaded():
+            return None
+
+        try:
+            healthy = get_ocr_service().health_check(engine_timeout=self.engine_timeout_sec)
+            return HealthSnapshot(healthy=healthy, checked_at=time.monotonic())
+        except queue.Empty:
+            # 所有引擎都在处理请求,保留上次结果
+            logger.debug("health_self_test_skipped", reason="engines_busy")
+            return None
+        except Exception as e:
+            logger.error("health_self_test_failed", error=str(e))
+            return HealthSnapshot(healthy=False, checked_at=time.monotonic(), error=str(e))
+
+    async def refresh(self) -> Optional[HealthSnapshot]:
+        """执行一次自检并更新缓存结果
+
+        Returns:
+            最新的自检结果
+        """
+        async with self._refresh_lock:
+            snapshot = await asyncio.to_thread(self._self_test)
+            if snapshot is not None:
+                self._snapshot = snapshot
+            return self._snapshot
+
+    async def get_snapshot(self) -> Optional[HealthSnapshot]:
+        """获取自检结果
+
+        后台自检运行时直接返回缓存;未运行(如未经过应用生命周期启动)且
+        缓存过期时对已加载的引擎同步执行一次自检,引擎未加载时返回缓存结果。
+        """
+        if self.running:
+            return self._snapshot
+        if self._snapshot is None or self._snapshot.age_seconds > self.interval_sec:
+            return await self.refresh()
+        return self._snapshot
+
+    async def _run(self) -> None:
+        """后台自检循环"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error("health_monitor_error", error=str(e))
+            await asyncio.sleep(self.interval_sec)
+
+    def start(self) -> None:
+        """启动后台自检"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+            logger.info("health_monitor_started", interval_sec=self.interval_sec)
+
+    async def stop(self) -> None:
+        """停止后台自检"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# 全局健康监测实例
+_health_monitor = None
+_health_monitor_lock = threading.Lock()
+
+
+def get_health_monitor() -> HealthMonitor:
+    """获取健康监测实例
+
+    Returns:
+        HealthMonitor实例
+    """
+    global _health_monitor
+    if _health_monitor is None:
+        with _health_monitor_lock:
+            if _health_monitor is None:
+                _health_monitor = HealthMonitor(
+                    interval_sec=settings.HEALTH_CHECK_INTERVAL_SEC,
+                    engine_timeout_sec=settings.HEALTH_CHECK_ENGINE_TIMEOUT_SEC
+                )
+    return _health_monitor
@@ -1,17 +1,43 @@
 """图片预处理服务"""
 import io
+import math
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 from PIL import Image
 
+from src.core.config import settings
 from src.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# JPEG草稿解码允许的最小尺寸比例:解码结果可略小于目标尺寸(如12MP照片4032px
+# 按1/2解码为2016px),以换取跳过完整解码和后续缩放
+DRAFT_MIN_RATIO = 0.9
+
+# 可选的缩放滤波器(按速度从快到慢大致排列)
+RESAMPLE_FILTERS = {
+    "nearest": Image.Resampling.NEAREST,
+    "box": Image.Resampling.BOX,
+    "bilinear": Image.Resampling.BILINEAR,
+    "hamming": Image.Resampling.HAMMING,
+    "bicubic": Image.Resampling.BICUBIC,
+    "lanczos": Image.Resampling.LANCZOS,
+}
+
+
+def _get_resample_filter() -> Image.Resampling:
+    """获取配置的缩放滤波器,未知名称时回退到LANCZOS"""
+    return RESAMPLE_FILTERS.get(settings.IMAGE_RESAMPLE.lower(), Image.Resampling.LANCZOS)
 
-def preprocess_image(image_bytes: bytes) -> Image.Image:
+
+def preprocess_image(image_bytes: bytes, timings: Optional[Dict[str, float]] = None) -> Image.Image:
     """图片预处理优化识别
 
     Args:
         image_bytes: 图片字节数据
+        timings: 可选,写入各阶段耗时(秒): decode为像素解码,preprocess为格式转换和缩放
 
     Returns:
         预处理后的PIL Image对象
@@ -20,16 +46,36 @@ def preprocess_image(image_bytes: bytes) -> Image.Image:
         ValueError: 图片无法打开或处理失败
     """
     try:
-        # 打开图片
+        decode_start = time.perf_counter()
+        # 打开图片(仅读取文件头,尚未解码像素)
         img = Image.open(io.BytesIO(image_bytes))
+        max_dimension = settings.IMAGE_MAX_DIMENSION
 
-        # 1. 格式转换(统一为RGB)
+        # 1. JPEG草稿模式:解码时直接按1/2、1/4、1/8缩小(DCT域缩放),
+        #    大图无需完整解码,显著降低解码耗时和峰值内存
+        if img.format == 'JPEG' and max(img.size) > max_dimension:
+            scale = max_dimension * DRAFT_MIN_RATIO / max(img.size)
+            requested_size = (math.ceil(img.width * scale), math.ceil(img.height * scale))
+            original_size = img.size
+            img.draft('RGB', requested_size)
+            logger.debug(
+                "image_draft",
+                original_size=original_size,
+                draft_size=img.size
+            )
+
+        # 解码像素(PIL延迟解码,显式加载以便单独统计解码耗时)
+        img.load()
+        preprocess_start = time.perf_counter()
+        if timings is not None:
+            timings["decode"] = preprocess_start - decode_start
+
+        # 2. 格式转换(统一为RGB)
         if img.mode != 'RGB':
             logger.debug("image_convert", original_mode=img.mode, target_mode="RGB")
             img = img.convert('RGB')
 
-        # 2. 尺寸优化(大图压缩,节省内存和处理时间)
-        max_dimension = 2048
+        # 3. 尺寸优化(大图压缩,节省内存和处理时间)
         if max(img.size) > max_dimension:
             ratio = max_dimension / max(img.size)
             new_size = (int(img.width * ratio), int(img.height * ratio))
@@ -39,7 +85,8 @@ def preprocess_image(image_bytes: bytes) -> Image.Image:
                 new_size=new_size,
                 ratio=ratio
             )
-            img = img.resize(new_size, Image.LANCZOS)
+            # reducing_gap: 先用Image.reduce按整数倍快速缩小,再用滤波器精确缩放
+            img = img.resize(new_size, _get_resample_filter(), reducing_gap=2.0)
 
         logger.debug(
             "image_preprocessed",
@@ -48,8 +95,318 @@ def preprocess_image(image_bytes: bytes) -> Image.Image:
             format=img.format
         )
 
+        if timings is not None:
+            timings["preprocess"] = time.perf_counter() - preprocess_start
         return img
 
     except Exception as e:
         logger.error("image_preprocess_failed", error=str(e))
         raise ValueError(f"图片预处理失败: {str(e)}")
+
+
+def decode_image(image_bytes: bytes, timings: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """解码并预处理图片,返回模型输入数组
+
+    图片只解码一次并转换为单个连续的RGB uint8数组(HxWx3),
+    后续文本框裁剪直接在该数组上切片得到视图,不再经过PIL往返复制。
+    返回的数组为只读,调用方不应原地修改。
+
+    Args:
+        image_bytes: 图片字节数据
+        timings: 可选,写入decode/preprocess阶段耗时(秒)
+
+    Returns:
+        预处理后的RGB图像数组
+
+    Raises:
+        ValueError: 图片无法打开或处理失败
+    """
+    img = preprocess_image(image_bytes, timings)
+    try:
+        # np.asarray通过数组接口直接引用PIL导出的像素缓冲区,只复制一次
+        convert_start = time.perf_counter()
+        img_array = np.asarray(img)
+        if timings is not None:
+            convert_time = time.perf_counter() - convert_start
+            timings["preprocess"] = timings.get("preprocess", 0.0) + convert_time
+        return img_array
+    except Exception as e:
+        logger.error("image_decode_failed", error=str(e))
+        raise ValueError(f"图片解码失败: {str(e)}")
+
+
+def prepare_array(img_array: np.ndarray, timings: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """预处理调用方直接提供的像素数组,返回模型输入数组
+
+    与decode_image对编码图片的处理一致:统一为连续的RGB uint8数组(HxWx3),
+    最长边超过IMAGE_MAX_DIMENSION时缩小。输入已是像素数据,无需解码。
+
+    Args:
+        img_array: uint8图像数组,HxW(灰度)或HxWxC(C为1/3/4,通道顺序RGB/RGBA)
+        timings: 可选,写入decode/preprocess阶段耗时(秒),decode恒为0
+
+    Returns:
+        预处理后的RGB图像数组
+
+    Raises:
+        ValueError: 数组类型或形状不受支持
+    """
+    preprocess_start = time.perf_counter()
+    if timings is not None:
+        timings["decode"] = 0.0
+
+    arr = np.asarray(img_array)
+    if arr.dtype != np.uint8:
+        raise ValueError(f"图像数组类型必须为uint8,实际为{arr.dtype}")
+    if arr.ndim == 3 and arr.shape[2] in (1, 4):
+        # 灰度单通道压缩为二维,RGBA丢弃Alpha通道
+        arr = arr[:, :, 0] if arr.shape[2] == 1 else arr[:, :, :3]
+    if arr.ndim not in (2, 3) or (arr.ndim == 3 and arr.shape[2] != 3) or min(arr.shape[:2]) == 0:
+        raise ValueError(f"不支持的图像数组形状: {arr.shape}")
+    arr = np.ascontiguousarray(arr)
+
+    max_dimension = settings.IMAGE_MAX_DIMENSION
+    height, width = arr.shape[:2]
+    if max(height, width) > max_dimension:
+        import cv2  # PaddleOCR依赖opencv
+
+        ratio = max_dimension / max(height, width)
+        new_size = (max(1, int(width * ratio)), max(1, int(height * ratio)))
+        arr = cv2.resize(arr, new_size, interpolation=cv2.INTER_AREA)
+
+    if arr.ndim == 2:
+        # 缩小后再扩展为三通道,减少复制量
+        arr = np.repeat(arr[:, :, None], 3, axis=2)
+
+    if timings is not None:
+        timings["preprocess"] = time.perf_counter() - preprocess_start
+    return arr
+
+
+def polys_to_boxes(
+    polys: Union[np.ndarray, Sequence],
+    width: int,
+    height: int,
+    padding: int = 2
+) -> np.ndarray:
+    """将检测多边形批量转换为带padding的外接矩形
+
+    所有多边形在一次向量化计算中完成取最值、加padding和边界裁剪。
+
+    Args:
+        polys: 检测多边形,形如(N, K, 2)的数组或多边形列表
+        width: 图片宽度
+        height: 图片高度
+        padding: 外扩像素数(避免裁剪太紧)
+
+    Returns:
+        形如(N, 4)的int数组,每行为(x_min, y_min, x_max, y_max)
+    """
+    if len(polys) == 0:
+        return np.empty((0, 4), dtype=np.int64)
+
+    poly_array = np.asarray(polys) if _is_uniform(polys) else None
+    if poly_array is not None and poly_array.ndim == 3:
+        mins = poly_array.min(axis=1)
+        maxs = poly_array.max(axis=1)
+    else:
+        # 顶点数不一致的多边形逐个取最值
+        mins = np.array([np.asarray(poly).min(axis=0) for poly in polys])
+        maxs = np.array([np.asarray(poly).max(axis=0) for poly in polys])
+
+    boxes = np.concatenate([mins, maxs], axis=1).astype(np.int64)
+    boxes[:, :2] -= padding
+    boxes[:, 2:] += padding
+    np.clip(boxes[:, 0::2], 0, width, out=boxes[:, 0::2])
+    np.clip(boxes[:, 1::2], 0, height, out=boxes[:, 1::2])
+    return boxes
+
+
+def resize_for_detection(img_array: np.ndarray, limit_side_len: int) -> Tuple[np.ndarray, float]:
+    """缩小图像作为检测输入
+
+    检测只需要定位文本区域,在较低分辨率上运行即可;裁剪和识别仍使用原图。
+
+    Args:
+        img_array: 图像数组(HxWx3)
+        limit_side_len: 检测输入最长边上限(像素)
+
+    Returns:
+        (检测输入数组, 缩放比例)元组,比例为 检测输入尺寸/原图尺寸,未缩放时为1.0
+    """
+    height, width = img_array.shape[:2]
+    if limit_side_len <= 0 or max(height, width) <= limit_side_len:
+        return img_array, 1.0
+
+    import cv2  # PaddleOCR依赖opencv
+
+    scale = limit_side_len / max(height, width)
+    new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    # INTER_AREA缩小时抗混叠,速度快于PIL的高质量滤波器
+    resized = cv2.resize(img_array, new_size, interpolation=cv2.INTER_AREA)
+    return resized, new_size[0] / width
+
+
+def scale_polys(
+    polys: Union[np.ndarray, Sequence],
+    factor: float
+) -> Union[np.ndarray, List[np.ndarray]]:
+    """按比例缩放检测多边形坐标
+
+    Args:
+        polys: 检测多边形
+        factor: 缩放比例
+
+    Returns:
+        缩放后的多边形(规则多边形返回(N, K, 2)数组,否则返回数组列表)
+    """
+    if len(polys) == 0:
+        return polys
+    if _is_uniform(polys):
+        return np.asarray(polys, dtype=np.float32) * factor
+    return [np.asarray(poly, dtype=np.float32) * factor for poly in polys]
+
+
+def median_text_height(polys: Union[np.ndarray, Sequence]) -> float:
+    """计算检测框高度的中位数
+
+    Args:
+        polys: 检测多边形
+
+    Returns:
+        高度中位数(像素),没有检测框时为0
+    """
+    if len(polys) == 0:
+        return 0.0
+    if _is_uniform(polys):
+        poly_array = np.asarray(polys, dtype=np.float32)
+        heights = poly_array[:, :, 1].max(axis=1) - poly_array[:, :, 1].min(axis=1)
+    else:
+        heights = [np.ptp(np.asarray(poly)[:, 1]) for poly in polys]
+    return float(np.median(heights))
+
+
+def difference_hash(img_array: np.ndarray, hash_size: int = 8) -> np.ndarray:
+    """计算图像的差异哈希(dHash)
+
+    将图像缩小为(hash_size+1)xhash_size的灰度图,比较每行相邻像素的明暗得到
+    hash_size*hash_size位哈希。重新编码、轻微缩放或压缩的同一张图片哈希几乎不变,
+    汉明距离可衡量图片的相似程度。
+
+    Args:
+        img_array: 图像数组(HxWx3或HxW)
+        hash_size: 哈希边长
+
+    Returns:
+        按位打包的哈希(长度为hash_size*hash_size/8的uint8数组)
+    """
+    import cv2  # PaddleOCR依赖opencv
+
+    # 先缩小再转灰度,只对极少像素做颜色运算
+    small = cv2.resize(img_array, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = small.mean(axis=2)
+    bits = small[:, 1:] > small[:, :-1]
+    return np.packbits(bits.ravel())
+
+
+def _is_uniform(polys: Union[np.ndarray, Sequence]) -> bool:
+    """判断多边形是否可以组成规则的三维数组"""
+    if isinstance(polys, np.ndarray):
+        return polys.dtype != object
+    return len({len(poly) for poly in polys}) == 1
+
+
+def _order_quad(quad: np.ndarray) -> np.ndarray:
+    """将四边形顶点排序为左上、右上、右下、左下"""
+    sums = quad.sum(axis=1)
+    diffs = np.diff(quad, axis=1).ravel()
+    return np.array([
+        quad[np.argmin(sums)],
+        quad[np.argmin(diffs)],
+        quad[np.argmax(sums)],
+        quad[np.argmax(diffs)],
+    ], dtype=np.float32)
+
+
+def _warp_quad(img_array: np.ndarray, quad: np.ndarray) -> np.ndarray:
+    """透视变换裁剪倾斜文本框并校正为水平方向"""
+    import cv2  # PaddleOCR依赖opencv,仅透视裁剪模式需要
+
+    tl, tr, br, bl = _order_quad(quad)
+    crop_width = int(max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl)))
+    crop_height = int(max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr)))
+    if crop_width < 1 or crop_height < 1:
+        return img_array[0:0, 0:0]
+
+    src = np.array([tl, tr, br, bl], dtype=np.float32)
+    dst = np.array(
+        [[0, 0], [crop_width, 0], [crop_width, crop_height], [0, crop_height]],
+        dtype=np.float32
+    )
+    matrix = cv2.getPerspectiveTransform(src, dst)
+    cropped = cv2.warpPerspective(
+        img_array,
+        matrix,
+        (crop_width, crop_height),
+        borderMode=cv2.BORDER_REPLICATE,
+        flags=cv2.INTER_CUBIC
+    )
+
+    # 竖排文本框旋转为横向
+    if crop_height >= crop_width * 1.5:
+        cropped = np.rot90(cropped)
+    return cropped
+
+
+def extract_crops(
+    img_array: np.ndarray,
+    polys: Union[np.ndarray, Sequence],
+    mode: str = "bbox",
+    padding: int = 2,
+    return_indices: bool = False
+) -> Union[List[np.ndarray], Tuple[List[np.ndarray], List[int]]]:
+    """按检测多边形裁剪文本区域
+
+    Args:
+        img_array: 图像数组(HxWx3)
+        polys: 检测多边形
+        mode: 裁剪方式,"bbox"为外接矩形切片(视图,不复制),
+            "perspective"为透视校正裁剪(适合倾斜文本,仅支持四边形)
+        padding: 外接矩形外扩像素数
+        return_indices: 是否同时返回各裁剪图对应的多边形下标
+
+    Returns:
+        裁剪图列表(已过滤空区域);return_indices为True时返回(裁剪图列表, 下标列表)
+    """
+    crops, indices = _extract_crops(img_array, polys, mode, padding)
+    return (crops, indices) if return_indices else crops
+
+
+def _extract_crops(
+    img_array: np.ndarray,
+    polys: Union[np.ndarray, Sequence],
+    mode: str,
+    padding: int
+) -> Tuple[List[np.ndarray], List[int]]:
+    """裁剪文本区域,返回裁剪图及对应的多边形下标"""
+    if len(polys) == 0:
+        return [], []
+
+    if mode == "perspective" and _is_uniform(polys):
+        quads = np.asarray(polys, dtype=np.float32)
+        if quads.ndim == 3 and quads.shape[1] == 4:
+            crops = [_warp_quad(img_array, quad) for quad in quads]
+            indices = [i for i, crop in enumerate(crops) if crop.size > 0]
+            return [crops[i] for i in indices], indices
+
+    height, width = img_array.shape[:2]
+    boxes = polys_to_boxes(polys, width, height, padding)
+
+    # 过滤裁剪后面积为0的文本框
+    valid = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+    crops = [
+        img_array[y_min:y_max, x_min:x_max]
+        for x_min, y_min, x_max, y_max in boxes[valid].tolist()
+    ]
+    return crops, np.flatnonzero(valid).tolist()
@@ -0,0 +1,370 @@
+"""异步识别任务
+
+大批量图片以任务方式提交:接口读取并校验上传内容后立即返回任务ID,
+任务在进程内队列中排队,由后台协程逐项识别,客户端轮询或流式获取结果。
+任务存储通过JobStore接口可替换,默认保存在进程内存中。
+"""
+import asyncio
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from src.core.config import settings
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 单项识别函数: (index, filename, content, semaphore) -> 结果
+ProcessItem = Callable[[int, str, bytes, asyncio.Semaphore], Awaitable[Any]]
+
+
+class JobQueueFullException(Exception):
+    """任务队列已满"""
+    pass
+
+
+class JobStatus(str, Enum):
+    """任务状态"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class JobItem:
+    """任务中的单张图片"""
+    index: int
+    filename: str
+    content: Optional[bytes] = None     # 识别完成后释放
+    result: Any = None                  # 校验失败的项提交时即有结果
+
+
+@dataclass
+class Job:
+    """识别任务"""
+    job_id: str
+    items: List[JobItem]
+    status: JobStatus = JobStatus.PENDING
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # 按完成顺序记录的结果下标
+    completed_order: List[int] = field(default_factory=list)
+    # 结果更新通知(流式输出等待新结果)
+    updated: Optional[asyncio.Condition] = field(default=None, repr=False)
+
+    @property
+    def total(self) -> int:
+        """图片总数"""
+        return len(self.items)
+
+    @property
+    def completed(self) -> int:
+        """已完成的图片数"""
+        return len(self.completed_order)
+
+    @property
+    def finished(self) -> bool:
+        """任务是否已结束"""
+        return self.status in (JobStatus.COMPLETED, JobStatus.CANCELLED)
+
+    def results(self) -> List[Any]:
+        """已完成的结果(按图片索引排序)"""
+        return [self.items[i].result for i in sorted(self.completed_order)]
+
+    async def record(self, index: int, result: Any) -> None:
+        """记录单项结果并通知等待者"""
+        item = self.items[index]
+        item.result = result
+        item.content = None
+        self.completed_order.append(index)
+        await self.notify()
+
+    async def notify(self) -> None:
+        """通知等待结果的协程"""
+        if self.updated is not None:
+            async with self.updated:
+                self.updated.notify_all()
+
+
+class JobStore(ABC):
+    """任务存储接口"""
+
+    @abstractmethod
+    def put(self, job: Job) -> None:
+        """保存任务"""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """获取任务,不存在或已过期时返回None"""
+
+    @abstractmethod
+    def delete(self, job_id: str) -> None:
+        """删除任务"""
+
+
+class InMemoryJobStore(JobStore):
+    """进程内任务存储
+
+    已结束的任务保留ttl_sec秒;超过max_jobs时优先淘汰最早结束的任务。
+    """
+
+    def __init__(self, max_jobs: int, ttl_sec: float):
+        """初始化任务存储
+
+        Args:
+            max_jobs: 最多保存的任务数
+            ttl_sec: 已结束任务的保留时间(秒)
+        """
+        self.max_jobs = max(1, max_jobs)
+        self.ttl_sec = ttl_sec
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _purge(self) -> None:
+        """清理过期任务(调用方持有锁)"""
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at is not None and now - job.finished_at > self.ttl_sec
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+        overflow = len(self._jobs) - self.max_jobs
+        if overflow > 0:
+            finished = sorted(
+                (job for job in self._jobs.values() if job.finished),
+                key=lambda job: job.finished_at or 0
+            )
+            for job in finished[:overflow]:
+                del self._jobs[job.job_id]
+
+    def put(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._purge()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._purge()
+            return self._jobs.get(job_id)
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+
+class JobManager:
+    """任务调度
+
+    任务按提交顺序排队,max_concurrent_jobs个后台协程依次执行;所有任务共享
+    max_in_flight个识别并发名额,图片逐项送入推理执行器。
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        max_queued_jobs: int,
+        max_concurrent_jobs: int = 1,
+        max_in_flight: int = 4
+    ):
+        """初始化任务调度
+
+        Args:
+            store: 任务存储
+            max_queued_jobs: 最大排队任务数(超出时拒绝提交)
+            max_concurrent_jobs: 同时执行的任务数
+            max_in_flight: 所有任务同时识别的最大图片数
+        """
+        self.store = store
+        self.max_queued_jobs = max(1, max_queued_jobs)
+        self.max_concurrent_jobs = max(1, max_concurrent_jobs)
+        self.max_in_flight = max(1, max_in_flight)
+        self._queue: Optional[asyncio.Queue] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._workers: List[asyncio.Task] = []
+        self._process_item: Optional[ProcessItem] = None
+
+    @property
+    def running(self) -> bool:
+        """后台协程是否在运行"""
+        return any(not worker.done() for worker in self._workers)
+
+    @property
+    def queue_depth(self) -> int:
+        """排队等待执行的任务数"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self, process_item: ProcessItem) -> None:
+        """启动后台协程(已运行时不重复启动)
+
+        Args:
+            process_item: 单项识别函数
+        """
+        if self.running:
+            return
+        self._process_item = process_item
+        self._queue = asyncio.Queue(maxsize=self.max_queued_jobs)
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._workers = [
+            asyncio.create_task(self._worker(worker_id))
+            for worker_id in range(self.max_concurrent_jobs)
+        ]
+        logger.info(
+            "job_manager_started",
+            workers=self.max_concurrent_jobs,
+            max_in_flight=self.max_in_flight
+        )
+
+    async def stop(self) -> None:
+        """停止后台协程,未完成的任务标记为已取消"""
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            await self._finish(job, JobStatus.CANCELLED)
+
+    def submit(self, items: List[JobItem]) -> Job:
+        """提交任务
+
+        Args:
+            items: 任务中的图片(校验失败的项已带有结果)
+
+        Returns:
+            新建的任务
+
+        Raises:
+            JobQueueFullException: 排队任务数已达上限
+            RuntimeError: 后台协程未启动
+        """
+        if not self.running:
+            raise RuntimeError("任务调度未启动")
+
+        job = Job(job_id=uuid.uuid4().hex, items=items, updated=asyncio.Condition())
+        # 提交时已有结果的项(校验失败)直接计入完成
+        job.completed_order.extend(item.index for item in items if item.result is not None)
+
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullException(f"排队任务数已达上限({self.max_queued_jobs})")
+
+        self.store.put(job)
+        logger.info("job_submitted", job_id=job.job_id, total=job.total, queued=self.queue_depth)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """获取任务"""
+        return self.store.get(job_id)
+
+    async def _worker(self, worker_id: int) -> None:
+        """后台协程:依次执行排队的任务"""
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                await self._finish(job, JobStatus.CANCELLED)
+                raise
+            except Exception as e:
+                logger.error("job_failed", job_id=job.job_id, worker_id=worker_id, error=str(e))
+                await self._finish(job, JobStatus.CANCELLED)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        """执行任务:逐项识别,结果完成即记录"""
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        await job.notify()
+
+        async def run_item(item: JobItem) -> None:
+            result = await self._process_item(
+                item.index, item.filename, item.content, self._semaphore
+            )
+            await job.record(item.index, result)
+
+        pending = [item for item in job.items if item.result is None]
+        await asyncio.gather(*(run_item(item) for item in pending))
+        await self._finish(job, JobStatus.COMPLETED)
+
+        logger.info(
+            "job_completed",
+            job_id=job.job_id,
+            total=job.total,
+            duration_ms=int((job.finished_at - job.started_at) * 1000)
+        )
+
+    async def _finish(self, job: Job, status: "JobStatus") -> None:
+        """结束任务并通知等待者"""
+        job.status = status
+        job.finished_at = time.time()
+        for item in job.items:
+            item.content = None
+        await job.notify()
+
+    async def stream(self, job: Job) -> AsyncIterator[Any]:
+        """按完成顺序逐项输出任务结果,任务结束后停止
+
+        已完成的结果先输出,之后每完成一项立即输出。
+
+        Args:
+            job: 任务
+
+        Yields:
+            单项结果
+        """
+        sent = 0
+        while True:
+            async with job.updated:
+                await job.updated.wait_for(lambda: job.completed > sent or job.finished)
+                new_indices = job.completed_order[sent:]
+            for index in new_indices:
+                yield job.items[index].result
+            sent += len(new_indices)
+            if job.finished and sent >= job.completed:
+                return
+
+
+# 全局任务调度实例
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """获取任务调度实例
+
+    Returns:
+        JobManager实例
+    """
+    global _job_manager
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                _job_manager = JobManager(
+                    store=InMemoryJobStore(
+                        max_jobs=settings.JOB_MAX_STORED,
+                        ttl_sec=settings.JOB_RESULT_TTL_SEC
+                    ),
+                    max_queued_jobs=settings.JOB_MAX_QUEUED,
+                    max_concurrent_jobs=settings.JOB_MAX_CONCURRENT,
+                    max_in_flight=settings.JOB_MAX_IN_FLIGHT
+                )
+    return _job_manager
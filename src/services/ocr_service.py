@@ -1,27 +1,40 @@
 """OCR识别服务"""
-import re
+import hashlib
+import queue
 import time
-import signal
-import platform
-from typing import Optional, Tuple, List
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Optional, Sequence, Tuple, List, Union
 import numpy as np
-import psutil
 from PIL import Image
-from paddleocr import TextDetection, TextRecognition
 
 from src.core.config import settings
+from src.core.deadline import Deadline, TimeoutException
 from src.core.logging import get_logger
-from src.services.image_processor import preprocess_image
-
-
-class TimeoutException(Exception):
-    """超时异常"""
-    pass
-
-
-def timeout_handler(signum, frame):
-    """超时处理函数"""
-    raise TimeoutException("OCR处理超时")
+from src.core.metrics import (
+    OCR_CACHE_REQUESTS,
+    OCR_CROPS_PER_IMAGE,
+    OCR_CROP_CACHE_REQUESTS,
+    OCR_PERCEPTUAL_CACHE_DISTANCE,
+    OCR_PERCEPTUAL_CACHE_REQUESTS,
+    OCR_PERCEPTUAL_CACHE_SAVED_SECONDS,
+    OCR_STAGE_DURATION,
+    observe_stage_timings,
+)
+from src.services.amount_extractor import best_amount_candidate, extract_amount
+from src.services.batcher import MicroBatcher
+from src.services.cache import LRUCache, PerceptualCache
+from src.services.engine_pool import EnginePool, DET_MODEL_NAME, REC_MODEL_NAME
+from src.services.image_processor import (
+    decode_image,
+    difference_hash,
+    extract_crops,
+    median_text_height,
+    prepare_array,
+    resize_for_detection,
+    scale_polys,
+)
+from src.services.roi import reading_order, select_boxes
 
 logger = get_logger(__name__)
 
@@ -30,220 +43,202 @@ class OCRService:
     """OCR识别服务类"""
 
     def __init__(self):
-        """初始化PaddleOCR引擎"""
+        """初始化PaddleOCR引擎池"""
         logger.info("ocr_engine_initializing", engine="PaddleOCR", version="3.3.1")
 
         try:
-            # 检测CPU信息
-            cpu_processor = platform.processor()
-            cpu_info = cpu_processor.lower()
-            is_intel_cpu = 'intel' in cpu_info
-
-            # 获取CPU核心/线程数
-            physical_cores = psutil.cpu_count(logical=False) or 1
-            logical_threads = psutil.cpu_count(logical=True) or 1
-            optimal_threads = max(1, logical_threads // 2)  # 使用一半逻辑线程
-
-            # 详细日志输出
-            logger.info(
-                "cpu_detection",
-                processor=cpu_processor,
-                is_intel=is_intel_cpu,
-                physical_cores=physical_cores,
-                logical_threads=logical_threads,
-                optimal_threads=optimal_threads,
-                mkldnn_enabled=is_intel_cpu
-            )
-
             # PaddleOCR 3.3.1：Mobile检测+裁剪+Mobile识别
             # 使用检测定位文本区域，裁剪后识别以提高准确度
-
-            # 初始化文本检测引擎
-            self.text_detector = TextDetection(
-                model_name='PP-OCRv5_mobile_det',   # 轻量级检测（~120ms）
-                enable_mkldnn=is_intel_cpu,         # CPU自适应优化
-                cpu_threads=optimal_threads,
+            # 每组引擎独占使用,并发请求从池中借出不同的引擎组并行推理
+            self.engine_pool = EnginePool(
+                size=settings.OCR_ENGINE_POOL_SIZE,
+                cpu_threads=settings.OCR_CPU_THREADS,
+                processes=settings.OCR_WORKER_PROCESSES
             )
-            logger.info("text_detector_initialized", status="success", model="PP-OCRv5_mobile_det")
 
-            # 初始化文本识别引擎
-            self.text_recognizer = TextRecognition(
-                model_name='PP-OCRv5_mobile_rec',   # 轻量级识别（~30ms）
-                enable_mkldnn=is_intel_cpu,         # CPU自适应优化
-                cpu_threads=optimal_threads,
-            )
-            logger.info("text_recognizer_initialized", status="success", model="PP-OCRv5_mobile_rec")
+            # 识别微批调度器:合并并发请求的裁剪图,每组引擎一个批次执行线程
+            self.rec_batcher = None
+            if settings.OCR_MICRO_BATCH_ENABLED:
+                self.rec_batcher = MicroBatcher(
+                    predict_fn=self._predict_recognition,
+                    max_batch_size=settings.OCR_MICRO_BATCH_MAX_SIZE,
+                    max_wait_ms=settings.OCR_MICRO_BATCH_WAIT_MS,
+                    workers=self.engine_pool.size,
+                    name="rec-batcher"
+                )
+
+            # 识别结果缓存:重复提交的相同图片直接返回缓存结果
+            self.result_cache = None
+            if settings.RESULT_CACHE_ENABLED:
+                self.result_cache = LRUCache(
+                    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+                    ttl_sec=settings.RESULT_CACHE_TTL_SEC
+                )
+
+            # 裁剪图识别缓存:固定模板中像素相同的文本框(表头、"合计"等)不再送入识别模型
+            self.crop_cache = None
+            if settings.CROP_CACHE_ENABLED:
+                self.crop_cache = LRUCache(max_entries=settings.CROP_CACHE_MAX_ENTRIES)
+
+            # 近似重复图片缓存:按感知哈希的汉明距离匹配重新拍摄/重新编码的同一张图片
+            self.perceptual_cache = None
+            if settings.PERCEPTUAL_CACHE_ENABLED:
+                hash_size = settings.PERCEPTUAL_CACHE_HASH_SIZE
+                self.perceptual_cache = PerceptualCache(
+                    max_entries=settings.PERCEPTUAL_CACHE_MAX_ENTRIES,
+                    hash_bytes=(hash_size * hash_size + 7) // 8,
+                    max_distance=settings.PERCEPTUAL_CACHE_MAX_DISTANCE,
+                    ttl_sec=settings.PERCEPTUAL_CACHE_TTL_SEC
+                )
         except Exception as e:
             logger.error("ocr_engine_init_failed", error=str(e))
             raise
 
     def recognize_amount(
         self,
-        image_bytes: bytes,
-        filename: str = "unknown"
+        image: Union[bytes, np.ndarray],
+        filename: str = "unknown",
+        deadline: Optional[Deadline] = None,
+        timings: Optional[Dict[str, float]] = None
     ) -> Tuple[Optional[str], float, int, Optional[str], List[str]]:
         """识别图片中的金额
 
         Args:
-            image_bytes: 图片字节数据
+            image: 编码的图片字节数据,或已解码的uint8像素数组(HxW或HxWxC,RGB通道顺序)
             filename: 文件名(用于日志)
+            deadline: 请求截止时间(为None时按OCR_TIMEOUT_SEC新建),在各阶段之间检查
+            timings: 可选,写入各阶段耗时(秒): decode/preprocess/detection/crop/
+                recognition/extract/total,命中缓存时跳过的阶段不写入
 
         Returns:
             (金额, 置信度, 处理时间ms, 原始文本, 警告列表)元组
 
         Raises:
+            TimeoutException: 超过截止时间或请求被取消
             Exception: OCR处理失败
         """
         start_time = time.time()
-        warnings = []
 
-        try:
-            # 设置超时(仅在Unix系统上有效,Windows上signal.alarm不可用)
-            timeout_set = False
-            if hasattr(signal, 'SIGALRM'):
-                signal.signal(signal.SIGALRM, timeout_handler)
-                signal.alarm(settings.OCR_TIMEOUT_SEC)
-                timeout_set = True
-
-            # 1. 图片预处理
-            img = preprocess_image(image_bytes)
+        cache_key = None
+        if self.result_cache is not None:
+            cache_key = self._result_cache_key(image)
+            cached = self.result_cache.get(cache_key)
+            OCR_CACHE_REQUESTS.labels(result="hit" if cached is not None else "miss").inc()
+            if cached is not None:
+                amount, confidence, raw_text, warnings = cached
+                OCR_STAGE_DURATION.labels(stage="total").observe(time.time() - start_time)
+                if timings is not None:
+                    timings["total"] = time.time() - start_time
+                processing_time = int((time.time() - start_time) * 1000)
+                logger.info(
+                    "ocr_cache_hit",
+                    filename=filename,
+                    amount=amount,
+                    processing_time_ms=processing_time
+                )
+                return amount, confidence, processing_time, raw_text, list(warnings)
 
-            # 2. 转换为numpy数组供PaddleOCR使用
-            img_array = np.array(img)
+        stage_timings = {}
+        result = self._recognize_uncached(image, filename, deadline, start_time, stage_timings)
+        stage_timings["total"] = time.time() - start_time
+        observe_stage_timings(stage_timings)
+        if timings is not None:
+            timings.update(stage_timings)
 
-            # 3. 文本检测
-            det_start = time.time()
-            det_result = self.text_detector.predict(input=img_array)
-            det_time = int((time.time() - det_start) * 1000)
+        if cache_key is not None:
+            amount, confidence, _, raw_text, warnings = result
+            self.result_cache.put(cache_key, (amount, confidence, raw_text, tuple(warnings)))
 
-            # 4. 提取检测框并裁剪图片
-            crop_start = time.time()
-            cropped_images = []
+        return result
 
-            if isinstance(det_result, list) and len(det_result) > 0:
-                first_det = det_result[0]
-
-                # 从字典中获取dt_polys（检测到的多边形坐标）
-                if isinstance(first_det, dict) and 'dt_polys' in first_det:
-                    dt_polys = first_det['dt_polys']
-
-                    # 对每个检测到的文本框
-                    for idx, poly in enumerate(dt_polys):
-                        # poly是多边形顶点坐标 [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-                        # 转换为bbox (x_min, y_min, x_max, y_max)
-                        poly_array = np.array(poly)
-                        x_min = int(poly_array[:, 0].min())
-                        y_min = int(poly_array[:, 1].min())
-                        x_max = int(poly_array[:, 0].max())
-                        y_max = int(poly_array[:, 1].max())
-
-                        # 添加padding（避免裁剪太紧）
-                        padding = 2
-                        x_min = max(0, x_min - padding)
-                        y_min = max(0, y_min - padding)
-                        x_max = min(img.width, x_max + padding)
-                        y_max = min(img.height, y_max + padding)
-
-                        # 裁剪图片
-                        cropped = img.crop((x_min, y_min, x_max, y_max))
-                        cropped_array = np.array(cropped)
-                        cropped_images.append(cropped_array)
-
-            crop_time = int((time.time() - crop_start) * 1000)
-
-            # 4. 文本识别（识别裁剪后的图片）
-            rec_start = time.time()
+    def _result_cache_key(self, image: Union[bytes, np.ndarray]) -> str:
+        """计算识别结果缓存键
 
-            if len(cropped_images) > 0:
-                # 批量识别裁剪后的图片
-                rec_result = self.text_recognizer.predict(input=cropped_images, batch_size=len(cropped_images))
-            else:
-                # 如果没有检测到文本框，回退到识别整张图
-                logger.warning("no_text_boxes_detected", filename=filename)
-                rec_result = self.text_recognizer.predict(input=img_array, batch_size=1)
+        由图片内容哈希和影响识别结果的配置(模型、预处理参数)组成,
+        配置变化后旧结果不会被误用。
 
-            rec_time = int((time.time() - rec_start) * 1000)
+        Args:
+            image: 图片字节数据或像素数组
 
-            # 性能日志
-            logger.debug("ocr_performance",
-                        detection_ms=det_time,
-                        crop_ms=crop_time,
-                        recognition_ms=rec_time,
-                        num_crops=len(cropped_images))
+        Returns:
+            缓存键
+        """
+        if isinstance(image, np.ndarray):
+            # 像素数组按形状+像素内容哈希,与编码图片的键不会冲突
+            digest = "x".join(map(str, image.shape)) + ":" + hashlib.blake2b(
+                np.ascontiguousarray(image), digest_size=16
+            ).hexdigest()
+        else:
+            digest = hashlib.blake2b(image, digest_size=16).hexdigest()
+        return (
+            f"{digest}|{DET_MODEL_NAME}|{REC_MODEL_NAME}"
+            f"|{settings.IMAGE_MAX_DIMENSION}|{settings.IMAGE_RESAMPLE}"
+            f"|{settings.OCR_CROP_MODE}|{settings.OCR_CROP_PADDING}|{settings.OCR_ROI_MODE}"
+            f"|{settings.OCR_DET_MODE}|{settings.OCR_DET_LIMIT_SIDE_LEN}"
+        )
+
+    def _recognize_uncached(
+        self,
+        image: Union[bytes, np.ndarray],
+        filename: str,
+        deadline: Optional[Deadline],
+        start_time: float,
+        timings: Dict[str, float]
+    ) -> Tuple[Optional[str], float, int, Optional[str], List[str]]:
+        """执行完整的检测+识别流程(不经过结果缓存)
 
-            # 取消超时
-            if timeout_set:
-                signal.alarm(0)
+        Args:
+            image: 图片字节数据或像素数组
+            filename: 文件名(用于日志)
+            deadline: 请求截止时间
+            start_time: 请求开始时间(用于计算处理耗时)
+            timings: 写入各阶段耗时(秒)
 
-            # 5. 解析识别结果
-            texts = []
-            confidences = []
+        Returns:
+            (金额, 置信度, 处理时间ms, 原始文本, 警告列表)元组
+        """
+        if deadline is None:
+            deadline = Deadline(settings.OCR_TIMEOUT_SEC)
 
-            # 尝试解析结果
-            if rec_result is None or (isinstance(rec_result, list) and len(rec_result) == 0):
-                processing_time = int((time.time() - start_time) * 1000)
-                logger.warning("no_text_detected", filename=filename, processing_time_ms=processing_time)
-                return None, 0.0, processing_time, None, ["未检测到任何文本"]
+        try:
+            deadline.check("queue")
 
-            try:
-                # 尝试迭代结果对象
-                for res in rec_result:
-                    # 检查是否有text和score属性
-                    if hasattr(res, 'text') and hasattr(res, 'score'):
-                        texts.append(str(res.text))
-                        confidences.append(float(res.score))
-                    # 或者是字典格式
-                    elif isinstance(res, dict):
-                        # PaddleOCR 3.3.1 TextRecognition 返回格式
-                        if 'rec_text' in res and 'rec_score' in res:
-                            texts.append(str(res['rec_text']))
-                            confidences.append(float(res['rec_score']))
-                        # 兼容其他可能的格式
-                        elif 'text' in res and 'score' in res:
-                            texts.append(str(res['text']))
-                            confidences.append(float(res['score']))
-                    # 或者是元组/列表格式 (text, score)
-                    elif isinstance(res, (list, tuple)) and len(res) >= 2:
-                        texts.append(str(res[0]))
-                        confidences.append(float(res[1]))
-                    else:
-                        logger.warning("unexpected_rec_result_format", res_type=str(type(res)))
-
-            except Exception as e:
-                logger.error("error_parsing_rec_result", error=str(e))
-
-            raw_text = " ".join(texts)
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-
-            # 如果没有提取到任何文本
-            if not texts:
-                processing_time = int((time.time() - start_time) * 1000)
-                logger.warning(
-                    "no_text_extracted",
-                    filename=filename,
-                    processing_time_ms=processing_time
+            # 1. 图片预处理,一次解码为连续的numpy数组供PaddleOCR使用(像素数组输入无需解码)
+            if isinstance(image, np.ndarray):
+                img_array = prepare_array(image, timings)
+            else:
+                img_array = decode_image(image, timings)
+            deadline.check("preprocess")
+
+            # 2. 近似重复图片(重新拍摄、重新编码)复核金额文本框后复用已有结果
+            image_hash = None
+            evidence = None
+            if self.perceptual_cache is not None:
+                image_hash = difference_hash(img_array, settings.PERCEPTUAL_CACHE_HASH_SIZE)
+                cached = self._perceptual_cache_lookup(
+                    image_hash, img_array, filename, deadline, start_time, timings
                 )
-                return None, 0.0, processing_time, None, ["未检测到任何文本"]
+                if cached is not None:
+                    return cached
+                evidence = {}
 
-            # 5. 提取金额
-            amount = self._extract_amount_from_text(raw_text)
-
-            # 6. 置信度检查
-            if avg_confidence < 0.8:
-                warnings.append("置信度较低,建议人工复核")
-
-            processing_time = int((time.time() - start_time) * 1000)
-
-            logger.info(
-                "ocr_completed",
-                filename=filename,
-                amount=amount,
-                confidence=f"{avg_confidence:.3f}",
-                processing_time_ms=processing_time,
-                raw_text=raw_text
+            result = self._recognize_array(
+                img_array, filename, deadline, start_time, timings, evidence
             )
 
-            return amount, avg_confidence, processing_time, raw_text, warnings
+            # 只缓存能定位金额文本框的结果,命中时才能复核
+            if image_hash is not None and evidence.get("amount_poly") is not None:
+                amount, confidence, processing_time, raw_text, warnings = result
+                height, width = img_array.shape[:2]
+                amount_poly = np.asarray(evidence["amount_poly"], dtype=np.float32)
+                self.perceptual_cache.put(
+                    image_hash,
+                    (
+                        amount, confidence, raw_text, tuple(warnings), processing_time,
+                        amount_poly / np.array([width, height], dtype=np.float32)
+                    )
+                )
+            return result
 
         except TimeoutException as e:
             processing_time = int((time.time() - start_time) * 1000)
@@ -251,15 +246,13 @@ class OCRService:
                 "ocr_timeout",
                 filename=filename,
                 processing_time_ms=processing_time,
-                timeout_sec=settings.OCR_TIMEOUT_SEC
+                timeout_ms=int(deadline.timeout_sec * 1000),
+                cancelled=deadline.cancelled,
+                error=str(e)
             )
-            raise TimeoutException(f"图片处理超时(>{settings.OCR_TIMEOUT_SEC}秒)")
+            raise TimeoutException(f"图片处理超时(>{deadline.timeout_sec:g}秒): {e}")
 
         except Exception as e:
-            # 确保取消超时
-            if timeout_set and hasattr(signal, 'SIGALRM'):
-                signal.alarm(0)
-
             processing_time = int((time.time() - start_time) * 1000)
             logger.error(
                 "ocr_failed",
@@ -269,67 +262,603 @@ class OCRService:
             )
             raise
 
-    def _extract_amount_from_text(self, ocr_text: str) -> Optional[str]:
-        """从OCR文本中提取金额
+    def _perceptual_cache_lookup(
+        self,
+        image_hash: np.ndarray,
+        img_array: np.ndarray,
+        filename: str,
+        deadline: Deadline,
+        start_time: float,
+        timings: Dict[str, float]
+    ) -> Optional[Tuple[Optional[str], float, int, Optional[str], List[str]]]:
+        """查询近似重复图片缓存,复核金额文本框后返回结果并记录指标
+
+        整图感知哈希无法区分同一模板中只有金额不同的单据,命中后重新识别缓存条目
+        记录的金额文本框位置,金额一致才复用结果,否则按未命中处理。
 
         Args:
-            ocr_text: OCR识别的文本
+            image_hash: 图片感知哈希
+            img_array: 图像数组(用于复核金额)
+            filename: 文件名(用于日志)
+            deadline: 请求截止时间
+            start_time: 请求开始时间(用于计算处理耗时)
+            timings: 写入复核的crop/recognition阶段耗时(秒)
 
         Returns:
-            提取的金额字符串(纯数字格式),未找到则返回None
+            命中且复核通过时返回识别结果元组,否则返回None
         """
-        if not ocr_text:
+        cached, distance = self.perceptual_cache.lookup(image_hash)
+        if distance is not None:
+            OCR_PERCEPTUAL_CACHE_DISTANCE.observe(distance)
+        if cached is None:
+            OCR_PERCEPTUAL_CACHE_REQUESTS.labels(result="miss").inc()
+            return None
+
+        amount, confidence, raw_text, warnings, original_time, amount_poly = cached
+        if not self._verify_amount(img_array, amount_poly, amount, deadline, timings):
+            OCR_PERCEPTUAL_CACHE_REQUESTS.labels(result="rejected").inc()
+            logger.info(
+                "ocr_perceptual_cache_rejected",
+                filename=filename,
+                cached_amount=amount,
+                distance=distance
+            )
             return None
 
-        # 清理文本:去除空格、换行
-        text = ocr_text.replace(' ', '').replace('\n', '').replace('\r', '')
+        OCR_PERCEPTUAL_CACHE_REQUESTS.labels(result="hit").inc()
+        processing_time = int((time.time() - start_time) * 1000)
+        OCR_PERCEPTUAL_CACHE_SAVED_SECONDS.inc(max(0, original_time - processing_time) / 1000)
+        logger.info(
+            "ocr_perceptual_cache_hit",
+            filename=filename,
+            amount=amount,
+            distance=distance,
+            processing_time_ms=processing_time
+        )
+        return amount, confidence, processing_time, raw_text, list(warnings)
+
+    def _verify_amount(
+        self,
+        img_array: np.ndarray,
+        amount_poly: np.ndarray,
+        amount: Optional[str],
+        deadline: Deadline,
+        timings: Dict[str, float]
+    ) -> bool:
+        """重新识别金额文本框,检查金额是否与缓存结果一致
+
+        Args:
+            img_array: 图像数组
+            amount_poly: 金额文本框多边形(坐标按图像宽高归一化)
+            amount: 缓存的金额
+            deadline: 请求截止时间
+            timings: 写入crop/recognition阶段耗时(秒)
+
+        Returns:
+            金额一致时返回True
+        """
+        crop_start = time.time()
+        height, width = img_array.shape[:2]
+        poly = amount_poly * np.array([width, height], dtype=np.float32)
+        crops = extract_crops(
+            img_array,
+            [poly],
+            mode=settings.OCR_CROP_MODE,
+            padding=settings.OCR_CROP_PADDING
+        )
+        timings["crop"] = time.time() - crop_start
+        if not crops:
+            return False
+
+        rec_start = time.time()
+        texts, _ = self._parse_rec_result(self._recognize_crops(crops, deadline))
+        timings["recognition"] = time.time() - rec_start
+        candidate = best_amount_candidate(texts)
+        return candidate is not None and candidate.amount == amount
+
+    def _recognize_array(
+        self,
+        img_array: np.ndarray,
+        filename: str,
+        deadline: Deadline,
+        start_time: float,
+        timings: Dict[str, float],
+        evidence: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Optional[str], float, int, Optional[str], List[str]]:
+        """对解码后的图像执行检测+识别+金额提取
 
-        # 模式1: 带货币符号的金额 ¥1,234.56 / $1,234.56
-        pattern1 = r'[¥$￥]\s*([\d,]+\.?\d*)'
+        Args:
+            img_array: 图像数组
+            filename: 文件名(用于日志)
+            deadline: 请求截止时间
+            start_time: 请求开始时间(用于计算处理耗时)
+            timings: 写入各阶段耗时(秒)
+            evidence: 提供时写入金额所在文本框的多边形("amount_poly",
+                未检测到文本框而识别整张图时为None)
 
-        # 模式2: 纯数字金额 1234.56 / 1,234.56 / 1234
-        pattern2 = r'([\d,]+\.?\d+|\d+)'
+        Returns:
+            (金额, 置信度, 处理时间ms, 原始文本, 警告列表)元组
+        """
+        warnings = []
 
-        # 优先匹配带货币符号
-        match = re.search(pattern1, text)
-        if match:
-            amount = match.group(1)
+        # 3. 文本检测(检测框坐标对应img_array的分辨率)
+        det_start = time.time()
+        polys = self._detect_text(img_array, deadline)
+        timings["detection"] = time.time() - det_start
+        deadline.check("detection")
+
+        # 4. 检测框数量统计
+        OCR_CROPS_PER_IMAGE.observe(len(polys))
+
+        if len(polys) > 0 and settings.OCR_ROI_MODE == "early_stop":
+            # 5. 按包含金额的可能性分块裁剪+识别,找到高置信度金额后提前结束
+            texts, confidences, text_polys, num_crops = self._recognize_roi(
+                img_array, polys, deadline, timings
+            )
         else:
-            match = re.search(pattern2, text)
-            if match:
-                amount = match.group(1)
+            # 5. 裁剪图片(所有文本框一次向量化计算外接矩形)
+            crop_start = time.time()
+            cropped_images = []
+            crop_polys = [None]
+            if len(polys) > 0:
+                if settings.OCR_ROI_MODE == "prune":
+                    # 剔除几何特征上不可能包含金额的文本框
+                    height, width = img_array.shape[:2]
+                    polys = [polys[i] for i in select_boxes(polys, width, height)]
+                cropped_images, kept = extract_crops(
+                    img_array,
+                    polys,
+                    mode=settings.OCR_CROP_MODE,
+                    padding=settings.OCR_CROP_PADDING,
+                    return_indices=True
+                )
+                if cropped_images:
+                    crop_polys = [polys[i] for i in kept]
+            timings["crop"] = time.time() - crop_start
+            deadline.check("crop")
+
+            # 6. 文本识别（识别裁剪后的图片）
+            rec_start = time.time()
+
+            if len(cropped_images) > 0:
+                # 批量识别裁剪后的图片
+                rec_result = self._recognize_crops(cropped_images, deadline)
             else:
-                logger.debug("no_amount_pattern_matched", text=text)
-                return None
+                # 如果没有检测到文本框，回退到识别整张图
+                logger.warning("no_text_boxes_detected", filename=filename)
+                rec_result = self._recognize_crops([img_array], deadline)
+
+            timings["recognition"] = time.time() - rec_start
+            texts, confidences, text_polys = self._parse_rec_result_with_polys(
+                rec_result, crop_polys
+            )
+            num_crops = len(cropped_images)
+
+        # 性能日志
+        logger.debug(
+            "ocr_performance",
+            detection_ms=int(timings["detection"] * 1000),
+            crop_ms=int(timings["crop"] * 1000),
+            recognition_ms=int(timings["recognition"] * 1000),
+            num_boxes=len(polys),
+            num_crops=num_crops
+        )
+
+        deadline.check("recognition")
+
+        raw_text = " ".join(texts)
+        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+
+        # 如果没有提取到任何文本
+        if not texts:
+            processing_time = int((time.time() - start_time) * 1000)
+            logger.warning(
+                "no_text_extracted",
+                filename=filename,
+                processing_time_ms=processing_time
+            )
+            return None, 0.0, processing_time, None, ["未检测到任何文本"]
+
+        # 7. 提取金额
+        extract_start = time.time()
+        amount = self._extract_amount_from_text(texts)
+        timings["extract"] = time.time() - extract_start
+
+        if evidence is not None and amount is not None:
+            # 文本列表的行号即文本下标
+            best = best_amount_candidate(texts)
+            evidence["amount_poly"] = text_polys[best.line] if best is not None else None
+
+        # 8. 置信度检查
+        if avg_confidence < 0.8:
+            warnings.append("置信度较低,建议人工复核")
+
+        processing_time = int((time.time() - start_time) * 1000)
 
-        # 标准化:移除千分位逗号
-        amount = amount.replace(',', '')
+        logger.info(
+            "ocr_completed",
+            filename=filename,
+            amount=amount,
+            confidence=f"{avg_confidence:.3f}",
+            processing_time_ms=processing_time,
+            raw_text=raw_text
+        )
 
-        # 验证:检查是否为合法金额格式（标准金额最多2位小数）
-        if re.match(r'^\d+(\.\d{1,2})?$', amount):
-            return amount
+        return amount, avg_confidence, processing_time, raw_text, warnings
 
-        logger.debug("invalid_amount_format", extracted=amount)
+    def _run_detection(self, det_input: np.ndarray, deadline: Deadline) -> Sequence:
+        """借出引擎执行一次文本检测
+
+        Args:
+            det_input: 检测输入图像数组
+            deadline: 请求截止时间
+
+        Returns:
+            检测多边形(坐标对应det_input的分辨率)
+        """
+        with self.engine_pool.checkout() as engine:
+            deadline.check("detection")
+            det_result = engine.text_detector.predict(input=det_input)
+
+        if isinstance(det_result, list) and len(det_result) > 0:
+            first_det = det_result[0]
+
+            # 从字典中获取dt_polys（检测到的多边形坐标）
+            if isinstance(first_det, dict) and 'dt_polys' in first_det:
+                return first_det['dt_polys']
+        return []
+
+    def _detect_text(self, img_array: np.ndarray, deadline: Deadline) -> Sequence:
+        """按配置的检测分辨率执行文本检测
+
+        fixed/adaptive模式在缩小后的图像上检测,再把检测框映射回img_array坐标,
+        裁剪和识别仍使用全分辨率图像。adaptive模式下若低分辨率检测不到文本或
+        文本高度过小,则回到全分辨率重新检测。
+
+        Args:
+            img_array: 预处理后的图像数组
+            deadline: 请求截止时间
+
+        Returns:
+            检测多边形(坐标对应img_array的分辨率)
+        """
+        mode = settings.OCR_DET_MODE
+        if mode not in ("fixed", "adaptive") or settings.OCR_DET_LIMIT_SIDE_LEN <= 0:
+            return self._run_detection(img_array, deadline)
+
+        det_input, scale = resize_for_detection(img_array, settings.OCR_DET_LIMIT_SIDE_LEN)
+        polys = self._run_detection(det_input, deadline)
+
+        if mode == "adaptive" and scale < 1.0:
+            text_height = median_text_height(polys)
+            if text_height < settings.OCR_DET_MIN_TEXT_HEIGHT:
+                # 低分辨率下文本过小(或未检出),回到全分辨率检测
+                logger.debug(
+                    "ocr_detection_upscaled",
+                    det_size=det_input.shape[:2],
+                    full_size=img_array.shape[:2],
+                    median_text_height=text_height
+                )
+                deadline.check("detection")
+                return self._run_detection(img_array, deadline)
+
+        return scale_polys(polys, 1.0 / scale) if scale != 1.0 else polys
+
+    @staticmethod
+    def _parse_rec_item(res: Any) -> Optional[Tuple[str, float]]:
+        """解析单条识别结果
+
+        Args:
+            res: 识别结果对象
+
+        Returns:
+            (文本, 置信度)元组,格式无法识别时返回None
+        """
+        # 检查是否有text和score属性
+        if hasattr(res, 'text') and hasattr(res, 'score'):
+            return str(res.text), float(res.score)
+        # 或者是字典格式
+        if isinstance(res, dict):
+            # PaddleOCR 3.3.1 TextRecognition 返回格式
+            if 'rec_text' in res and 'rec_score' in res:
+                return str(res['rec_text']), float(res['rec_score'])
+            # 兼容其他可能的格式
+            if 'text' in res and 'score' in res:
+                return str(res['text']), float(res['score'])
+            return None
+        # 或者是元组/列表格式 (text, score)
+        if isinstance(res, (list, tuple)) and len(res) >= 2:
+            return str(res[0]), float(res[1])
+
+        logger.warning("unexpected_rec_result_format", res_type=str(type(res)))
         return None
 
-    def health_check(self) -> bool:
+    def _parse_rec_result(self, rec_result: Optional[List[Any]]) -> Tuple[List[str], List[float]]:
+        """解析批量识别结果
+
+        Args:
+            rec_result: 识别结果列表
+
+        Returns:
+            (文本列表, 置信度列表)元组
+        """
+        texts, confidences, _ = self._parse_rec_result_with_polys(
+            rec_result, [None] * len(rec_result or [])
+        )
+        return texts, confidences
+
+    def _parse_rec_result_with_polys(
+        self,
+        rec_result: Optional[List[Any]],
+        polys: Sequence
+    ) -> Tuple[List[str], List[float], List[Any]]:
+        """解析批量识别结果,保留每条文本对应的文本框
+
+        Args:
+            rec_result: 识别结果列表
+            polys: 与识别结果一一对应的文本框多边形
+
+        Returns:
+            (文本列表, 置信度列表, 多边形列表)元组
+        """
+        texts = []
+        confidences = []
+        text_polys = []
+        if not rec_result:
+            return texts, confidences, text_polys
+
+        try:
+            for poly, res in zip(polys, rec_result):
+                parsed = self._parse_rec_item(res)
+                if parsed is not None:
+                    texts.append(parsed[0])
+                    confidences.append(parsed[1])
+                    text_polys.append(poly)
+        except Exception as e:
+            logger.error("error_parsing_rec_result", error=str(e))
+
+        return texts, confidences, text_polys
+
+    def _recognize_roi(
+        self,
+        img_array: np.ndarray,
+        polys: Sequence,
+        deadline: Deadline,
+        timings: Dict[str, float]
+    ) -> Tuple[List[str], List[float], List[Any], int]:
+        """按包含金额的可能性分块识别文本框,找到高置信度金额后提前结束
+
+        文本框先按几何特征剔除和排序,每识别一块(OCR_ROI_CHUNK_SIZE个)就尝试提取金额;
+        金额紧跟强关键词或带货币符号、且所在文本框置信度不低于OCR_ROI_STOP_CONFIDENCE时
+        不再识别剩余文本框。
+
+        Args:
+            img_array: 图像数组
+            polys: 检测多边形
+            deadline: 请求截止时间
+            timings: 写入crop/recognition阶段耗时(秒)
+
+        Returns:
+            (按阅读顺序排列的文本列表, 置信度列表, 对应的多边形列表, 实际识别的文本框数)元组
+        """
+        height, width = img_array.shape[:2]
+        ranked = select_boxes(polys, width, height, rank=True)
+        chunk_size = max(1, settings.OCR_ROI_CHUNK_SIZE)
+        recognized: Dict[int, Tuple[str, float]] = {}   # 多边形下标 -> (文本, 置信度)
+        timings["crop"] = 0.0
+        timings["recognition"] = 0.0
+
+        for chunk_start in range(0, len(ranked), chunk_size):
+            chunk = ranked[chunk_start:chunk_start + chunk_size]
+
+            crop_start = time.time()
+            crops, kept = extract_crops(
+                img_array,
+                [polys[i] for i in chunk],
+                mode=settings.OCR_CROP_MODE,
+                padding=settings.OCR_CROP_PADDING,
+                return_indices=True
+            )
+            timings["crop"] += time.time() - crop_start
+            deadline.check("crop")
+            if not crops:
+                continue
+
+            rec_start = time.time()
+            rec_result = self._recognize_crops(crops, deadline)
+            timings["recognition"] += time.time() - rec_start
+            deadline.check("recognition")
+
+            for local_index, res in zip(kept, rec_result or []):
+                parsed = self._parse_rec_item(res)
+                if parsed is not None:
+                    recognized[int(chunk[local_index])] = parsed
+
+            order = reading_order(polys, list(recognized))
+            best = best_amount_candidate([recognized[i][0] for i in order])
+            if (
+                best is not None
+                and (best.has_strong_keyword or best.has_currency)
+                and recognized[order[best.line]][1] >= settings.OCR_ROI_STOP_CONFIDENCE
+            ):
+                logger.debug(
+                    "ocr_roi_early_stop",
+                    recognized_boxes=len(recognized),
+                    total_boxes=len(ranked)
+                )
+                break
+
+        order = reading_order(polys, list(recognized))
+        texts = [recognized[i][0] for i in order]
+        confidences = [recognized[i][1] for i in order]
+        return texts, confidences, [polys[i] for i in order], len(recognized)
+
+    def _predict_recognition(
+        self,
+        crops: List[np.ndarray],
+        deadline: Optional[Deadline] = None
+    ) -> List[Any]:
+        """借出一组引擎批量识别裁剪图
+
+        检测与识别分别借出引擎,使不同请求的检测和识别阶段可以交错执行
+
+        Args:
+            crops: 裁剪图列表
+            deadline: 请求截止时间(借出引擎后检查)
+
+        Returns:
+            与输入一一对应的识别结果列表
+        """
+        with self.engine_pool.checkout() as engine:
+            if deadline is not None:
+                deadline.check("recognition")
+            return list(engine.text_recognizer.predict(input=crops, batch_size=len(crops)))
+
+    @staticmethod
+    def _crop_cache_key(crop: np.ndarray) -> Tuple[Tuple[int, ...], bytes]:
+        """计算裁剪图缓存键(尺寸+像素内容哈希)"""
+        digest = hashlib.blake2b(np.ascontiguousarray(crop), digest_size=16).digest()
+        return crop.shape, digest
+
+    def _recognize_crops(self, crops: List[np.ndarray], deadline: Deadline) -> List[Any]:
+        """识别裁剪图,像素完全相同的裁剪图(模板中的固定文字)直接使用缓存结果
+
+        Args:
+            crops: 裁剪图列表
+            deadline: 请求截止时间
+
+        Returns:
+            与输入一一对应的识别结果列表
+
+        Raises:
+            TimeoutException: 等待识别结果超过截止时间
+        """
+        if self.crop_cache is None:
+            return self._dispatch_recognition(crops, deadline)
+
+        keys = [self._crop_cache_key(crop) for crop in crops]
+        results = [self.crop_cache.get(key) for key in keys]
+
+        # 未命中的裁剪图按缓存键去重,同一请求中重复的裁剪图只识别一次
+        pending: Dict[Tuple[Tuple[int, ...], bytes], List[int]] = {}
+        for i, (key, result) in enumerate(zip(keys, results)):
+            if result is None:
+                pending.setdefault(key, []).append(i)
+
+        misses = sum(len(indices) for indices in pending.values())
+        OCR_CROP_CACHE_REQUESTS.labels(result="hit").inc(len(crops) - misses)
+        OCR_CROP_CACHE_REQUESTS.labels(result="miss").inc(misses)
+        if not pending:
+            return results
+
+        miss_keys = list(pending)
+        miss_crops = [crops[pending[key][0]] for key in miss_keys]
+        rec_result = self._dispatch_recognition(miss_crops, deadline)
+        for key, res in zip(miss_keys, rec_result):
+            # 只缓存解析后的(文本, 置信度),不保留识别结果中的图像数据
+            parsed = self._parse_rec_item(res)
+            if parsed is not None:
+                self.crop_cache.put(key, parsed)
+            for i in pending[key]:
+                results[i] = parsed if parsed is not None else res
+        return results
+
+    def _dispatch_recognition(self, crops: List[np.ndarray], deadline: Deadline) -> List[Any]:
+        """识别裁剪图,启用微批处理时与其他请求的裁剪图合并识别
+
+        Args:
+            crops: 裁剪图列表
+            deadline: 请求截止时间
+
+        Returns:
+            与输入一一对应的识别结果列表
+
+        Raises:
+            TimeoutException: 等待识别结果超过截止时间
+        """
+        if self.rec_batcher is not None:
+            future = self.rec_batcher.submit(crops)
+            try:
+                return future.result(timeout=deadline.remaining())
+            except FutureTimeoutError:
+                # 尚未执行的请求不再占用批次
+                future.cancel()
+                deadline.check("recognition")
+                raise TimeoutException("等待识别批次超时")
+        return self._predict_recognition(crops, deadline)
+
+    def _extract_amount_from_text(self, ocr_text: Union[str, Sequence[str]]) -> Optional[str]:
+        """从OCR文本中提取金额
+
+        Args:
+            ocr_text: OCR识别的文本,或按文本框组织的文本列表(保留行位置信息)
+
+        Returns:
+            提取的金额字符串(纯数字格式),未找到则返回None
+        """
+        amount = extract_amount(ocr_text)
+        if amount is None:
+            logger.debug("no_amount_pattern_matched", text=ocr_text)
+        return amount
+
+    def warmup(self, image_sizes: List[int], batch_sizes: List[int]) -> None:
+        """预热所有引擎
+
+        对每组引擎按代表性尺寸执行检测、按不同批大小执行识别,
+        提前完成推理图初始化和MKLDNN算子创建,避免首个请求承担这部分耗时。
+
+        Args:
+            image_sizes: 检测预热图片的最长边列表(按4:3生成)
+            batch_sizes: 识别预热的批大小列表
+        """
+        start_time = time.time()
+        rec_crop = np.full((48, 320, 3), 255, dtype=np.uint8)
+
+        with self.engine_pool.checkout_all() as engines:
+            for engine in engines:
+                for size in image_sizes:
+                    det_img = np.full((size * 3 // 4, size, 3), 255, dtype=np.uint8)
+                    engine.text_detector.predict(input=det_img)
+                for batch_size in batch_sizes:
+                    crops = [rec_crop] * batch_size
+                    list(engine.text_recognizer.predict(input=crops, batch_size=batch_size))
+
+        logger.info(
+            "ocr_warmup_completed",
+            engines=self.engine_pool.size,
+            image_sizes=image_sizes,
+            batch_sizes=batch_sizes,
+            duration_ms=int((time.time() - start_time) * 1000)
+        )
+
+    def health_check(self, engine_timeout: Optional[float] = None) -> bool:
         """健康检查OCR引擎是否可用
 
+        Args:
+            engine_timeout: 等待空闲引擎的超时时间(秒),None表示一直等待
+
         Returns:
             True表示健康,False表示异常
+
+        Raises:
+            queue.Empty: 超时仍无空闲引擎(引擎均在处理请求)
         """
         try:
             # 尝试检测和识别一个小的测试图片
             test_img = Image.new('RGB', (100, 100), color='white')
             img_array = np.array(test_img)
 
-            # 测试检测引擎
-            self.text_detector.predict(input=img_array)
+            with self.engine_pool.checkout(timeout=engine_timeout) as engine:
+                # 测试检测引擎
+                engine.text_detector.predict(input=img_array)
 
-            # 测试识别引擎
-            self.text_recognizer.predict(input=img_array, batch_size=1)
+                # 测试识别引擎
+                engine.text_recognizer.predict(input=img_array, batch_size=1)
 
             return True
+        except queue.Empty:
+            # 借出引擎超时不代表引擎异常,由调用方决定如何处理
+            raise
         except Exception as e:
             logger.error("ocr_health_check_failed", error=str(e))
             return False
@@ -337,6 +866,16 @@ class OCRService:
 
 # 全局OCR服务实例(单例模式,避免重复加载模型)
 _ocr_service = None
+_ocr_service_lock = threading.Lock()
+
+
+def is_ocr_service_loaded() -> bool:
+    """OCR服务(模型)是否已加载
+
+    Returns:
+        已加载返回True
+    """
+    return _ocr_service is not None
 
 
 def get_ocr_service() -> OCRService:
@@ -347,5 +886,29 @@ def get_ocr_service() -> OCRService:
     """
     global _ocr_service
     if _ocr_service is None:
-        _ocr_service = OCRService()
+        # 多个推理线程可能同时触发初始化,加锁保证只加载一次模型
+        with _ocr_service_lock:
+            if _ocr_service is None:
+                _ocr_service = OCRService()
     return _ocr_service
+
+
+def load_and_warm_up() -> None:
+    """加载OCR引擎并按配置预热(应用启动时调用)"""
+    ocr_service = get_ocr_service()
+    if settings.OCR_WARMUP_ENABLED:
+        ocr_service.warmup(
+            image_sizes=settings.OCR_WARMUP_IMAGE_SIZES,
+            batch_sizes=settings.OCR_WARMUP_BATCH_SIZES
+        )
+
+
+def preload_engines() -> None:
+    """在多进程部署的master进程中预加载模型(fork前调用)
+
+    只加载模型权重,不执行推理:推理会初始化OpenMP/MKLDNN线程池,
+    线程在fork后不会被子进程继承,因此预热留给各worker进程在启动时执行。
+    worker通过写时复制共享已加载的权重,常驻内存不随进程数成倍增长。
+    """
+    get_ocr_service()
+    logger.info("ocr_engines_preloaded", pool_size=settings.OCR_ENGINE_POOL_SIZE)
@@ -0,0 +1,122 @@
+"""文本框感兴趣区域(ROI)筛选
+
+在识别前根据检测框几何特征(高度、长宽比、位置)剔除不可能包含金额的
+文本框,并按包含金额的可能性排序,供提前结束识别使用。
+"""
+from typing import Sequence, Union
+
+import numpy as np
+
+from src.services.image_processor import polys_to_boxes
+
+# 剔除规则
+MIN_BOX_HEIGHT_PX = 6           # 低于该高度的文本无法可靠识别
+MIN_RELATIVE_HEIGHT = 0.35      # 相对中位高度过小(小字注释、水印)
+MIN_ASPECT_RATIO = 0.5          # 宽/高过小(竖排文字、噪点)
+
+# 排序权重
+WEIGHT_HEIGHT = 1.0             # 字号越大越可能是合计金额
+WEIGHT_VERTICAL = 1.0           # 越靠下越可能是合计金额
+WEIGHT_HORIZONTAL = 0.5         # 金额通常右对齐
+LONG_LINE_ASPECT = 25           # 超长文本行(段落说明)
+PENALTY_LONG_LINE = 0.5
+MAX_RELATIVE_HEIGHT = 3.0
+
+
+def _box_features(boxes: np.ndarray):
+    """计算文本框宽、高、长宽比和相对中位高度"""
+    widths = (boxes[:, 2] - boxes[:, 0]).astype(np.float32)
+    heights = (boxes[:, 3] - boxes[:, 1]).astype(np.float32)
+    aspect = widths / np.maximum(heights, 1)
+    median_height = float(np.median(heights)) if len(heights) else 1.0
+    relative_height = heights / max(median_height, 1.0)
+    return widths, heights, aspect, relative_height
+
+
+def prune_mask(boxes: np.ndarray) -> np.ndarray:
+    """计算保留的文本框
+
+    Args:
+        boxes: 形如(N, 4)的外接矩形(x_min, y_min, x_max, y_max)
+
+    Returns:
+        形如(N,)的bool数组,True表示保留
+    """
+    widths, heights, aspect, relative_height = _box_features(boxes)
+    return (
+        (widths > 0)
+        & (heights >= MIN_BOX_HEIGHT_PX)
+        & (relative_height >= MIN_RELATIVE_HEIGHT)
+        & (aspect >= MIN_ASPECT_RATIO)
+    )
+
+
+def score_boxes(boxes: np.ndarray, width: int, height: int) -> np.ndarray:
+    """按几何特征估计文本框包含金额的可能性
+
+    Args:
+        boxes: 形如(N, 4)的外接矩形
+        width: 图片宽度
+        height: 图片高度
+
+    Returns:
+        形如(N,)的得分数组,越高越可能包含金额
+    """
+    _, _, aspect, relative_height = _box_features(boxes)
+    center_x = (boxes[:, 0] + boxes[:, 2]) / 2 / max(width, 1)
+    center_y = (boxes[:, 1] + boxes[:, 3]) / 2 / max(height, 1)
+    return (
+        WEIGHT_HEIGHT * np.minimum(relative_height, MAX_RELATIVE_HEIGHT)
+        + WEIGHT_VERTICAL * center_y
+        + WEIGHT_HORIZONTAL * center_x
+        - PENALTY_LONG_LINE * (aspect > LONG_LINE_ASPECT)
+    )
+
+
+def select_boxes(
+    polys: Union[np.ndarray, Sequence],
+    width: int,
+    height: int,
+    rank: bool = False
+) -> np.ndarray:
+    """剔除不可能包含金额的文本框,并可按可能性排序
+
+    Args:
+        polys: 检测多边形
+        width: 图片宽度
+        height: 图片高度
+        rank: 是否按包含金额的可能性从高到低排序(否则保持检测顺序)
+
+    Returns:
+        保留的多边形下标数组;全部被剔除时返回全部下标(避免漏识别)
+    """
+    boxes = polys_to_boxes(polys, width, height, padding=0)
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    keep = np.flatnonzero(prune_mask(boxes))
+    if len(keep) == 0:
+        keep = np.arange(len(boxes))
+
+    if rank:
+        scores = score_boxes(boxes[keep], width, height)
+        # 稳定排序:同分时保持检测顺序
+        keep = keep[np.argsort(-scores, kind="stable")]
+    return keep
+
+
+def reading_order(polys: Union[np.ndarray, Sequence], indices: Sequence[int]) -> list:
+    """将文本框下标按阅读顺序(从上到下、从左到右)排列
+
+    Args:
+        polys: 检测多边形
+        indices: 文本框下标
+
+    Returns:
+        排序后的下标列表
+    """
+    if len(indices) == 0:
+        return []
+    mins = np.array([np.asarray(polys[i]).min(axis=0) for i in indices])
+    order = np.lexsort((mins[:, 0], mins[:, 1]))
+    return [int(indices[i]) for i in order]
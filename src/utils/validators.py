@@ -1,12 +1,52 @@
 """输入验证工具"""
-from typing import Tuple
-from fastapi import UploadFile, HTTPException, status
+import base64
+import binascii
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+from fastapi import Request, UploadFile, HTTPException, status
 
 from src.core.config import settings
 
+# 分块读取上传文件的块大小
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# 格式嗅探需要读取的文件头长度
+MAGIC_HEADER_SIZE = 16
+
+# 未声明具体类型的Content-Type,由文件头嗅探决定是否接受
+_GENERIC_CONTENT_TYPES = (None, "", "application/octet-stream")
+
+# 图片格式魔数(文件头特征字节)
+_MAGIC_NUMBERS = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"BM", "image/bmp"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+)
+
+
+def sniff_image_format(header: bytes) -> Optional[str]:
+    """根据文件头魔数识别图片格式
+
+    Args:
+        header: 文件开头的字节(至少MAGIC_HEADER_SIZE字节时识别最可靠)
+
+    Returns:
+        图片MIME类型,无法识别时返回None
+    """
+    for magic, mime_type in _MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return mime_type
+    return None
+
 
 def validate_image_format(file: UploadFile) -> None:
-    """验证图片格式
+    """验证图片格式(声明的Content-Type)
+
+    未声明具体类型(application/octet-stream)的文件不在此拒绝,以文件头嗅探结果为准。
 
     Args:
         file: 上传的文件
@@ -14,6 +54,8 @@ def validate_image_format(file: UploadFile) -> None:
     Raises:
         HTTPException: 格式不支持时抛出400错误
     """
+    if file.content_type in _GENERIC_CONTENT_TYPES:
+        return
     if file.content_type not in settings.SUPPORTED_FORMATS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -25,9 +67,56 @@ def validate_image_format(file: UploadFile) -> None:
         )
 
 
+def validate_image_content(header: bytes) -> str:
+    """根据文件头魔数验证图片实际格式(不信任客户端声明的Content-Type)
+
+    Args:
+        header: 文件开头的字节
+
+    Returns:
+        嗅探出的图片MIME类型
+
+    Raises:
+        HTTPException: 文件内容不是支持的图片格式时抛出400错误
+    """
+    sniffed_type = sniff_image_format(header)
+    if sniffed_type not in settings.SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code": "UNSUPPORTED_FORMAT",
+                "message": "文件内容不是支持的图片格式",
+                "details": f"支持的格式: {', '.join(settings.SUPPORTED_FORMATS)}"
+            }
+        )
+    return sniffed_type
+
+
+def _file_too_large(
+    size_bytes: int,
+    at_least: bool = False,
+    limit_bytes: Optional[int] = None
+) -> HTTPException:
+    """构造文件过大错误"""
+    file_size_mb = size_bytes / (1024 * 1024)
+    size_desc = f"超过{file_size_mb:.2f}MB" if at_least else f"{file_size_mb:.2f}MB"
+    limit_mb = settings.MAX_FILE_SIZE_MB if limit_bytes is None else limit_bytes / (1024 * 1024)
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail={
+            "code": "FILE_TOO_LARGE",
+            "message": f"文件大小超过{limit_mb:g}MB限制",
+            "details": f"当前大小: {size_desc}"
+        }
+    )
+
+
 async def validate_file_size(file: UploadFile) -> bytes:
     """验证文件大小并读取内容
 
+    已知文件大小时先行检查;否则分块读取,超过限制立即中止,
+    不会把超大文件完整读入内存。
+
     Args:
         file: 上传的文件
 
@@ -37,20 +126,23 @@ async def validate_file_size(file: UploadFile) -> bytes:
     Raises:
         HTTPException: 文件过大时抛出413错误
     """
-    content = await file.read()
-    file_size_mb = len(content) / (1024 * 1024)
+    max_bytes = settings.MAX_FILE_SIZE_BYTES
 
-    if len(content) > settings.MAX_FILE_SIZE_BYTES:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail={
-                "code": "FILE_TOO_LARGE",
-                "message": f"文件大小超过{settings.MAX_FILE_SIZE_MB}MB限制",
-                "details": f"当前大小: {file_size_mb:.2f}MB"
-            }
-        )
+    if file.size is not None and file.size > max_bytes:
+        raise _file_too_large(file.size)
 
-    return content
+    chunks = []
+    total = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise _file_too_large(total, at_least=True)
+        chunks.append(chunk)
+
+    return b"".join(chunks)
 
 
 async def validate_upload_file(file: UploadFile) -> Tuple[bytes, str]:
@@ -75,6 +167,150 @@ async def validate_upload_file(file: UploadFile) -> Tuple[bytes, str]:
         )
 
     validate_image_format(file)
+
+    # 先读取文件头嗅探实际格式,非图片内容无需读取全文即可拒绝
+    header = await file.read(MAGIC_HEADER_SIZE)
+    validate_image_content(header)
+    await file.seek(0)
+
     content = await validate_file_size(file)
 
     return content, file.filename
+
+
+def _invalid_request(message: str, details: Optional[str] = None) -> HTTPException:
+    """构造请求格式错误"""
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={
+            "code": "INVALID_REQUEST",
+            "message": message,
+            "details": details
+        }
+    )
+
+
+async def read_request_body(request: Request, max_bytes: int) -> bytes:
+    """分块读取请求体,超过限制立即中止
+
+    Args:
+        request: 请求
+        max_bytes: 请求体上限(字节)
+
+    Returns:
+        请求体内容
+
+    Raises:
+        HTTPException: 请求体过大时抛出413错误
+    """
+    chunks = []
+    total = 0
+    async for chunk in request.stream():
+        total += len(chunk)
+        if total > max_bytes:
+            raise _file_too_large(total, at_least=True, limit_bytes=max_bytes)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def validate_image_bytes(content: bytes) -> bytes:
+    """验证已读取的图片数据(大小+实际格式)
+
+    Args:
+        content: 图片字节数据
+
+    Returns:
+        原图片字节数据
+
+    Raises:
+        HTTPException: 为空、过大或不是支持的图片格式时抛出相应错误
+    """
+    if not content:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code": "NO_FILE_PROVIDED",
+                "message": "未提供文件"
+            }
+        )
+    if len(content) > settings.MAX_FILE_SIZE_BYTES:
+        raise _file_too_large(len(content))
+    validate_image_content(content[:MAGIC_HEADER_SIZE])
+    return content
+
+
+def decode_base64_image(data: str) -> bytes:
+    """解码base64编码的图片并验证
+
+    支持带data URI前缀(如"data:image/png;base64,")的字符串,以及按MIME格式
+    换行(每76个字符一行)的base64。
+
+    Args:
+        data: base64字符串
+
+    Returns:
+        图片字节数据
+
+    Raises:
+        HTTPException: base64无效或图片验证失败时抛出相应错误
+    """
+    if data.startswith("data:"):
+        data = data.partition(",")[2]
+    # 去除换行等空白字符,其余非base64字符仍按无效编码拒绝
+    data = "".join(data.split())
+    # base64比原始数据大约4/3,解码前先按长度拒绝超大输入
+    if len(data) * 3 // 4 > settings.MAX_FILE_SIZE_BYTES:
+        raise _file_too_large(len(data) * 3 // 4, at_least=True)
+    try:
+        content = base64.b64decode(data, validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise _invalid_request("图片base64编码无效", str(e))
+    return validate_image_bytes(content)
+
+
+def parse_raw_pixels(body: bytes, shape_header: str, pixel_format: str = "rgb") -> np.ndarray:
+    """将原始像素数据解析为图像数组
+
+    Args:
+        body: 按行优先排列的uint8像素数据
+        shape_header: 图像尺寸,格式为"高,宽"(灰度)或"高,宽,通道数"(通道数1/3/4)
+        pixel_format: 彩色图像的通道顺序(rgb/bgr)
+
+    Returns:
+        HxW或HxWxC的uint8数组(与body共享内存,只读)
+
+    Raises:
+        HTTPException: 尺寸声明无效、与数据长度不符或超过大小限制时抛出相应错误
+    """
+    try:
+        shape = tuple(int(part) for part in shape_header.replace("x", ",").split(","))
+    except ValueError:
+        raise _invalid_request(
+            "X-Image-Shape格式无效",
+            f"应为'高,宽'或'高,宽,通道数',实际为'{shape_header}'"
+        )
+    # 先检查维数,再读取通道数
+    if (
+        len(shape) not in (2, 3)
+        or min(shape) <= 0
+        or (len(shape) == 3 and shape[2] not in (1, 3, 4))
+    ):
+        raise _invalid_request("X-Image-Shape格式无效", f"不支持的图像尺寸: {shape_header}")
+    if pixel_format not in ("rgb", "bgr"):
+        raise _invalid_request("X-Pixel-Format无效", f"应为rgb或bgr,实际为'{pixel_format}'")
+
+    # 按Python整数计算,超大尺寸声明不会溢出
+    expected = math.prod(shape)
+    if expected > settings.MAX_RAW_IMAGE_SIZE_BYTES:
+        raise _file_too_large(expected, limit_bytes=settings.MAX_RAW_IMAGE_SIZE_BYTES)
+    if len(body) != expected:
+        raise _invalid_request(
+            "像素数据长度与X-Image-Shape不符",
+            f"应为{expected}字节,实际为{len(body)}字节"
+        )
+
+    pixels = np.frombuffer(body, dtype=np.uint8).reshape(shape)
+    if pixel_format == "bgr" and pixels.ndim == 3 and pixels.shape[2] >= 3:
+        # 只交换前三个通道,Alpha通道保持在末尾
+        pixels = pixels[:, :, [2, 1, 0, 3][:pixels.shape[2]]]
+    return pixels
@@ -2,6 +2,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from pathlib import Path
+import json
 import os
 import sys
 
@@ -9,6 +10,8 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
 
 from main import app
+from src.api import routes
+from src.api.middleware import RequestSizeLimitMiddleware
 
 
 @pytest.fixture
@@ -23,6 +26,24 @@ def fixtures_dir():
     return Path(__file__).parent.parent / "fixtures" / "images"
 
 
+class FakeOCRService:
+    """OCR service stand-in that does not load models"""
+
+    def recognize_amount(self, image_bytes, filename="unknown", **kwargs):
+        import time
+        # Earlier files finish later so completion order differs from upload order
+        time.sleep(0.05 if filename.startswith("0") else 0.0)
+        return filename.split("_")[0], 0.99, 1, filename, []
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    """Replace the OCR service with a fake one"""
+    service = FakeOCRService()
+    monkeypatch.setattr(routes, "get_ocr_service", lambda: service)
+    return service
+
+
 def test_health_endpoint(client):
     """Test health check endpoint"""
     response = client.get("/api/v1/health")
@@ -36,6 +57,28 @@ def test_health_endpoint(client):
     assert data["status"] == "healthy"
 
 
+def test_ready_endpoint(client):
+    """Test readiness endpoint reports state separately from liveness"""
+    response = client.get("/api/v1/ready")
+
+    assert response.status_code in [200, 503]
+    data = response.json()
+    assert "ready" in data
+    assert "status" in data
+    assert (response.status_code == 200) == data["ready"]
+
+
+def test_metrics_endpoint(client):
+    """Test Prometheus metrics endpoint exposes stage latency and queue gauges"""
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE ocr_stage_duration_seconds histogram" in response.text
+    assert "# TYPE ocr_queue_depth gauge" in response.text
+    assert "ocr_busy_engines" in response.text
+
+
 def test_recognize_endpoint_success(client, fixtures_dir):
     """Test successful image recognition"""
     image_path = fixtures_dir / "amount_100.jpg"
@@ -301,3 +344,541 @@ def test_recognize_endpoint_confidence_range(client, fixtures_dir):
 
     confidence = data["data"]["confidence"]
     assert 0 <= confidence <= 1, f"Confidence {confidence} is out of range [0,1]"
+
+
+def test_batch_recognize_preserves_order(client, fixtures_dir, fake_ocr):
+    """Test batch results keep upload order and report per-item errors"""
+    image_bytes = (fixtures_dir / "amount_100.jpg").read_bytes()
+    files = [
+        ("files", ("0_first.jpg", image_bytes, "image/jpeg")),
+        ("files", ("1_bad.txt", b"not an image", "text/plain")),
+        ("files", ("2_third.jpg", image_bytes, "image/jpeg")),
+    ]
+
+    response = client.post("/api/v1/recognize/batch", files=files)
+
+    assert response.status_code == 200
+    batch_data = response.json()["data"]
+    assert batch_data["total"] == 3
+    assert batch_data["succeeded"] == 2
+    assert batch_data["failed"] == 1
+
+    results = batch_data["results"]
+    assert [item["index"] for item in results] == [0, 1, 2]
+    assert results[0]["data"]["amount"] == "0"
+    assert results[1]["success"] is False
+    assert results[1]["error"]["code"] == "UNSUPPORTED_FORMAT"
+    assert results[2]["data"]["amount"] == "2"
+
+
+def test_loaded_service_not_fetched_through_executor(client, fixtures_dir, fake_ocr, monkeypatch):
+    """Test a loaded OCR service only takes one executor slot per request"""
+    from src.services.executor import InferenceExecutor
+
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0)
+    submitted = []
+    run = executor.run
+
+    async def recording_run(func, *args, **kwargs):
+        submitted.append(func)
+        return await run(func, *args, **kwargs)
+
+    monkeypatch.setattr(executor, "run", recording_run)
+    monkeypatch.setattr(routes, "get_inference_executor", lambda: executor)
+    monkeypatch.setattr(routes, "is_ocr_service_loaded", lambda: True)
+
+    try:
+        image_bytes = (fixtures_dir / "amount_100.jpg").read_bytes()
+        response = client.post(
+            "/api/v1/recognize",
+            files={"file": ("5_loaded.jpg", image_bytes, "image/jpeg")}
+        )
+    finally:
+        executor.shutdown()
+
+    assert response.status_code == 200
+    assert len(submitted) == 1
+
+
+def test_recognize_endpoint_bogus_image_content(client):
+    """Test that content is sniffed instead of trusting content_type"""
+    response = client.post(
+        "/api/v1/recognize",
+        files={"file": ("fake.jpg", b"definitely not a jpeg", "image/jpeg")}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "UNSUPPORTED_FORMAT"
+
+
+def test_request_too_large_rejected_before_parsing():
+    """Test that oversized requests are rejected by Content-Length"""
+    limited_client = TestClient(RequestSizeLimitMiddleware(app, max_body_bytes=1024))
+
+    response = limited_client.post(
+        "/api/v1/recognize",
+        files={"file": ("big.jpg", b"x" * 4096, "image/jpeg")}
+    )
+
+    assert response.status_code == 413
+    assert response.json()["detail"]["code"] == "REQUEST_TOO_LARGE"
+
+
+def test_chunked_request_too_large_rejected_while_reading():
+    """Test that requests without Content-Length are limited by bytes received"""
+    limited_client = TestClient(RequestSizeLimitMiddleware(app, max_body_bytes=1024))
+
+    def chunks(body):
+        for start in range(0, len(body), 256):
+            yield body[start:start + 256]
+
+    response = limited_client.post(
+        "/api/v1/recognize",
+        content=chunks(b"x" * 4096),
+        headers={"Content-Type": "application/octet-stream"}
+    )
+    assert response.status_code == 413
+    assert response.json()["detail"]["code"] == "REQUEST_TOO_LARGE"
+
+    boundary = "limit-test"
+    multipart = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="big.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + b"x" * 4096 + f"\r\n--{boundary}--\r\n".encode()
+    response = limited_client.post(
+        "/api/v1/recognize",
+        content=chunks(multipart),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    assert response.status_code == 413
+    assert response.json()["detail"]["code"] == "REQUEST_TOO_LARGE"
+
+
+def test_single_upload_limited_separately_from_batch():
+    """Test the single-image multipart limit does not apply to batch routes"""
+    limited_client = TestClient(RequestSizeLimitMiddleware(
+        app,
+        max_body_bytes=64 * 1024,
+        multipart_limits={"/api/v1/recognize": 1024}
+    ))
+    files = [("files", ("1_bad.txt", b"x" * 4096, "text/plain"))]
+
+    response = limited_client.post(
+        "/api/v1/recognize",
+        files={"file": ("big.jpg", b"x" * 4096, "image/jpeg")}
+    )
+    assert response.status_code == 413
+    assert response.json()["detail"]["code"] == "REQUEST_TOO_LARGE"
+
+    response = limited_client.post("/api/v1/recognize/batch", files=files)
+    assert response.status_code == 200
+    assert response.json()["data"]["failed"] == 1
+
+
+def test_batch_too_many_files(client, monkeypatch):
+    """Test batch requests over BATCH_MAX_FILES are rejected"""
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "BATCH_MAX_FILES", 1)
+    files = [
+        ("files", ("0.jpg", b"not an image", "image/jpeg")),
+        ("files", ("1.jpg", b"not an image", "image/jpeg")),
+    ]
+
+    response = client.post("/api/v1/recognize/batch", files=files)
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "TOO_MANY_FILES"
+
+
+@pytest.fixture
+def lifespan_client(monkeypatch):
+    """Create test client running the lifespan hooks (background job workers)"""
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "OCR_EAGER_LOAD", False)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _wait_for_job(client, job_id, timeout=5.0):
+    """Poll a job until it finishes"""
+    import time
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        data = client.get(f"/api/v1/jobs/{job_id}").json()["data"]
+        if data["status"] in ("completed", "cancelled"):
+            return data
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish in {timeout}s")
+
+
+def test_job_lifecycle(lifespan_client, fixtures_dir, fake_ocr):
+    """Test submitting a job, polling for results and streaming them"""
+    image_bytes = (fixtures_dir / "amount_100.jpg").read_bytes()
+    files = [
+        ("files", ("0_first.jpg", image_bytes, "image/jpeg")),
+        ("files", ("1_bad.txt", b"not an image", "text/plain")),
+        ("files", ("2_third.jpg", image_bytes, "image/jpeg")),
+    ]
+
+    response = lifespan_client.post("/api/v1/jobs", files=files)
+
+    assert response.status_code == 202
+    submitted = response.json()["data"]
+    assert submitted["total"] == 3
+    assert submitted["results"] is None
+
+    job = _wait_for_job(lifespan_client, submitted["job_id"])
+    assert job["status"] == "completed"
+    assert job["completed"] == 3
+    assert job["succeeded"] == 2
+    assert job["failed"] == 1
+    results = job["results"]
+    assert [item["index"] for item in results] == [0, 1, 2]
+    assert results[0]["data"]["amount"] == "0"
+    assert results[1]["error"]["code"] == "UNSUPPORTED_FORMAT"
+
+    # A finished job streams all stored results, then closes the stream
+    stream = lifespan_client.get(f"/api/v1/jobs/{submitted['job_id']}/stream")
+    assert stream.status_code == 200
+    assert stream.headers["content-type"].startswith("application/x-ndjson")
+    lines = [line for line in stream.text.splitlines() if line]
+    assert sorted(json.loads(line)["index"] for line in lines) == [0, 1, 2]
+
+
+def test_job_waits_for_executor_capacity(lifespan_client, fixtures_dir, fake_ocr, monkeypatch):
+    """Test job items wait while the executor is full instead of failing"""
+    from src.core.config import settings
+    from src.services.executor import InferenceExecutor
+
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0)
+    monkeypatch.setattr(routes, "get_inference_executor", lambda: executor)
+    monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF_SEC", 0.01)
+    monkeypatch.setattr(settings, "JOB_RETRY_MAX_BACKOFF_SEC", 0.02)
+    # Occupy the only admission slot, as a synchronous request would
+    executor._admit()
+
+    try:
+        image_bytes = (fixtures_dir / "amount_100.jpg").read_bytes()
+        response = lifespan_client.post(
+            "/api/v1/jobs",
+            files=[("files", ("0_first.jpg", image_bytes, "image/jpeg"))]
+        )
+        assert response.status_code == 202
+        job_id = response.json()["data"]["job_id"]
+
+        import time
+        time.sleep(0.1)
+        job = lifespan_client.get(f"/api/v1/jobs/{job_id}").json()["data"]
+        assert job["status"] == "running"
+        assert job["completed"] == 0
+
+        executor._release()
+        job = _wait_for_job(lifespan_client, job_id)
+        assert job["succeeded"] == 1
+        assert job["results"][0]["data"]["amount"] == "0"
+    finally:
+        executor.shutdown()
+
+
+def test_job_not_found(client):
+    """Test unknown job ids return 404"""
+    response = client.get("/api/v1/jobs/does-not-exist")
+
+    assert response.status_code == 404
+    assert response.json()["detail"]["code"] == "JOB_NOT_FOUND"
+
+
+def test_jobs_disabled(client, monkeypatch):
+    """Test the jobs API can be switched off for multi-worker deployments"""
+    from src.core.config import settings
+
+    monkeypatch.setattr(settings, "JOBS_ENABLED", False)
+
+    response = client.post(
+        "/api/v1/jobs",
+        files=[("files", ("1_bad.txt", b"not an image", "text/plain"))]
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"]["code"] == "JOBS_DISABLED"
+
+    response = client.get("/api/v1/jobs/does-not-exist")
+    assert response.json()["detail"]["code"] == "JOBS_DISABLED"
+
+
+def test_batch_stream_ndjson_completion_order(client, fixtures_dir, monkeypatch):
+    """Test streamed batch results arrive in completion order with original indices"""
+    import asyncio
+
+    async def fake_recognize_content(content, filename, timings=None):
+        # The first image finishes last regardless of executor parallelism
+        await asyncio.sleep(0.1 if filename.startswith("0") else 0.0)
+        return filename.split("_")[0], 0.99, 1, filename, []
+
+    monkeypatch.setattr(routes, "_recognize_content", fake_recognize_content)
+    image_bytes = (fixtures_dir / "amount_100.jpg").read_bytes()
+    files = [
+        ("files", ("0_slow.jpg", image_bytes, "image/jpeg")),
+        ("files", ("1_bad.txt", b"not an image", "text/plain")),
+        ("files", ("2_fast.jpg", image_bytes, "image/jpeg")),
+    ]
+
+    response = client.post("/api/v1/recognize/batch/stream", files=files)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines() if line]
+    indices = [item["index"] for item in results]
+    assert sorted(indices) == [0, 1, 2]
+    # The slow first image finishes last
+    assert indices[-1] == 0
+    by_index = {item["index"]: item for item in results}
+    assert by_index[0]["data"]["amount"] == "0"
+    assert by_index[1]["error"]["code"] == "UNSUPPORTED_FORMAT"
+
+
+def test_batch_stream_sse(client, fixtures_dir, fake_ocr):
+    """Test server-sent events output selected via the Accept header"""
+    image_bytes = (fixtures_dir / "amount_100.jpg").read_bytes()
+    files = [
+        ("files", ("0_first.jpg", image_bytes, "image/jpeg")),
+        ("files", ("1_second.jpg", image_bytes, "image/jpeg")),
+    ]
+
+    response = client.post(
+        "/api/v1/recognize/batch/stream",
+        files=files,
+        headers={"Accept": "text/event-stream"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in response.text.split("\n\n") if block]
+    assert [block.splitlines()[0] for block in events] == [
+        "event: result", "event: result", "event: done"
+    ]
+    summary = json.loads(events[-1].splitlines()[1][len("data: "):])
+    assert summary == {"total": 2, "succeeded": 2, "failed": 0}
+
+
+def test_recognize_raw_image_body(client, fixtures_dir, fake_ocr):
+    """Test an encoded image sent as the raw request body"""
+    image_bytes = (fixtures_dir / "amount_100.jpg").read_bytes()
+
+    response = client.post(
+        "/api/v1/recognize",
+        content=image_bytes,
+        headers={"Content-Type": "application/octet-stream", "X-Filename": "7_raw.jpg"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["amount"] == "7"
+
+
+def test_recognize_base64_json(client, fixtures_dir, fake_ocr):
+    """Test a base64 image sent in a JSON body"""
+    import base64
+    image_b64 = base64.b64encode((fixtures_dir / "amount_200.png").read_bytes()).decode()
+
+    response = client.post(
+        "/api/v1/recognize",
+        json={"image": f"data:image/png;base64,{image_b64}", "filename": "8_json.png"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["amount"] == "8"
+
+    response = client.post("/api/v1/recognize", json={"image": "not base64!"})
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "INVALID_REQUEST"
+
+
+def test_recognize_raw_pixels(client, monkeypatch):
+    """Test raw pixels with a shape header reach the service as an array"""
+    import numpy as np
+    received = []
+
+    class ArrayOCRService:
+        def recognize_amount(self, image, filename="unknown", **kwargs):
+            received.append(image)
+            return "1", 0.99, 1, filename, []
+
+    monkeypatch.setattr(routes, "get_ocr_service", lambda: ArrayOCRService())
+    pixels = np.zeros((4, 5, 3), dtype=np.uint8)
+    pixels[..., 2] = 255  # pure red in BGR order
+
+    response = client.post(
+        "/api/v1/recognize",
+        content=pixels.tobytes(),
+        headers={
+            "Content-Type": "application/octet-stream",
+            "X-Image-Shape": "4,5,3",
+            "X-Pixel-Format": "bgr",
+        }
+    )
+
+    assert response.status_code == 200
+    assert received[0].shape == (4, 5, 3)
+    assert received[0][0, 0].tolist() == [255, 0, 0]
+
+    response = client.post(
+        "/api/v1/recognize",
+        content=pixels.tobytes()[:-1],
+        headers={"Content-Type": "application/octet-stream", "X-Image-Shape": "4,5,3"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "INVALID_REQUEST"
+
+    response = client.post(
+        "/api/v1/recognize",
+        content=bytes(100),
+        headers={"Content-Type": "application/octet-stream", "X-Image-Shape": "100"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "INVALID_REQUEST"
+
+
+def test_recognize_unsupported_media_type(client):
+    """Test unsupported request bodies are rejected with 415"""
+    response = client.post(
+        "/api/v1/recognize",
+        content=b"hello",
+        headers={"Content-Type": "text/plain"}
+    )
+
+    assert response.status_code == 415
+    assert response.json()["detail"]["code"] == "UNSUPPORTED_MEDIA_TYPE"
+
+
+def test_batch_recognize_base64_json(client, fixtures_dir, fake_ocr):
+    """Test a JSON list of base64 images with per-item validation errors"""
+    import base64
+    image_b64 = base64.b64encode((fixtures_dir / "amount_100.jpg").read_bytes()).decode()
+
+    response = client.post(
+        "/api/v1/recognize/batch",
+        json={"images": [
+            {"image": image_b64, "filename": "0_first.jpg"},
+            {"image": base64.b64encode(b"not an image").decode()},
+        ]}
+    )
+
+    assert response.status_code == 200
+    results = response.json()["data"]["results"]
+    assert results[0]["data"]["amount"] == "0"
+    assert results[1]["filename"] == "image_1"
+    assert results[1]["error"]["code"] == "UNSUPPORTED_FORMAT"
+
+
+def test_compact_responses_omit_verbose_fields(client, fixtures_dir, fake_ocr):
+    """Test compact=true drops raw_text and warnings from single and batch results"""
+    image_bytes = (fixtures_dir / "amount_100.jpg").read_bytes()
+
+    response = client.post(
+        "/api/v1/recognize",
+        files={"file": ("3_single.jpg", image_bytes, "image/jpeg")}
+    )
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["data"]["raw_text"] == "3_single.jpg"
+
+    response = client.post(
+        "/api/v1/recognize?compact=true",
+        files={"file": ("3_single.jpg", image_bytes, "image/jpeg")}
+    )
+    assert response.status_code == 200
+    assert response.json()["data"] == {"amount": "3", "confidence": 0.99, "processing_time_ms": 1}
+
+    files = [
+        ("files", ("0_first.jpg", image_bytes, "image/jpeg")),
+        ("files", ("1_bad.txt", b"not an image", "text/plain")),
+    ]
+    response = client.post("/api/v1/recognize/batch?compact=true", files=files)
+    assert response.status_code == 200
+    results = response.json()["data"]["results"]
+    assert results[0]["data"] == {"amount": "0", "confidence": 0.99, "processing_time_ms": 1}
+    assert results[1]["error"]["code"] == "UNSUPPORTED_FORMAT"
+
+
+def test_recognize_timings(client, fixtures_dir, monkeypatch):
+    """Test opt-in stage timings in the body and the Server-Timing header"""
+    class TimedOCRService:
+        def recognize_amount(self, image, filename="unknown", timings=None, **kwargs):
+            timings.update({"decode": 0.002, "detection": 0.0305, "total": 0.05})
+            return "1", 0.99, 50, "1", []
+
+    from src.core.config import settings
+
+    monkeypatch.setattr(routes, "get_ocr_service", lambda: TimedOCRService())
+    image_bytes = (fixtures_dir / "amount_100.jpg").read_bytes()
+
+    # Server-Timing is off by default
+    response = client.post(
+        "/api/v1/recognize",
+        files={"file": ("amount_100.jpg", image_bytes, "image/jpeg")}
+    )
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", True)
+    response = client.post(
+        "/api/v1/recognize",
+        files={"file": ("amount_100.jpg", image_bytes, "image/jpeg")}
+    )
+    assert response.status_code == 200
+    assert "timings" not in response.json()["data"]
+    server_timing = response.headers["server-timing"]
+    assert server_timing.startswith("queue_wait;dur=")
+    assert "detection;dur=30.5" in server_timing
+
+    response = client.post(
+        "/api/v1/recognize?timings=true",
+        files={"file": ("amount_100.jpg", image_bytes, "image/jpeg")}
+    )
+    stage_timings = response.json()["data"]["timings"]
+    assert stage_timings["decode_ms"] == 2.0
+    assert stage_timings["detection_ms"] == 30.5
+    assert stage_timings["queue_wait_ms"] >= 0
+    assert stage_timings["recognition_ms"] is None
+
+    response = client.post(
+        "/api/v1/recognize/batch?timings=true",
+        files=[("files", ("amount_100.jpg", image_bytes, "image/jpeg"))]
+    )
+    assert response.json()["data"]["results"][0]["data"]["timings"]["total_ms"] == 50.0
+
+
+async def _no_snapshot():
+    """Health refresh stand-in for an engine that is not loaded"""
+    return None
+
+
+def test_health_unhealthy_after_engine_load_failure(client, monkeypatch):
+    """Test /health reports unhealthy once eager engine loading has failed"""
+    from src.core import readiness
+    from src.services.health import HealthMonitor
+
+    monitor = HealthMonitor(interval_sec=60, engine_timeout_sec=1)
+    monkeypatch.setattr(routes, "get_health_monitor", lambda: monitor)
+    monkeypatch.setattr(routes, "is_ocr_service_loaded", lambda: False)
+    monkeypatch.setattr(readiness, "_ready", False)
+
+    # Engine still loading: the process is alive
+    monkeypatch.setattr(readiness, "_reason", "warming_up")
+    monitor._snapshot = None
+    monkeypatch.setattr(monitor, "refresh", _no_snapshot)
+    data = client.get("/api/v1/health").json()
+    assert data["status"] == "healthy"
+    assert data["engine_status"] == "not_loaded"
+
+    # Load failed without a recorded snapshot
+    monkeypatch.setattr(readiness, "_reason", "engine_load_failed")
+    data = client.get("/api/v1/health").json()
+    assert data["status"] == "unhealthy"
+    assert data["engine_status"] == "unhealthy"
+
+    # Load failure recorded by the startup hook
+    monkeypatch.setattr(readiness, "_reason", "warming_up")
+    monitor.record_failure("model download failed")
+    data = client.get("/api/v1/health").json()
+    assert data["status"] == "unhealthy"
+    assert data["engine_status"] == "unhealthy"
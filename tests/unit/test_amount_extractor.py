@@ -0,0 +1,84 @@
+"""金额提取单元测试"""
+import pytest
+
+from src.services.amount_extractor import extract_amount, find_amount_candidates
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("¥100.00", "100.00"),
+    ("￥888.88", "888.88"),
+    ("$99.99", "99.99"),
+    ("1,234.56", "1234.56"),
+    ("50.00", "50.00"),
+    ("0.01", "0.01"),
+    ("999999.99", "999999.99"),
+    ("¥ 1234.56", "1234.56"),
+])
+def test_extract_simple_amounts(text, expected):
+    """测试单个金额的提取与标准化"""
+    assert extract_amount(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", None, "无金额", "谢谢惠顾"])
+def test_extract_no_amount(text):
+    """测试没有金额时返回None"""
+    assert extract_amount(text) is None
+
+
+def test_keyword_beats_first_number():
+    """测试关键词后的金额优先于先出现的数字"""
+    assert extract_amount("商品A 3 12.50 商品B 1 8.00 合计 20.50") == "20.50"
+
+
+def test_strong_keyword_beats_subtotal():
+    """测试实付优先于小计"""
+    lines = ["小计 ¥120.00", "优惠 -20.00", "实付 ¥100.00"]
+    assert extract_amount(lines) == "100.00"
+
+
+def test_keyword_on_previous_line():
+    """测试关键词与金额分两行(两个文本框)"""
+    lines = ["数量 2", "合计", "¥36.80"]
+    assert extract_amount(lines) == "36.80"
+
+
+def test_dates_times_and_phones_are_not_amounts():
+    """测试日期、时间、电话、百分比不作为金额"""
+    lines = [
+        "日期 2024-03-15 14:32:08",
+        "电话 021-68889999 13812345678",
+        "折扣 10%",
+        "金额 58",
+    ]
+    assert extract_amount(lines) == "58"
+
+    amounts = {c.amount for c in find_amount_candidates(lines)}
+    assert "2024" not in amounts
+    assert "13812345678" not in amounts
+    assert "10" not in amounts
+
+
+def test_long_integer_penalized():
+    """测试卡号/单号等长整数得分低于正常金额"""
+    assert extract_amount("订单号 20240315001 45.00") == "45.00"
+
+
+def test_discount_penalized():
+    """测试负数(优惠)得分较低"""
+    assert extract_amount(["-5.00", "15.00"]) == "15.00"
+
+
+def test_invalid_decimals_skipped():
+    """测试超过2位小数的数字被跳过"""
+    assert extract_amount("1.2345") is None
+    assert extract_amount("1.2345 ¥12.30") == "12.30"
+
+
+def test_candidates_record_keyword_and_line():
+    """测试候选金额记录关联关键词和行号"""
+    candidates = find_amount_candidates(["商品 12.00", "总计 ¥12.00"])
+    last = candidates[-1]
+    assert last.keyword == "总计"
+    assert last.line == 1
+    assert last.has_currency
+    assert last.score > candidates[0].score
@@ -0,0 +1,91 @@
+"""微批调度器单元测试"""
+import threading
+
+import pytest
+
+from src.services.batcher import MicroBatcher
+
+
+class RecordingPredictor:
+    """记录每次批量推理输入的替身推理函数"""
+
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, items):
+        with self.lock:
+            self.batches.append(list(items))
+        return [item * 10 for item in items]
+
+
+def test_single_submit():
+    """测试单个请求的结果与输入一一对应"""
+    predictor = RecordingPredictor()
+    batcher = MicroBatcher(predictor, max_batch_size=8, max_wait_ms=1)
+
+    try:
+        assert batcher.submit([1, 2, 3]).result(timeout=5) == [10, 20, 30]
+    finally:
+        batcher.close()
+
+
+def test_empty_submit():
+    """测试空输入直接返回"""
+    batcher = MicroBatcher(RecordingPredictor(), max_batch_size=8, max_wait_ms=1)
+    assert batcher.submit([]).result(timeout=1) == []
+
+
+def test_concurrent_requests_merged():
+    """测试等待窗口内的并发请求合并为一个批次并正确拆分结果"""
+    predictor = RecordingPredictor()
+    batcher = MicroBatcher(predictor, max_batch_size=100, max_wait_ms=200)
+
+    try:
+        futures = [batcher.submit([i, i + 100]) for i in range(5)]
+        results = [future.result(timeout=5) for future in futures]
+
+        for i, result in enumerate(results):
+            assert result == [i * 10, (i + 100) * 10]
+        assert len(predictor.batches) == 1
+        assert len(predictor.batches[0]) == 10
+    finally:
+        batcher.close()
+
+
+def test_max_batch_size_closes_batch():
+    """测试达到最大批大小后立即执行"""
+    predictor = RecordingPredictor()
+    batcher = MicroBatcher(predictor, max_batch_size=2, max_wait_ms=5000)
+
+    try:
+        futures = [batcher.submit([i]) for i in range(4)]
+        assert [future.result(timeout=5) for future in futures] == [[0], [10], [20], [30]]
+        assert all(len(batch) <= 2 for batch in predictor.batches)
+    finally:
+        batcher.close()
+
+
+def test_predict_error_propagates():
+    """测试推理异常传递给批次内所有请求"""
+    def fail(items):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(fail, max_batch_size=8, max_wait_ms=1)
+
+    try:
+        with pytest.raises(RuntimeError):
+            batcher.submit([1]).result(timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_result_count_mismatch():
+    """测试结果数量与输入不一致时报错"""
+    batcher = MicroBatcher(lambda items: items[:-1], max_batch_size=8, max_wait_ms=1)
+
+    try:
+        with pytest.raises(RuntimeError):
+            batcher.submit([1, 2]).result(timeout=5)
+    finally:
+        batcher.close()
@@ -0,0 +1,229 @@
+"""缓存单元测试"""
+import time
+
+import numpy as np
+import pytest
+
+from src.services.cache import LRUCache, PerceptualCache
+
+
+def test_get_put():
+    """测试写入和命中"""
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 1, "max_entries": 2, "hits": 1, "misses": 1}
+
+
+def test_lru_eviction():
+    """测试超出上限时淘汰最久未使用的条目"""
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")          # a变为最近使用
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_ttl_expiry():
+    """测试条目过期"""
+    cache = LRUCache(max_entries=2, ttl_sec=0.02)
+    cache.put("a", 1)
+    time.sleep(0.03)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_clear():
+    """测试清空缓存和统计"""
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.clear()
+
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 0
+
+
+def _hash(*set_bits):
+    """构造64位哈希,指定位置为1"""
+    bits = np.zeros(64, dtype=bool)
+    bits[list(set_bits)] = True
+    return np.packbits(bits)
+
+
+def test_perceptual_cache_matches_nearest_within_distance():
+    """测试按汉明距离匹配最近的条目"""
+    cache = PerceptualCache(max_entries=4, hash_bytes=8, max_distance=2)
+    cache.put(_hash(), "blank")
+    cache.put(_hash(*range(32)), "half")
+
+    assert cache.lookup(_hash(1, 2)) == ("blank", 2)
+    assert cache.lookup(_hash(*range(31))) == ("half", 1)
+    assert cache.lookup(_hash(1, 2, 3)) == (None, 3)
+    assert cache.stats() == {"size": 2, "max_entries": 4, "hits": 2, "misses": 1}
+
+
+def test_perceptual_cache_overwrites_oldest():
+    """测试写满后覆盖最早写入的条目"""
+    cache = PerceptualCache(max_entries=2, hash_bytes=8, max_distance=0)
+    cache.put(_hash(1), "a")
+    cache.put(_hash(2), "b")
+    cache.put(_hash(3), "c")
+
+    assert cache.lookup(_hash(1))[0] is None
+    assert cache.lookup(_hash(2))[0] == "b"
+    assert cache.lookup(_hash(3))[0] == "c"
+    assert len(cache) == 2
+
+
+def test_perceptual_cache_ttl_expiry():
+    """测试过期条目不再命中"""
+    cache = PerceptualCache(max_entries=2, hash_bytes=8, max_distance=0, ttl_sec=0.02)
+    cache.put(_hash(1), "a")
+    time.sleep(0.03)
+
+    assert cache.lookup(_hash(1)) == (None, None)
+
+
+# 金额文本框(坐标对应400x200的图片)
+AMOUNT_POLY = np.array([[40, 80], [360, 80], [360, 120], [40, 120]], dtype=np.float32)
+
+
+def _amount_from_pixels(pixels):
+    """按金额区域的灰度模拟识别结果(同一模板中只有金额数字不同)"""
+    return "合计 100.00" if pixels.mean() < 64 else "合计 300.00"
+
+
+@pytest.fixture
+def perceptual_service(monkeypatch):
+    """创建带近似重复缓存、识别结果取决于金额区域像素的OCR服务"""
+    from src.services.ocr_service import OCRService
+
+    service = OCRService.__new__(OCRService)
+    service.perceptual_cache = PerceptualCache(max_entries=4, hash_bytes=32, max_distance=8)
+    service.crop_cache = None
+    service.rec_batcher = None
+    calls = []
+
+    def fake_recognize_array(img_array, filename, deadline, start_time, timings, evidence=None):
+        calls.append(filename)
+        text = _amount_from_pixels(img_array[80:120, 40:360])
+        if evidence is not None:
+            evidence["amount_poly"] = AMOUNT_POLY
+        return text.split()[1], 0.95, 120, text, []
+
+    def fake_predict(crops, deadline=None):
+        return [{"rec_text": _amount_from_pixels(crop), "rec_score": 0.95} for crop in crops]
+
+    monkeypatch.setattr(service, "_recognize_array", fake_recognize_array)
+    monkeypatch.setattr(service, "_predict_recognition", fake_predict)
+    return service, calls
+
+
+def _receipt_jpeg(amount_gray, quality=95):
+    """生成版式相同、金额区域灰度不同的单据图片"""
+    import io
+    from PIL import Image
+
+    img = Image.new("RGB", (400, 200), "white")
+    img.paste((amount_gray,) * 3, (40, 80, 360, 120))
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def test_service_reuses_result_for_near_duplicate(perceptual_service):
+    """测试重新编码的同一张图片复核金额后复用近似重复缓存中的结果"""
+    from src.core.deadline import Deadline
+
+    service, calls = perceptual_service
+    first = service._recognize_uncached(_receipt_jpeg(0), "a.jpg", Deadline(10), time.time(), {})
+    second = service._recognize_uncached(
+        _receipt_jpeg(0, quality=60), "b.jpg", Deadline(10), time.time(), {}
+    )
+
+    assert calls == ["a.jpg"]
+    assert first[0] == second[0] == "100.00"
+    assert second[3] == "合计 100.00"
+
+
+def test_service_rejects_near_duplicate_with_different_amount(perceptual_service):
+    """测试版式相同但金额不同的单据不共用近似重复缓存结果"""
+    from src.core.deadline import Deadline
+    from src.services.image_processor import decode_image, difference_hash
+
+    service, calls = perceptual_service
+    first_bytes, second_bytes = _receipt_jpeg(0), _receipt_jpeg(100)
+    distance = np.unpackbits(np.bitwise_xor(
+        difference_hash(decode_image(first_bytes), 16),
+        difference_hash(decode_image(second_bytes), 16)
+    )).sum()
+    assert distance <= 8
+
+    first = service._recognize_uncached(first_bytes, "a.jpg", Deadline(10), time.time(), {})
+    second = service._recognize_uncached(second_bytes, "b.jpg", Deadline(10), time.time(), {})
+
+    assert calls == ["a.jpg", "b.jpg"]
+    assert first[0] == "100.00"
+    assert second[0] == "300.00"
+
+
+def test_recognize_array_records_amount_poly(monkeypatch):
+    """测试识别时记录金额所在文本框,供近似重复缓存复核"""
+    from src.core.deadline import Deadline
+    from src.services.ocr_service import OCRService
+
+    service = OCRService.__new__(OCRService)
+    service.crop_cache = None
+    service.rec_batcher = None
+    polys = [AMOUNT_POLY - [0, 60], AMOUNT_POLY]
+
+    def fake_predict(crops, deadline=None):
+        return [{"rec_text": text, "rec_score": 0.9} for text in ["店名", "合计 12.50"]]
+
+    monkeypatch.setattr(service, "_detect_text", lambda img_array, deadline: polys)
+    monkeypatch.setattr(service, "_predict_recognition", fake_predict)
+
+    evidence = {}
+    img = np.zeros((200, 400, 3), dtype=np.uint8)
+    result = service._recognize_array(img, "a.jpg", Deadline(10), time.time(), {}, evidence)
+
+    assert result[0] == "12.50"
+    assert evidence["amount_poly"] is polys[1]
+
+
+def test_service_recognizes_only_novel_crops(monkeypatch):
+    """测试像素相同的裁剪图只送入识别模型一次"""
+    from src.core.deadline import Deadline
+    from src.services.ocr_service import OCRService
+
+    service = OCRService.__new__(OCRService)
+    service.crop_cache = LRUCache(max_entries=8)
+    service.rec_batcher = None
+    batches = []
+
+    def fake_predict(crops, deadline=None):
+        batches.append(len(crops))
+        return [{"rec_text": f"text{int(crop[0, 0, 0])}", "rec_score": 0.9} for crop in crops]
+
+    monkeypatch.setattr(service, "_predict_recognition", fake_predict)
+
+    header = np.full((20, 60, 3), 1, dtype=np.uint8)
+    amount = np.full((20, 60, 3), 2, dtype=np.uint8)
+    other_amount = np.full((20, 60, 3), 3, dtype=np.uint8)
+
+    first = service._recognize_crops([header, amount, header.copy()], Deadline(10))
+    second = service._recognize_crops([header, other_amount], Deadline(10))
+
+    # 同一请求内重复的裁剪图去重,第二次请求只识别新出现的裁剪图
+    assert batches == [2, 1]
+    assert service._parse_rec_result(first) == (["text1", "text2", "text1"], [0.9, 0.9, 0.9])
+    assert service._parse_rec_result(second) == (["text1", "text3"], [0.9, 0.9])
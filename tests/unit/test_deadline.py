@@ -0,0 +1,47 @@
+"""请求截止时间单元测试"""
+import time
+
+import pytest
+
+from src.core.deadline import Deadline, TimeoutException
+
+
+def test_check_within_deadline():
+    """测试截止时间内检查通过"""
+    deadline = Deadline(5)
+
+    deadline.check("preprocess")
+
+    assert not deadline.expired()
+    assert 0 < deadline.remaining() <= 5
+    assert deadline.remaining_ms() <= 5000
+
+
+def test_sub_second_timeout():
+    """测试毫秒级超时"""
+    deadline = Deadline(0.02)
+    time.sleep(0.03)
+
+    assert deadline.expired()
+    assert deadline.remaining() == 0
+    with pytest.raises(TimeoutException, match="detection"):
+        deadline.check("detection")
+
+
+def test_cancel():
+    """测试取消后检查失败"""
+    deadline = Deadline(5)
+    deadline.cancel("客户端断开")
+
+    assert deadline.cancelled
+    assert deadline.expired()
+    with pytest.raises(TimeoutException, match="客户端断开"):
+        deadline.check("recognition")
+
+
+def test_elapsed_ms():
+    """测试经过时间"""
+    deadline = Deadline(5)
+    time.sleep(0.01)
+
+    assert deadline.elapsed_ms() >= 10
@@ -0,0 +1,86 @@
+"""检测分辨率单元测试"""
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from src.core.config import settings
+from src.core.deadline import Deadline
+from src.services.ocr_service import OCRService
+
+
+class FakeDetector:
+    """记录输入尺寸的检测器,返回一个高度为图像高度1/20的文本框"""
+
+    def __init__(self):
+        self.input_shapes = []
+
+    def predict(self, input):
+        height, width = input.shape[:2]
+        self.input_shapes.append((height, width))
+        text_height = height / 20
+        poly = [[0, 0], [width / 2, 0], [width / 2, text_height], [0, text_height]]
+        return [{"dt_polys": np.array([poly], dtype=np.float32)}]
+
+
+class FakePool:
+    """不加载模型的引擎池"""
+
+    def __init__(self, detector):
+        self.engine = type("Engine", (), {"text_detector": detector})()
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        yield self.engine
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    """替换引擎池的OCR服务"""
+    detector = FakeDetector()
+    service = OCRService.__new__(OCRService)
+    service.engine_pool = FakePool(detector)
+    monkeypatch.setattr(settings, "OCR_DET_LIMIT_SIDE_LEN", 500)
+    return service, detector
+
+
+def test_full_mode_detects_on_input(detector, monkeypatch):
+    """测试full模式直接在预处理图上检测"""
+    service, fake = detector
+    monkeypatch.setattr(settings, "OCR_DET_MODE", "full")
+
+    service._detect_text(np.zeros((1000, 2000, 3), dtype=np.uint8), Deadline(10))
+    assert fake.input_shapes == [(1000, 2000)]
+
+
+def test_fixed_mode_maps_polys_back(detector, monkeypatch):
+    """测试fixed模式在缩小图上检测并将坐标映射回原图"""
+    service, fake = detector
+    monkeypatch.setattr(settings, "OCR_DET_MODE", "fixed")
+
+    polys = service._detect_text(np.zeros((1000, 2000, 3), dtype=np.uint8), Deadline(10))
+
+    assert fake.input_shapes == [(250, 500)]
+    assert polys[0].max(axis=0).tolist() == pytest.approx([1000, 50])
+
+
+def test_adaptive_mode_keeps_low_resolution(detector, monkeypatch):
+    """测试adaptive模式文本足够大时只检测一次"""
+    service, fake = detector
+    monkeypatch.setattr(settings, "OCR_DET_MODE", "adaptive")
+    monkeypatch.setattr(settings, "OCR_DET_MIN_TEXT_HEIGHT", 10)
+
+    service._detect_text(np.zeros((1000, 2000, 3), dtype=np.uint8), Deadline(10))
+    assert fake.input_shapes == [(250, 500)]
+
+
+def test_adaptive_mode_redetects_small_text(detector, monkeypatch):
+    """测试adaptive模式文本过小时回到全分辨率检测"""
+    service, fake = detector
+    monkeypatch.setattr(settings, "OCR_DET_MODE", "adaptive")
+    monkeypatch.setattr(settings, "OCR_DET_MIN_TEXT_HEIGHT", 20)
+
+    polys = service._detect_text(np.zeros((1000, 2000, 3), dtype=np.uint8), Deadline(10))
+
+    assert fake.input_shapes == [(250, 500), (1000, 2000)]
+    assert polys[0].max(axis=0).tolist() == pytest.approx([1000, 50])
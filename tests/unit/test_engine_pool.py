@@ -0,0 +1,77 @@
+"""OCR引擎池单元测试"""
+import queue
+
+import pytest
+
+from src.services import engine_pool
+from src.services.engine_pool import EnginePool, compute_cpu_threads
+
+
+class DummyEngine:
+    """不加载模型的引擎替身"""
+
+    def __init__(self, engine_id, cpu_threads, enable_mkldnn):
+        self.engine_id = engine_id
+        self.cpu_threads = cpu_threads
+
+
+@pytest.fixture
+def dummy_pool(monkeypatch):
+    """创建使用替身引擎的引擎池"""
+    monkeypatch.setattr(engine_pool, "OCREngine", DummyEngine)
+    return EnginePool(size=2, cpu_threads=3)
+
+
+def _fake_cpu_count(logical=True):
+    """模拟16物理核心/32逻辑核心的机器"""
+    return 32 if logical else 16
+
+
+def test_compute_cpu_threads_configured():
+    """测试显式配置的线程数优先"""
+    assert compute_cpu_threads(4, configured_threads=5) == 5
+
+
+def test_compute_cpu_threads_auto(monkeypatch):
+    """测试按物理核心数均分线程"""
+    monkeypatch.setattr(engine_pool.psutil, "cpu_count", _fake_cpu_count)
+    assert compute_cpu_threads(4) == 4
+    assert compute_cpu_threads(32) == 1
+
+
+def test_compute_cpu_threads_multi_process(monkeypatch):
+    """测试多进程部署时按进程数均分物理核心"""
+    monkeypatch.setattr(engine_pool.psutil, "cpu_count", _fake_cpu_count)
+    assert compute_cpu_threads(2, processes=4) == 2
+    assert compute_cpu_threads(4, processes=8) == 1
+
+
+def test_pool_creates_engines(dummy_pool):
+    """测试引擎池创建指定数量的引擎"""
+    assert len(dummy_pool.engines) == 2
+    assert all(engine.cpu_threads == 3 for engine in dummy_pool.engines)
+
+
+def test_checkout_checkin(dummy_pool):
+    """测试借出和归还引擎"""
+    with dummy_pool.checkout() as first:
+        assert dummy_pool.busy == 1
+        with dummy_pool.checkout() as second:
+            assert first is not second
+            assert dummy_pool.busy == 2
+
+            # 所有引擎都被借出时等待超时
+            with pytest.raises(queue.Empty):
+                with dummy_pool.checkout(timeout=0.01):
+                    pass
+
+    assert dummy_pool.busy == 0
+
+
+def test_checkin_on_exception(dummy_pool):
+    """测试异常时引擎仍被归还"""
+    with pytest.raises(RuntimeError):
+        with dummy_pool.checkout():
+            raise RuntimeError("boom")
+
+    assert dummy_pool.busy == 0
@@ -0,0 +1,136 @@
+"""推理执行器单元测试"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.core.deadline import Deadline, TimeoutException
+from src.services.executor import InferenceExecutor, QueueFullException
+
+
+def test_run_returns_result():
+    """测试在线程池中执行并返回结果"""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+
+    async def main():
+        return await executor.run(lambda x, y: x + y, 1, 2)
+
+    try:
+        assert asyncio.run(main()) == 3
+        assert executor.in_flight == 0
+        assert executor.queue_depth == 0
+    finally:
+        executor.shutdown()
+
+
+def test_run_off_event_loop_thread():
+    """测试任务不在事件循环线程中执行"""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0)
+
+    async def main():
+        loop_thread = threading.current_thread()
+        worker_thread = await executor.run(threading.current_thread)
+        return loop_thread, worker_thread
+
+    try:
+        loop_thread, worker_thread = asyncio.run(main())
+        assert loop_thread is not worker_thread
+    finally:
+        executor.shutdown()
+
+
+def test_run_records_queue_wait():
+    """测试记录任务在队列中等待执行的时间"""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+
+    async def main():
+        first = asyncio.ensure_future(executor.run(time.sleep, 0.1))
+        await asyncio.sleep(0.01)
+        timings = {}
+        await executor.run(lambda: None, timings=timings)
+        await first
+        return timings
+
+    try:
+        timings = asyncio.run(main())
+        assert timings["queue_wait"] >= 0.05
+    finally:
+        executor.shutdown()
+
+
+def test_queue_full_rejected():
+    """测试超出准入容量时快速失败"""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+    gate = threading.Event()
+
+    async def main():
+        first = asyncio.ensure_future(executor.run(gate.wait, 5))
+        second = asyncio.ensure_future(executor.run(gate.wait, 5))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(QueueFullException):
+            await executor.run(gate.wait, 5)
+
+        gate.set()
+        await asyncio.gather(first, second)
+
+    try:
+        asyncio.run(main())
+        assert executor.queue_depth == 0
+    finally:
+        executor.shutdown()
+
+
+def test_exception_propagates():
+    """测试任务异常传递给调用方"""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+
+    def fail():
+        raise ValueError("boom")
+
+    async def main():
+        await executor.run(fail)
+
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(main())
+        # 失败后名额应被释放
+        asyncio.run(executor.run(lambda: None))
+    finally:
+        executor.shutdown()
+
+
+def test_deadline_enforced_while_waiting():
+    """测试等待结果超过截止时间时抛出超时并取消截止时间"""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+    gate = threading.Event()
+    deadline = Deadline(0.05)
+
+    async def main():
+        await executor.run(gate.wait, 5, deadline=deadline)
+
+    try:
+        with pytest.raises(TimeoutException):
+            asyncio.run(main())
+        assert deadline.cancelled
+    finally:
+        gate.set()
+        executor.shutdown()
+
+
+def test_expired_deadline_skips_queued_task():
+    """测试排队期间已超时的任务不会执行"""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+    calls = []
+    deadline = Deadline(0)
+
+    async def main():
+        await executor.run(calls.append, 1, deadline=deadline)
+
+    try:
+        with pytest.raises(TimeoutException):
+            asyncio.run(main())
+        assert calls == []
+    finally:
+        executor.shutdown()
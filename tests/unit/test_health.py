@@ -0,0 +1,112 @@
+"""引擎健康监测单元测试"""
+import asyncio
+import queue
+
+import pytest
+
+from src.services import health
+from src.services.health import HealthMonitor
+
+
+class FakeService:
+    """记录自检次数的OCR服务替身"""
+
+    def __init__(self, result=True):
+        self.result = result
+        self.calls = 0
+
+    def health_check(self, engine_timeout=None):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def fake_service(monkeypatch):
+    """替换健康监测使用的OCR服务"""
+    service = FakeService()
+    monkeypatch.setattr(health, "get_ocr_service", lambda: service)
+    monkeypatch.setattr(health, "is_ocr_service_loaded", lambda: True)
+    return service
+
+
+def test_refresh_records_snapshot(fake_service):
+    """测试自检结果被缓存"""
+    monitor = HealthMonitor(interval_sec=30, engine_timeout_sec=1)
+    snapshot = asyncio.run(monitor.refresh())
+
+    assert snapshot.healthy is True
+    assert snapshot.error is None
+    assert monitor.snapshot is snapshot
+    assert fake_service.calls == 1
+
+
+def test_refresh_skips_when_not_loaded(fake_service, monkeypatch):
+    """测试引擎未加载时后台自检不触发加载"""
+    monkeypatch.setattr(health, "is_ocr_service_loaded", lambda: False)
+    monitor = HealthMonitor(interval_sec=30, engine_timeout_sec=1)
+
+    assert asyncio.run(monitor.refresh()) is None
+    assert fake_service.calls == 0
+
+
+def test_refresh_keeps_snapshot_when_engines_busy(fake_service):
+    """测试引擎全部繁忙时保留上次自检结果"""
+    monitor = HealthMonitor(interval_sec=30, engine_timeout_sec=0.01)
+    first = asyncio.run(monitor.refresh())
+
+    fake_service.result = queue.Empty()
+    assert asyncio.run(monitor.refresh()) is first
+
+
+def test_refresh_records_failure(fake_service):
+    """测试自检异常记录为不健康"""
+    fake_service.result = RuntimeError("engine crashed")
+    monitor = HealthMonitor(interval_sec=30, engine_timeout_sec=1)
+    snapshot = asyncio.run(monitor.refresh())
+
+    assert snapshot.healthy is False
+    assert "engine crashed" in snapshot.error
+
+
+def test_get_snapshot_uses_cache(fake_service):
+    """测试未过期的自检结果直接复用,不重复推理"""
+    monitor = HealthMonitor(interval_sec=30, engine_timeout_sec=1)
+
+    async def main():
+        await monitor.get_snapshot()
+        await monitor.get_snapshot()
+        await monitor.get_snapshot()
+
+    asyncio.run(main())
+    assert fake_service.calls == 1
+
+
+def test_get_snapshot_never_loads_engine(fake_service, monkeypatch):
+    """测试后台自检未运行且缓存过期时也不加载引擎"""
+    monkeypatch.setattr(health, "is_ocr_service_loaded", lambda: False)
+    monitor = HealthMonitor(interval_sec=30, engine_timeout_sec=1)
+
+    assert asyncio.run(monitor.get_snapshot()) is None
+
+    monitor.record_failure("load failed")
+    monitor._snapshot.checked_at -= 60
+    assert asyncio.run(monitor.get_snapshot()).healthy is False
+    assert fake_service.calls == 0
+
+
+def test_background_task_start_stop(fake_service):
+    """测试后台自检任务的启动和停止"""
+    monitor = HealthMonitor(interval_sec=0.01, engine_timeout_sec=1)
+
+    async def main():
+        monitor.start()
+        assert monitor.running
+        await asyncio.sleep(0.1)
+        assert (await monitor.get_snapshot()).healthy is True
+        await monitor.stop()
+        assert not monitor.running
+
+    asyncio.run(main())
+    assert fake_service.calls >= 2
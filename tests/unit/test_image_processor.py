@@ -1,9 +1,22 @@
 """图片处理器单元测试"""
 import pytest
+import numpy as np
 from PIL import Image
 import io
+from pathlib import Path
 
-from src.services.image_processor import preprocess_image
+from src.core.config import settings
+from src.services.image_processor import (
+    preprocess_image,
+    decode_image,
+    polys_to_boxes,
+    extract_crops,
+    resize_for_detection,
+    scale_polys,
+    median_text_height,
+    difference_hash,
+    prepare_array,
+)
 
 
 def test_preprocess_image_rgb():
@@ -49,7 +62,208 @@ def test_preprocess_image_large():
     assert max(result.size) <= 2048
 
 
+def test_preprocess_image_large_jpeg():
+    """测试大尺寸JPEG使用草稿模式解码后缩放到目标尺寸"""
+    img = Image.new('RGB', (4032, 3024), color='white')
+    img_bytes = io.BytesIO()
+    img.save(img_bytes, format='JPEG')
+    img_bytes = img_bytes.getvalue()
+
+    result = preprocess_image(img_bytes)
+
+    # 按1/2直接解码,无需再缩放
+    assert result.mode == 'RGB'
+    assert result.size == (2016, 1512)
+
+
+def test_preprocess_image_large_jpeg_resized():
+    """测试草稿解码后仍超过上限时继续缩放"""
+    img = Image.new('RGB', (6000, 4500), color='white')
+    img_bytes = io.BytesIO()
+    img.save(img_bytes, format='JPEG')
+    img_bytes = img_bytes.getvalue()
+
+    result = preprocess_image(img_bytes)
+
+    assert result.size == (2048, 1536)
+
+
+def test_preprocess_image_resample_option(monkeypatch):
+    """测试可配置的缩放滤波器"""
+    monkeypatch.setattr(settings, "IMAGE_RESAMPLE", "bilinear")
+    img = Image.new('RGB', (3000, 1500), color='white')
+    img_bytes = io.BytesIO()
+    img.save(img_bytes, format='PNG')
+    img_bytes = img_bytes.getvalue()
+
+    result = preprocess_image(img_bytes)
+
+    assert result.size == (2048, 1024)
+
+
 def test_preprocess_image_invalid():
     """测试无效图片"""
     with pytest.raises(ValueError):
         preprocess_image(b"invalid image data")
+
+
+def test_decode_image_array():
+    """测试解码为连续的RGB数组"""
+    img = Image.new('L', (120, 80), color='white')
+    img_bytes = io.BytesIO()
+    img.save(img_bytes, format='PNG')
+    img_bytes = img_bytes.getvalue()
+
+    result = decode_image(img_bytes)
+
+    assert result.shape == (80, 120, 3)
+    assert result.dtype == 'uint8'
+    assert result.flags['C_CONTIGUOUS']
+
+    # 裁剪为视图,不复制像素
+    crop = result[10:20, 30:60]
+    assert crop.base is not None
+    assert crop.shape == (10, 30, 3)
+
+
+def test_decode_image_invalid():
+    """测试无效图片解码"""
+    with pytest.raises(ValueError):
+        decode_image(b"invalid image data")
+
+
+def test_polys_to_boxes():
+    """测试批量计算外接矩形、padding和边界裁剪"""
+    polys = np.array([
+        [[10, 20], [50, 20], [50, 40], [10, 40]],
+        [[0, 0], [30, 1], [30, 9], [0, 8]],
+        [[90, 90], [99, 90], [99, 99], [90, 99]],
+    ], dtype=np.float32)
+
+    boxes = polys_to_boxes(polys, width=100, height=100, padding=2)
+
+    assert boxes.tolist() == [
+        [8, 18, 52, 42],
+        [0, 0, 32, 11],
+        [88, 88, 100, 100],
+    ]
+
+
+def test_polys_to_boxes_ragged():
+    """测试顶点数不一致的多边形"""
+    polys = [
+        [[10, 10], [20, 10], [20, 20], [10, 20]],
+        [[30, 30], [40, 30], [45, 35], [40, 40], [30, 40]],
+    ]
+
+    boxes = polys_to_boxes(polys, width=100, height=100, padding=0)
+
+    assert boxes.tolist() == [[10, 10, 20, 20], [30, 30, 45, 40]]
+
+
+def test_extract_crops_bbox():
+    """测试外接矩形裁剪为数组视图并过滤空区域"""
+    img_array = np.zeros((100, 200, 3), dtype=np.uint8)
+    polys = np.array([
+        [[10, 20], [60, 20], [60, 40], [10, 40]],
+        [[250, 10], [260, 10], [260, 20], [250, 20]],   # 完全在图片外
+    ], dtype=np.float32)
+
+    crops = extract_crops(img_array, polys, mode="bbox", padding=0)
+
+    assert len(crops) == 1
+    assert crops[0].shape == (20, 50, 3)
+    assert np.shares_memory(crops[0], img_array)
+
+    crops, indices = extract_crops(img_array, polys, mode="bbox", padding=0, return_indices=True)
+    assert indices == [0]
+
+
+def test_extract_crops_perspective():
+    """测试透视校正裁剪倾斜文本框"""
+    img_array = np.zeros((100, 200, 3), dtype=np.uint8)
+    polys = np.array([[[20, 30], [120, 20], [122, 40], [22, 50]]], dtype=np.float32)
+
+    crops = extract_crops(img_array, polys, mode="perspective")
+
+    assert len(crops) == 1
+    height, width = crops[0].shape[:2]
+    assert width > height
+    assert 95 <= width <= 105
+
+
+def test_resize_for_detection():
+    """测试检测输入按最长边缩小并返回缩放比例"""
+    img_array = np.zeros((1500, 2000, 3), dtype=np.uint8)
+
+    resized, scale = resize_for_detection(img_array, 1000)
+    assert resized.shape == (750, 1000, 3)
+    assert scale == pytest.approx(0.5)
+
+    same, scale = resize_for_detection(img_array, 4000)
+    assert same is img_array
+    assert scale == 1.0
+
+
+def test_scale_polys_and_median_height():
+    """测试检测框坐标映射回原图及文本高度中位数"""
+    polys = np.array([
+        [[10, 10], [50, 10], [50, 20], [10, 20]],
+        [[10, 30], [50, 30], [50, 50], [10, 50]],
+        [[10, 60], [50, 60], [50, 90], [10, 90]],
+    ], dtype=np.float32)
+
+    assert median_text_height(polys) == pytest.approx(20)
+    assert median_text_height(scale_polys(polys, 2.0)) == pytest.approx(40)
+    assert median_text_height([]) == 0.0
+
+    ragged = [polys[0], np.vstack([polys[1], [[30, 55]]])]
+    scaled = scale_polys(ragged, 0.5)
+    assert scaled[1].max(axis=0).tolist() == [25, 27.5]
+
+
+def test_difference_hash_tolerates_reencoding():
+    """测试重新编码、缩放后的同一张图片哈希几乎不变,不同图片差异明显"""
+    fixtures = Path(__file__).parent.parent / "fixtures" / "images"
+    original = Image.open(fixtures / "amount_100.jpg").convert("RGB")
+
+    def encode(img, quality):
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=quality)
+        return buffer.getvalue()
+
+    def distance(a, b):
+        return int(np.unpackbits(np.bitwise_xor(a, b)).sum())
+
+    base = difference_hash(decode_image(encode(original, 95)), 16)
+    reencoded = difference_hash(decode_image(encode(original, 50)), 16)
+    resized = difference_hash(decode_image(encode(original.resize((280, 140)), 70)), 16)
+    other = difference_hash(decode_image((fixtures / "amount_200.png").read_bytes()), 16)
+    same_layout = difference_hash(decode_image((fixtures / "amount_300.bmp").read_bytes()), 16)
+
+    assert base.shape == (32,)
+    assert distance(base, reencoded) <= 4
+    assert distance(base, resized) <= 4
+    assert distance(base, other) > 8
+    # 版式相同、只有金额不同的单据哈希同样接近,命中后须复核金额
+    assert distance(other, same_layout) <= 8
+
+
+def test_prepare_array_normalizes_channels_and_size(monkeypatch):
+    """测试像素数组输入统一为RGB三通道并按最长边缩小"""
+    monkeypatch.setattr(settings, "IMAGE_MAX_DIMENSION", 100)
+    timings = {}
+
+    gray = prepare_array(np.full((50, 400), 7, dtype=np.uint8), timings)
+    assert gray.shape == (12, 100, 3)
+    assert gray[0, 0].tolist() == [7, 7, 7]
+    assert timings["decode"] == 0.0 and "preprocess" in timings
+
+    rgba = prepare_array(np.zeros((20, 30, 4), dtype=np.uint8))
+    assert rgba.shape == (20, 30, 3)
+    assert rgba.flags["C_CONTIGUOUS"]
+
+    with pytest.raises(ValueError):
+        prepare_array(np.zeros((20, 30, 3), dtype=np.float32))
+    with pytest.raises(ValueError):
+        prepare_array(np.zeros((20, 30, 2), dtype=np.uint8))
@@ -0,0 +1,132 @@
+"""异步识别任务单元测试"""
+import asyncio
+import time
+
+import pytest
+
+from src.services.jobs import (
+    InMemoryJobStore,
+    Job,
+    JobItem,
+    JobManager,
+    JobQueueFullException,
+    JobStatus,
+)
+
+
+async def fake_process(index, filename, content, semaphore):
+    """按内容长度延迟的单项识别替身,结果为文件名"""
+    async with semaphore:
+        await asyncio.sleep(0.01 * len(content))
+        return filename
+
+
+def _items(*contents):
+    return [JobItem(index=i, filename=f"{i}.jpg", content=c) for i, c in enumerate(contents)]
+
+
+def test_job_runs_items_and_streams_in_completion_order():
+    """测试任务逐项识别,流式结果按完成顺序输出"""
+    async def scenario():
+        manager = JobManager(InMemoryJobStore(max_jobs=10, ttl_sec=60), max_queued_jobs=2)
+        manager.start(fake_process)
+        job = manager.submit(_items(b"xxx", b"x", b"xx"))
+        streamed = [result async for result in manager.stream(job)]
+        await manager.stop()
+        return job, streamed
+
+    job, streamed = asyncio.run(scenario())
+
+    assert job.status == JobStatus.COMPLETED
+    assert streamed == ["1.jpg", "2.jpg", "0.jpg"]
+    assert job.results() == ["0.jpg", "1.jpg", "2.jpg"]
+    assert all(item.content is None for item in job.items)
+
+
+def test_prefailed_items_count_as_completed():
+    """测试提交时已失败的项不再识别"""
+    async def scenario():
+        manager = JobManager(InMemoryJobStore(max_jobs=10, ttl_sec=60), max_queued_jobs=2)
+        manager.start(fake_process)
+        items = _items(b"x", b"")
+        items[1].content = None
+        items[1].result = "invalid"
+        job = manager.submit(items)
+        assert job.completed == 1
+        streamed = [result async for result in manager.stream(job)]
+        await manager.stop()
+        return job, streamed
+
+    job, streamed = asyncio.run(scenario())
+
+    assert streamed == ["invalid", "0.jpg"]
+    assert job.results() == ["0.jpg", "invalid"]
+
+
+def test_submit_rejects_when_queue_full():
+    """测试排队任务数达到上限时拒绝提交"""
+    async def scenario():
+        manager = JobManager(InMemoryJobStore(max_jobs=10, ttl_sec=60), max_queued_jobs=1)
+        manager.start(fake_process)
+        # 第一个任务被后台协程取出前,队列只能再容纳一个
+        manager.submit(_items(b"x"))
+        with pytest.raises(JobQueueFullException):
+            manager.submit(_items(b"x"))
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+
+def test_submit_requires_started_manager():
+    """测试未启动时提交任务报错"""
+    async def scenario():
+        manager = JobManager(InMemoryJobStore(max_jobs=10, ttl_sec=60), max_queued_jobs=1)
+        with pytest.raises(RuntimeError):
+            manager.submit(_items(b"x"))
+
+    asyncio.run(scenario())
+
+
+def test_stop_cancels_queued_jobs():
+    """测试停止时未完成的任务标记为已取消"""
+    async def scenario():
+        manager = JobManager(InMemoryJobStore(max_jobs=10, ttl_sec=60), max_queued_jobs=2)
+        manager.start(fake_process)
+        running = manager.submit(_items(b"x" * 100))
+        queued = manager.submit(_items(b"x"))
+        await asyncio.sleep(0.01)
+        await manager.stop()
+        return running, queued
+
+    running, queued = asyncio.run(scenario())
+
+    assert running.status == JobStatus.CANCELLED
+    assert queued.status == JobStatus.CANCELLED
+
+
+def test_store_expires_finished_jobs():
+    """测试已结束任务超过保留时间后被清理,未结束任务保留"""
+    store = InMemoryJobStore(max_jobs=10, ttl_sec=60)
+    finished = Job(
+        job_id="done", items=[], status=JobStatus.COMPLETED, finished_at=time.time() - 120
+    )
+    pending = Job(job_id="pending", items=[])
+    store.put(finished)
+    store.put(pending)
+
+    assert store.get("done") is None
+    assert store.get("pending") is pending
+
+
+def test_store_evicts_oldest_finished_jobs():
+    """测试超过最大任务数时淘汰最早结束的任务"""
+    store = InMemoryJobStore(max_jobs=2, ttl_sec=3600)
+    now = time.time()
+    store.put(Job(job_id="old", items=[], status=JobStatus.COMPLETED, finished_at=now - 10))
+    store.put(Job(job_id="new", items=[], status=JobStatus.COMPLETED, finished_at=now))
+    store.put(Job(job_id="running", items=[], status=JobStatus.RUNNING))
+
+    assert store.get("old") is None
+    assert store.get("new") is not None
+    assert store.get("running") is not None
+    assert len(store) == 2
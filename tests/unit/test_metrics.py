@@ -0,0 +1,65 @@
+"""服务指标单元测试"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from src.core import metrics
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_render_service_metrics():
+    """测试输出服务指标(Prometheus文本格式)"""
+    metrics.OCR_CACHE_REQUESTS.labels(result="hit").inc()
+    metrics.observe_stage_timings({"detection": 0.2})
+    metrics.OCR_QUEUE_DEPTH.set(3)
+
+    text = metrics.render_metrics().decode("utf-8")
+
+    assert "# TYPE ocr_cache_requests_total counter" in text
+    assert 'ocr_cache_requests_total{result="hit"}' in text
+    assert 'ocr_stage_duration_seconds_bucket{le="0.25",stage="detection"}' in text
+    assert "ocr_queue_depth 3.0" in text
+    assert "_created" not in text
+
+
+def test_executor_updates_queue_gauges():
+    """测试执行器在状态变化时更新队列指标"""
+    from src.services.executor import InferenceExecutor
+
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+    try:
+        executor._admit()
+        assert "ocr_queue_depth 1.0" in metrics.render_metrics().decode("utf-8")
+        executor._release()
+        assert "ocr_queue_depth 0.0" in metrics.render_metrics().decode("utf-8")
+    finally:
+        executor.shutdown()
+
+
+def _run_worker(code: str, multiproc_dir: Path) -> str:
+    """在独立进程中执行代码(模拟gunicorn worker)"""
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(multiproc_dir))
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout
+
+
+def test_multiprocess_metrics_aggregate_workers(tmp_path):
+    """测试多进程部署时汇总所有worker的指标"""
+    for _ in range(2):
+        _run_worker("from src.core import metrics; metrics.OCR_TIMEOUTS.inc()", tmp_path)
+
+    text = _run_worker(
+        "from src.core import metrics; print(metrics.render_metrics().decode())",
+        tmp_path
+    )
+
+    assert "ocr_timeouts_total 2.0" in text
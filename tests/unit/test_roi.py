@@ -0,0 +1,110 @@
+"""文本框筛选(ROI)单元测试"""
+import numpy as np
+import pytest
+
+from src.core.config import settings
+from src.core.deadline import Deadline
+from src.services.ocr_service import OCRService
+from src.services.roi import prune_mask, reading_order, score_boxes, select_boxes
+
+
+def _rect(x_min, y_min, x_max, y_max):
+    """构造矩形四边形"""
+    return [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+
+
+def test_prune_mask_drops_tiny_and_vertical_boxes():
+    """测试剔除过小、竖排的文本框"""
+    boxes = np.array([
+        [10, 10, 200, 40],      # 正常文本行
+        [10, 50, 200, 53],      # 高度过小
+        [10, 60, 20, 140],      # 竖排
+        [10, 150, 210, 180],    # 正常文本行
+    ])
+    assert prune_mask(boxes).tolist() == [True, False, False, True]
+
+
+def test_score_prefers_large_bottom_right_boxes():
+    """测试字号大、靠下、靠右的文本框得分更高"""
+    boxes = np.array([
+        [10, 10, 100, 30],      # 左上小字
+        [300, 500, 500, 560],   # 右下大字
+    ])
+    scores = score_boxes(boxes, 600, 600)
+    assert scores[1] > scores[0]
+
+
+def test_select_boxes_ranks_and_keeps_detection_order():
+    """测试排序模式与保持检测顺序模式"""
+    polys = [_rect(10, 10, 100, 30), _rect(10, 40, 100, 42), _rect(300, 500, 500, 560)]
+    assert select_boxes(polys, 600, 600).tolist() == [0, 2]
+    assert select_boxes(polys, 600, 600, rank=True).tolist() == [2, 0]
+
+
+def test_select_boxes_never_drops_everything():
+    """测试全部被剔除时回退为保留全部文本框"""
+    polys = [_rect(10, 10, 12, 12), _rect(20, 20, 22, 22)]
+    assert select_boxes(polys, 100, 100).tolist() == [0, 1]
+
+
+def test_reading_order():
+    """测试阅读顺序为从上到下、从左到右"""
+    polys = [_rect(300, 100, 400, 120), _rect(10, 100, 100, 120), _rect(10, 10, 100, 30)]
+    assert reading_order(polys, [0, 1, 2]) == [2, 1, 0]
+
+
+@pytest.fixture
+def roi_service(monkeypatch):
+    """不加载模型的OCR服务,识别结果由裁剪图的像素值决定"""
+    service = OCRService.__new__(OCRService)
+    calls = []
+
+    texts = {1: "商品 12.00", 2: "实付 ¥99.00", 3: "谢谢惠顾"}
+
+    def fake_recognize(crops, deadline):
+        calls.append(len(crops))
+        # 裁剪图带padding,按中心像素值区分文本框
+        centers = [int(crop[crop.shape[0] // 2, crop.shape[1] // 2, 0]) for crop in crops]
+        return [{"rec_text": texts[center], "rec_score": 0.95} for center in centers]
+
+    monkeypatch.setattr(service, "_recognize_crops", fake_recognize)
+    monkeypatch.setattr(settings, "OCR_ROI_CHUNK_SIZE", 1)
+    monkeypatch.setattr(settings, "OCR_ROI_STOP_CONFIDENCE", 0.9)
+    return service, calls
+
+
+def test_recognize_roi_stops_early(roi_service):
+    """测试找到高置信度金额后不再识别剩余文本框"""
+    service, calls = roi_service
+    img = np.zeros((600, 600, 3), dtype=np.uint8)
+    img[10:40, 10:200] = 1          # 商品行(左上)
+    img[500:560, 300:560] = 2       # 实付行(右下大字,排序最前)
+    img[300:330, 10:200] = 3        # 其他行
+    polys = [_rect(10, 10, 200, 40), _rect(300, 500, 560, 560), _rect(10, 300, 200, 330)]
+
+    timings = {}
+    texts, confidences, _, num_crops = service._recognize_roi(img, polys, Deadline(10), timings)
+
+    assert texts == ["实付 ¥99.00"]
+    assert confidences == [0.95]
+    assert num_crops == 1
+    assert calls == [1]
+    assert "crop" in timings and "recognition" in timings
+
+
+def test_recognize_roi_returns_reading_order(roi_service, monkeypatch):
+    """测试未提前结束时识别全部文本框并按阅读顺序返回"""
+    service, calls = roi_service
+    monkeypatch.setattr(settings, "OCR_ROI_STOP_CONFIDENCE", 1.0)
+    img = np.zeros((600, 600, 3), dtype=np.uint8)
+    img[10:40, 10:200] = 1
+    img[500:560, 300:560] = 2
+    img[300:330, 10:200] = 3
+    polys = [_rect(10, 10, 200, 40), _rect(300, 500, 560, 560), _rect(10, 300, 200, 330)]
+
+    texts, _, text_polys, num_crops = service._recognize_roi(img, polys, Deadline(10), {})
+
+    assert texts == ["商品 12.00", "谢谢惠顾", "实付 ¥99.00"]
+    assert text_polys[2] is polys[1]
+    assert num_crops == 3
+    assert len(calls) == 3
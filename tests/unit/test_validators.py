@@ -0,0 +1,169 @@
+"""输入验证工具单元测试"""
+import asyncio
+import base64
+import io
+
+import numpy as np
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+
+from src.core.config import settings
+from src.utils.validators import (
+    decode_base64_image,
+    parse_raw_pixels,
+    sniff_image_format,
+    validate_file_size,
+    validate_upload_file,
+)
+
+
+def _image_bytes(fmt):
+    """生成指定格式的图片字节"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (10, 10), color='white').save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def _upload(content, content_type="image/jpeg", size=None):
+    """构造上传文件"""
+    return UploadFile(
+        file=io.BytesIO(content),
+        size=size,
+        filename="test",
+        headers=Headers({"content-type": content_type})
+    )
+
+
+@pytest.mark.parametrize("fmt, mime_type", [
+    ("JPEG", "image/jpeg"),
+    ("PNG", "image/png"),
+    ("BMP", "image/bmp"),
+    ("TIFF", "image/tiff"),
+])
+def test_sniff_image_format(fmt, mime_type):
+    """测试根据魔数识别图片格式"""
+    assert sniff_image_format(_image_bytes(fmt)[:16]) == mime_type
+
+
+def test_sniff_unknown_format():
+    """测试无法识别的内容"""
+    assert sniff_image_format(b"GIF89a") is None
+    assert sniff_image_format(b"") is None
+
+
+def test_validate_upload_file_success():
+    """测试验证通过时返回完整内容"""
+    content = _image_bytes("PNG")
+    result, filename = asyncio.run(validate_upload_file(_upload(content, "image/png")))
+
+    assert result == content
+    assert filename == "test"
+
+
+def test_validate_upload_file_generic_content_type():
+    """测试未声明具体类型的上传按文件头嗅探结果接受或拒绝"""
+    content = _image_bytes("JPEG")
+    result, _ = asyncio.run(validate_upload_file(_upload(content, "application/octet-stream")))
+    assert result == content
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(validate_upload_file(_upload(b"plain text", "application/octet-stream")))
+    assert exc_info.value.detail["code"] == "UNSUPPORTED_FORMAT"
+
+
+def test_validate_upload_file_bogus_content():
+    """测试声明为图片但内容不是图片时拒绝"""
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(validate_upload_file(_upload(b"not an image at all")))
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail["code"] == "UNSUPPORTED_FORMAT"
+
+
+def test_validate_file_size_declared_size(monkeypatch):
+    """测试已知文件大小超限时不读取内容直接拒绝"""
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE_BYTES", 100)
+    upload = _upload(b"x" * 50, size=1000)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(validate_file_size(upload))
+
+    assert exc_info.value.status_code == 413
+    assert upload.file.tell() == 0
+
+
+def test_validate_file_size_streaming_abort(monkeypatch):
+    """测试未知大小时分块读取并在超限时中止"""
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE_BYTES", 100 * 1024)
+    upload = _upload(b"x" * (1024 * 1024))
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(validate_file_size(upload))
+
+    assert exc_info.value.status_code == 413
+    assert upload.file.tell() < 1024 * 1024
+
+
+def test_decode_base64_image():
+    """测试base64图片解码(支持data URI前缀)并嗅探格式"""
+    png = _image_bytes("PNG")
+    encoded = base64.b64encode(png).decode()
+
+    assert decode_base64_image(encoded) == png
+    assert decode_base64_image("data:image/png;base64," + encoded) == png
+
+    with pytest.raises(HTTPException) as exc_info:
+        decode_base64_image("@@@")
+    assert exc_info.value.detail["code"] == "INVALID_REQUEST"
+
+    with pytest.raises(HTTPException) as exc_info:
+        decode_base64_image(base64.b64encode(b"plain text").decode())
+    assert exc_info.value.detail["code"] == "UNSUPPORTED_FORMAT"
+
+
+def test_decode_base64_image_mime_line_breaks():
+    """测试按MIME格式换行的base64可以解码"""
+    png = _image_bytes("PNG")
+
+    assert decode_base64_image(base64.encodebytes(png).decode()) == png
+    assert decode_base64_image(base64.encodebytes(png).decode().replace("\n", "\r\n")) == png
+
+
+def test_parse_raw_pixels():
+    """测试原始像素按声明尺寸解析,BGR转换为RGB"""
+    pixels = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+
+    rgb = parse_raw_pixels(pixels.tobytes(), "2,3,3")
+    assert np.array_equal(rgb, pixels)
+
+    bgr = parse_raw_pixels(pixels.tobytes(), "2,3,3", "bgr")
+    assert np.array_equal(bgr, pixels[:, :, ::-1])
+
+    gray = parse_raw_pixels(bytes(6), "2x3")
+    assert gray.shape == (2, 3)
+
+
+@pytest.mark.parametrize("shape, size", [
+    ("2,3,3", 17),      # 长度不符
+    ("2,3,2", 12),      # 通道数不支持
+    ("2;3", 6),         # 格式无效
+    ("100", 100),       # 维数不足
+    ("", 0),            # 未声明尺寸
+    ("1,2,3,4", 24),    # 维数过多
+])
+def test_parse_raw_pixels_invalid(shape, size):
+    """测试尺寸声明无效或与数据长度不符时报错"""
+    with pytest.raises(HTTPException) as exc_info:
+        parse_raw_pixels(bytes(size), shape)
+    assert exc_info.value.status_code == 400
+
+
+def test_parse_raw_pixels_too_large(monkeypatch):
+    """测试像素数据超过上限时返回413"""
+    monkeypatch.setattr(settings, "MAX_RAW_IMAGE_SIZE_BYTES", 10)
+
+    with pytest.raises(HTTPException) as exc_info:
+        parse_raw_pixels(bytes(12), "2,2,3")
+    assert exc_info.value.status_code == 413